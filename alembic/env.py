@@ -4,7 +4,6 @@ from logging.config import fileConfig
 from pathlib import Path
 
 from dotenv import load_dotenv
-from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
@@ -14,7 +13,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from alembic import context
-from app.db import Base, DATABASE_URL
+from app.db import Base, DATABASE_URL, engine_options, get_pool_profile
 
 
 load_dotenv()
@@ -64,9 +63,10 @@ def do_run_migrations(connection: Connection) -> None:
 
 async def run_async_migrations() -> None:
     """Run migrations in 'online' mode using AsyncEngine."""
+    url = _get_database_url()
     connectable: AsyncEngine = create_async_engine(
-        _get_database_url(),
-        poolclass=pool.NullPool,
+        url,
+        **engine_options(get_pool_profile("migration"), url),
     )
 
     async with connectable.connect() as connection:
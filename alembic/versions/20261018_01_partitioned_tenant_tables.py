@@ -0,0 +1,348 @@
+"""Partitioned tenant tables: orders, line_items, ad_insights, attributed_orders, profit_metrics.
+
+- Every table is hash-partitioned on org_id, so queries filtered by tenant
+  touch one partition and a large tenant cannot bloat a small tenant's
+  indexes or vacuum work.
+- Time-series tables (ad_insights, profit_metrics) are range sub-partitioned
+  by month on their date column, each hash partition having a DEFAULT
+  catch-all. pfam_ensure_monthly_partitions() creates upcoming months.
+- Primary keys and unique constraints lead with org_id (and include the
+  range column where required), which also gives the composite
+  (org_id, ...) indexes every tenant query needs.
+- Cross-table references are composite (org_id, id) foreign keys.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_01_partitioned_tenant_tables"
+down_revision: Union[str, None] = "20260213_01_core_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HASH_PARTITIONS = 16
+
+# Months created up front around the migration date; later months are
+# added by pfam_ensure_monthly_partitions() from a scheduled job.
+MONTHS_BACK = 4
+MONTHS_AHEAD = 3
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    ]
+
+
+def _org_id() -> sa.Column:
+    return sa.Column(
+        "org_id",
+        pg.UUID(as_uuid=True),
+        sa.ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+
+def _create_hash_partitions(table: str, subpartition_by: str | None = None) -> None:
+    for remainder in range(HASH_PARTITIONS):
+        child = f"{table}_p{remainder:02d}"
+        sub = f" PARTITION BY RANGE ({subpartition_by})" if subpartition_by else ""
+        op.execute(
+            f"CREATE TABLE {child} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {HASH_PARTITIONS}, REMAINDER {remainder}){sub}"
+        )
+        if subpartition_by:
+            op.execute(f"CREATE TABLE {child}_default PARTITION OF {child} DEFAULT")
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pfam_ensure_monthly_partitions(
+            parent text, from_month date, months integer
+        ) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            child record;
+            n integer;
+            month_start date;
+            part_name text;
+        BEGIN
+            -- Range sub-partitions hang off each hash partition of `parent`.
+            FOR child IN
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE p.relname = parent AND c.relkind = 'p'
+            LOOP
+                FOR n IN 0 .. months - 1 LOOP
+                    month_start := (date_trunc('month', from_month)
+                                    + make_interval(months => n))::date;
+                    part_name := format('%s_%s', child.relname,
+                                        to_char(month_start, 'YYYY_MM'));
+                    IF to_regclass(part_name) IS NULL THEN
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                            part_name, child.relname, month_start,
+                            (month_start + interval '1 month')::date
+                        );
+                    END IF;
+                END LOOP;
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+    # orders
+    op.create_table(
+        "orders",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column(
+            "store_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("stores.id"),
+            nullable=False,
+        ),
+        sa.Column("shopify_order_id", sa.String(length=64), nullable=False),
+        sa.Column("total_amount_cents", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "total_discounts_cents",
+            sa.BigInteger(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("currency", sa.String(length=3), nullable=False),
+        sa.Column("customer_id", sa.String(length=64), nullable=True),
+        sa.Column("financial_status", sa.String(length=50), nullable=True),
+        sa.Column("fulfillment_status", sa.String(length=50), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_orders"),
+        sa.UniqueConstraint(
+            "org_id",
+            "store_id",
+            "shopify_order_id",
+            name="uq_orders_org_store_shopify_order",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index("ix_orders_org_created_at", "orders", ["org_id", "created_at"])
+    _create_hash_partitions("orders")
+
+    # line_items
+    cogs_source_enum = sa.Enum(
+        "shopify",
+        "csv",
+        "manual",
+        "estimated",
+        name="cogs_source",
+    )
+
+    op.create_table(
+        "line_items",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column("order_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("shopify_line_item_id", sa.String(length=64), nullable=False),
+        sa.Column("product_id", sa.String(length=64), nullable=True),
+        sa.Column("variant_id", sa.String(length=64), nullable=True),
+        sa.Column("sku", sa.String(length=255), nullable=True),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("unit_price_cents", sa.BigInteger(), nullable=False),
+        sa.Column("unit_cogs_cents", sa.BigInteger(), nullable=True),
+        sa.Column("unit_cogs_source", cogs_source_enum, nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_line_items"),
+        sa.ForeignKeyConstraint(
+            ["org_id", "order_id"],
+            ["orders.org_id", "orders.id"],
+            name="fk_line_items_order",
+            ondelete="CASCADE",
+        ),
+        sa.UniqueConstraint(
+            "org_id",
+            "order_id",
+            "shopify_line_item_id",
+            name="uq_line_items_org_order_shopify_line_item",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index("ix_line_items_org_sku", "line_items", ["org_id", "sku"])
+    _create_hash_partitions("line_items")
+
+    # ad_insights
+    op.create_table(
+        "ad_insights",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column("ad_set_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("spend_cents", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("impressions", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("clicks", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("reach", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("conversions", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "conversion_value_cents",
+            sa.BigInteger(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("cpm_cents", sa.BigInteger(), nullable=True),
+        sa.Column("cpc_cents", sa.BigInteger(), nullable=True),
+        sa.Column("ctr", sa.Numeric(10, 6), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "date", "id", name="pk_ad_insights"),
+        sa.UniqueConstraint(
+            "org_id",
+            "ad_set_id",
+            "date",
+            name="uq_ad_insights_org_ad_set_date",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    _create_hash_partitions("ad_insights", subpartition_by="date")
+
+    # attributed_orders
+    op.create_table(
+        "attributed_orders",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column("order_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("ad_set_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("attribution_tier", sa.SmallInteger(), nullable=False),
+        sa.Column("confidence_score", sa.Numeric(4, 2), nullable=False),
+        sa.Column("attribution_method", sa.String(length=50), nullable=False),
+        sa.Column("matched_click_id", sa.String(length=255), nullable=True),
+        sa.Column("attributed_revenue_cents", sa.BigInteger(), nullable=False),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("window_end", sa.DateTime(timezone=True), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_attributed_orders"),
+        sa.ForeignKeyConstraint(
+            ["org_id", "order_id"],
+            ["orders.org_id", "orders.id"],
+            name="fk_attributed_orders_order",
+            ondelete="CASCADE",
+        ),
+        sa.UniqueConstraint(
+            "org_id",
+            "order_id",
+            name="uq_attributed_orders_org_order",
+        ),
+        sa.CheckConstraint(
+            "attribution_tier BETWEEN 1 AND 5",
+            name="ck_attributed_orders_tier",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index(
+        "ix_attributed_orders_org_ad_set",
+        "attributed_orders",
+        ["org_id", "ad_set_id"],
+    )
+    _create_hash_partitions("attributed_orders")
+
+    # profit_metrics
+    profit_window_type_enum = sa.Enum(
+        "daily",
+        "7d",
+        "14d",
+        "30d",
+        name="profit_window_type",
+    )
+
+    op.create_table(
+        "profit_metrics",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column("ad_set_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("window_type", profit_window_type_enum, nullable=False),
+        sa.Column("window_start", sa.Date(), nullable=False),
+        sa.Column("window_end", sa.Date(), nullable=False),
+        sa.Column("spend_cents", sa.BigInteger(), nullable=False),
+        sa.Column("attributed_revenue_cents", sa.BigInteger(), nullable=False),
+        sa.Column("attributed_cogs_cents", sa.BigInteger(), nullable=False),
+        sa.Column("estimated_returns_cents", sa.BigInteger(), nullable=False),
+        sa.Column("platform_fees_cents", sa.BigInteger(), nullable=False),
+        sa.Column("net_profit_cents", sa.BigInteger(), nullable=False),
+        sa.Column("net_profit_pct", sa.Numeric(12, 4), nullable=True),
+        sa.Column("true_roas", sa.Numeric(12, 4), nullable=True),
+        sa.Column("order_count", sa.Integer(), nullable=False),
+        sa.Column("attribution_coverage_pct", sa.Numeric(7, 4), nullable=True),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "window_start", "id", name="pk_profit_metrics"),
+        sa.UniqueConstraint(
+            "org_id",
+            "ad_set_id",
+            "window_type",
+            "window_start",
+            "window_end",
+            name="uq_profit_metrics_org_ad_set_window",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index(
+        "ix_profit_metrics_org_window",
+        "profit_metrics",
+        ["org_id", "window_type", "window_start"],
+    )
+    _create_hash_partitions("profit_metrics", subpartition_by="window_start")
+
+    for table in ("ad_insights", "profit_metrics"):
+        op.execute(
+            f"SELECT pfam_ensure_monthly_partitions('{table}', "
+            f"(date_trunc('month', now()) - interval '{MONTHS_BACK} months')::date, "
+            f"{MONTHS_BACK + MONTHS_AHEAD + 1})"
+        )
+
+
+def downgrade() -> None:
+    # Dropping a partitioned parent drops all of its partitions.
+    op.drop_table("profit_metrics")
+
+    profit_window_type_enum = sa.Enum(
+        "daily",
+        "7d",
+        "14d",
+        "30d",
+        name="profit_window_type",
+    )
+    profit_window_type_enum.drop(op.get_bind(), checkfirst=True)
+
+    op.drop_table("attributed_orders")
+    op.drop_table("ad_insights")
+    op.drop_table("line_items")
+
+    cogs_source_enum = sa.Enum(
+        "shopify",
+        "csv",
+        "manual",
+        "estimated",
+        name="cogs_source",
+    )
+    cogs_source_enum.drop(op.get_bind(), checkfirst=True)
+
+    op.drop_table("orders")
+
+    op.execute("DROP FUNCTION IF EXISTS pfam_ensure_monthly_partitions(text, date, integer)")
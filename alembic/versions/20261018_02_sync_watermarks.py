@@ -0,0 +1,100 @@
+"""Per-connector sync watermarks and persisted sync run stats.
+
+- stores.sync_watermark_at / ad_accounts.sync_watermark_at: how far each
+  connector's data has been ingested; incremental syncs start from here.
+- sync_runs: one row per sync with mode, window and row counts.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_02_sync_watermarks"
+down_revision: Union[str, None] = "20261018_01_partitioned_tenant_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "stores",
+        sa.Column("sync_watermark_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "ad_accounts",
+        sa.Column("sync_watermark_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+    sync_mode_enum = sa.Enum("full", "incremental", name="sync_run_mode")
+    sync_status_enum = sa.Enum("running", "succeeded", "failed", name="sync_run_status")
+
+    op.create_table(
+        "sync_runs",
+        sa.Column(
+            "id",
+            pg.UUID(as_uuid=True),
+            primary_key=True,
+            nullable=False,
+        ),
+        sa.Column(
+            "org_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id"),
+            nullable=False,
+        ),
+        sa.Column("connector_type", sa.String(length=20), nullable=False),
+        sa.Column("connector_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("mode", sync_mode_enum, nullable=False),
+        sa.Column("status", sync_status_enum, nullable=False),
+        sa.Column("window_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("window_end", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("watermark_before", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("watermark_after", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rows_fetched", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("rows_upserted", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "rows_unchanged",
+            sa.BigInteger(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_sync_runs_org_connector_started",
+        "sync_runs",
+        ["org_id", "connector_id", "started_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sync_runs_org_connector_started", table_name="sync_runs")
+    op.drop_table("sync_runs")
+
+    sa.Enum("running", "succeeded", "failed", name="sync_run_status").drop(
+        op.get_bind(), checkfirst=True
+    )
+    sa.Enum("full", "incremental", name="sync_run_mode").drop(
+        op.get_bind(), checkfirst=True
+    )
+
+    op.drop_column("ad_accounts", "sync_watermark_at")
+    op.drop_column("stores", "sync_watermark_at")
@@ -0,0 +1,127 @@
+"""Attribution inputs: order landing sites, ad click ids, conversion events.
+
+- orders.landing_site: landing URL with UTM / click-id query params.
+- click_ids: platform click id -> ad set, written by the ad connectors
+  (Google click_view gclids, Meta ad-level UTM ids). Tier 1 input.
+- conversion_events: Meta Pixel / Google Tag purchase events. Tier 2 input.
+
+Both new tables are hash-partitioned on org_id like the other tenant tables.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_03_attribution_inputs"
+down_revision: Union[str, None] = "20261018_02_sync_watermarks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HASH_PARTITIONS = 16
+
+
+def _create_hash_partitions(table: str) -> None:
+    for remainder in range(HASH_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder:02d} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {HASH_PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.add_column("orders", sa.Column("landing_site", sa.Text(), nullable=True))
+
+    # Reuse the enum created with ad_accounts.
+    ad_platform_enum = pg.ENUM(
+        "meta",
+        "google",
+        "tiktok",
+        name="ad_platform",
+        create_type=False,
+    )
+
+    op.create_table(
+        "click_ids",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "org_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id"),
+            nullable=False,
+        ),
+        sa.Column("platform", ad_platform_enum, nullable=False),
+        sa.Column("click_id", sa.String(length=255), nullable=False),
+        sa.Column("ad_set_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("clicked_at", sa.DateTime(timezone=True), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_click_ids"),
+        sa.UniqueConstraint(
+            "org_id",
+            "platform",
+            "click_id",
+            name="uq_click_ids_org_platform_click",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    _create_hash_partitions("click_ids")
+
+    op.create_table(
+        "conversion_events",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "org_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id"),
+            nullable=False,
+        ),
+        sa.Column("platform", ad_platform_enum, nullable=False),
+        sa.Column("event_id", sa.String(length=255), nullable=False),
+        sa.Column("ad_set_id", pg.UUID(as_uuid=True), nullable=False),
+        # Shopify order id when the pixel / tag event carries it.
+        sa.Column("order_ref", sa.String(length=64), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("value_cents", sa.BigInteger(), nullable=True),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_conversion_events"),
+        sa.UniqueConstraint(
+            "org_id",
+            "platform",
+            "event_id",
+            name="uq_conversion_events_org_platform_event",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index(
+        "ix_conversion_events_org_occurred_at",
+        "conversion_events",
+        ["org_id", "occurred_at"],
+    )
+    _create_hash_partitions("conversion_events")
+
+
+def downgrade() -> None:
+    op.drop_table("conversion_events")
+    op.drop_table("click_ids")
+    op.drop_column("orders", "landing_site")
@@ -0,0 +1,112 @@
+"""Click-id index shared by order ingest and the ad connectors.
+
+- click_ids rows now carry both sides of a click: `order_id` / `ordered_at`
+  written by Shopify ingest, `ad_set_id` / `clicked_at` by the connectors.
+- Unique key re-ordered to (org_id, click_id, platform).
+- Partial index on (org_id, order_id) so Tier 1 is a join, not a text scan.
+- Backfills the order side from existing orders.landing_site.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_04_click_id_index"
+down_revision: Union[str, None] = "20261018_03_attribution_inputs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column("click_ids", "ad_set_id", nullable=True)
+    op.add_column("click_ids", sa.Column("order_id", pg.UUID(as_uuid=True), nullable=True))
+    op.add_column(
+        "click_ids", sa.Column("ordered_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+    op.drop_constraint("uq_click_ids_org_platform_click", "click_ids", type_="unique")
+    op.create_unique_constraint(
+        "uq_click_ids_org_click_platform",
+        "click_ids",
+        ["org_id", "click_id", "platform"],
+    )
+    op.create_index(
+        "ix_click_ids_org_order",
+        "click_ids",
+        ["org_id", "order_id"],
+        postgresql_where=sa.text("order_id IS NOT NULL"),
+    )
+
+    # One-off text scan so orders ingested before this revision keep Tier 1.
+    # Values are percent-decoded ('+' as space) like ingest's parse_qsl, so
+    # a later sync of the same click hits the same row; non-ASCII values are
+    # not click ids and are skipped. Each click keeps its earliest order.
+    op.execute(
+        """
+        WITH found AS (
+            SELECT
+                o.org_id,
+                o.id AS order_id,
+                o.created_at,
+                m[1] AS param,
+                (
+                    SELECT left(convert_from(string_agg(
+                        CASE WHEN p.token[1] ~ '^%[0-7][0-9A-Fa-f]$'
+                            THEN decode(substr(p.token[1], 2), 'hex')
+                            ELSE convert_to(p.token[1], 'UTF8')
+                        END, ''::bytea ORDER BY p.n), 'UTF8'), 255)
+                    FROM regexp_matches(
+                        replace(m[2], '+', ' '), '%[0-9A-Fa-f]{2}|[^%]+|%', 'g'
+                    ) WITH ORDINALITY AS p(token, n)
+                ) AS click_id
+            FROM orders o
+            CROSS JOIN LATERAL regexp_matches(
+                o.landing_site, '[?&](fbclid|gclid|ttclid)=([^&#]+)', 'g'
+            ) AS m
+            WHERE o.landing_site IS NOT NULL
+              AND m[2] !~ '%[89A-Fa-f][0-9A-Fa-f]'
+        )
+        INSERT INTO click_ids (
+            id, org_id, platform, click_id, order_id, ordered_at, created_at, updated_at
+        )
+        SELECT DISTINCT ON (f.org_id, f.click_id, f.param)
+            gen_random_uuid(),
+            f.org_id,
+            (CASE f.param
+                WHEN 'fbclid' THEN 'meta'
+                WHEN 'gclid' THEN 'google'
+                ELSE 'tiktok'
+            END)::ad_platform,
+            f.click_id,
+            f.order_id,
+            f.created_at,
+            now(),
+            now()
+        FROM found f
+        WHERE f.click_id <> ''
+        ORDER BY f.org_id, f.click_id, f.param, f.created_at, f.order_id
+        ON CONFLICT (org_id, click_id, platform) DO UPDATE
+        SET order_id = EXCLUDED.order_id,
+            ordered_at = EXCLUDED.ordered_at,
+            updated_at = now()
+        WHERE click_ids.order_id IS NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM click_ids WHERE ad_set_id IS NULL")
+    op.drop_index("ix_click_ids_org_order", table_name="click_ids")
+    op.drop_constraint("uq_click_ids_org_click_platform", "click_ids", type_="unique")
+    op.create_unique_constraint(
+        "uq_click_ids_org_platform_click",
+        "click_ids",
+        ["org_id", "platform", "click_id"],
+    )
+    op.drop_column("click_ids", "ordered_at")
+    op.drop_column("click_ids", "order_id")
+    op.alter_column("click_ids", "ad_set_id", nullable=False)
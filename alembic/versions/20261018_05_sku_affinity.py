@@ -0,0 +1,50 @@
+"""SKU x ad-set affinity snapshots for Tier 3 attribution.
+
+- sku_affinity: one row per org holding the compressed sparse matrix and
+  the attributed_orders watermark it has been updated through.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_05_sku_affinity"
+down_revision: Union[str, None] = "20261018_04_click_id_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sku_affinity",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "org_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id"),
+            nullable=False,
+        ),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.UniqueConstraint("org_id", name="uq_sku_affinity_org"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sku_affinity")
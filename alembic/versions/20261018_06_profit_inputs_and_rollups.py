@@ -0,0 +1,205 @@
+"""Profit engine inputs and the per-day ad set rollup.
+
+- line_items.product_category: category used by category-scoped COGS.
+- returns: Shopify refunds per line item (hash-partitioned on org_id).
+- cogs_settings: SKU / category / global COGS fallbacks, one per scope value.
+- sku_return_rates: trailing return rates per SKU with a manual override.
+- ad_set_daily_rollups: spend, attributed revenue, COGS, returns and order
+  counts per (org, ad set, day), kept current by sync and attribution so
+  profit windows are running sums over it (hash-partitioned on org_id).
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_06_profit_inputs_and_rollups"
+down_revision: Union[str, None] = "20261018_05_sku_affinity"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HASH_PARTITIONS = 16
+
+
+def _create_hash_partitions(table: str) -> None:
+    for remainder in range(HASH_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder:02d} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {HASH_PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    ]
+
+
+def _org_id() -> sa.Column:
+    return sa.Column(
+        "org_id",
+        pg.UUID(as_uuid=True),
+        sa.ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+
+def upgrade() -> None:
+    op.add_column(
+        "line_items", sa.Column("product_category", sa.String(length=255), nullable=True)
+    )
+
+    # returns
+    return_reason_enum = sa.Enum(
+        "defective",
+        "wrong",
+        "change_mind",
+        "sizing",
+        "other",
+        name="return_reason",
+    )
+    op.create_table(
+        "returns",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column("order_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("line_item_id", pg.UUID(as_uuid=True), nullable=True),
+        sa.Column("shopify_refund_id", sa.String(length=64), nullable=False),
+        # Refund line item id, or the refund id for order-level adjustments.
+        sa.Column("shopify_refund_line_id", sa.String(length=64), nullable=False),
+        sa.Column("sku", sa.String(length=255), nullable=True),
+        sa.Column("refund_amount_cents", sa.BigInteger(), nullable=False),
+        sa.Column("quantity_returned", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("reason_category", return_reason_enum, nullable=True),
+        sa.Column("refunded_at", sa.DateTime(timezone=True), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_returns"),
+        sa.ForeignKeyConstraint(
+            ["org_id", "order_id"],
+            ["orders.org_id", "orders.id"],
+            name="fk_returns_order",
+            ondelete="CASCADE",
+        ),
+        sa.UniqueConstraint(
+            "org_id",
+            "order_id",
+            "shopify_refund_id",
+            "shopify_refund_line_id",
+            name="uq_returns_org_order_refund_line",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index("ix_returns_org_refunded_at", "returns", ["org_id", "refunded_at"])
+    _create_hash_partitions("returns")
+
+    # cogs_settings
+    cogs_scope_enum = sa.Enum("sku", "category", "global", name="cogs_scope")
+    cogs_type_enum = sa.Enum("absolute", "percentage", name="cogs_type")
+    cogs_source_enum = pg.ENUM(
+        "shopify",
+        "csv",
+        "manual",
+        "estimated",
+        name="cogs_source",
+        create_type=False,
+    )
+    op.create_table(
+        "cogs_settings",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True),
+        _org_id(),
+        sa.Column("scope", cogs_scope_enum, nullable=False),
+        # SKU or category name; empty string for the global setting.
+        sa.Column("scope_value", sa.String(length=255), server_default="", nullable=False),
+        sa.Column("cogs_type", cogs_type_enum, nullable=False),
+        sa.Column("cogs_value_cents", sa.BigInteger(), nullable=True),
+        sa.Column("cogs_percent", sa.Numeric(7, 4), nullable=True),
+        sa.Column("source", cogs_source_enum, nullable=False),
+        *_timestamps(),
+        sa.UniqueConstraint(
+            "org_id", "scope", "scope_value", name="uq_cogs_settings_org_scope_value"
+        ),
+        sa.CheckConstraint(
+            "(cogs_type = 'absolute' AND cogs_value_cents IS NOT NULL) "
+            "OR (cogs_type = 'percentage' AND cogs_percent IS NOT NULL)",
+            name="ck_cogs_settings_value",
+        ),
+    )
+
+    # sku_return_rates
+    op.create_table(
+        "sku_return_rates",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True),
+        _org_id(),
+        sa.Column("sku", sa.String(length=255), nullable=False),
+        sa.Column("trailing_90d_rate", sa.Numeric(7, 6), nullable=True),
+        sa.Column("trailing_180d_rate", sa.Numeric(7, 6), nullable=True),
+        sa.Column("manual_override_rate", sa.Numeric(7, 6), nullable=True),
+        sa.Column("last_computed_at", sa.DateTime(timezone=True), nullable=True),
+        *_timestamps(),
+        sa.UniqueConstraint("org_id", "sku", name="uq_sku_return_rates_org_sku"),
+    )
+
+    # ad_set_daily_rollups
+    op.create_table(
+        "ad_set_daily_rollups",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column("ad_set_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("spend_cents", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "attributed_revenue_cents", sa.BigInteger(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "attributed_cogs_cents", sa.BigInteger(), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "estimated_returns_cents", sa.BigInteger(), server_default="0", nullable=False
+        ),
+        sa.Column("order_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "high_confidence_order_count", sa.Integer(), server_default="0", nullable=False
+        ),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_ad_set_daily_rollups"),
+        sa.UniqueConstraint(
+            "org_id",
+            "ad_set_id",
+            "date",
+            name="uq_ad_set_daily_rollups_org_ad_set_date",
+        ),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index(
+        "ix_ad_set_daily_rollups_org_date", "ad_set_daily_rollups", ["org_id", "date"]
+    )
+    _create_hash_partitions("ad_set_daily_rollups")
+
+
+def downgrade() -> None:
+    op.drop_table("ad_set_daily_rollups")
+    op.drop_table("sku_return_rates")
+    op.drop_table("cogs_settings")
+    op.drop_table("returns")
+    op.drop_column("line_items", "product_category")
+
+    bind = op.get_bind()
+    sa.Enum(name="cogs_type").drop(bind, checkfirst=True)
+    sa.Enum(name="cogs_scope").drop(bind, checkfirst=True)
+    sa.Enum(name="return_reason").drop(bind, checkfirst=True)
@@ -0,0 +1,52 @@
+"""Dirty (ad set, day) cells awaiting profit recompute.
+
+- profit_dirty_cells: deduplicated by (org_id, ad_set_id, date), so a burst
+  of COGS or return-rate changes collapses into one set of cells.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_07_profit_dirty_cells"
+down_revision: Union[str, None] = "20261018_06_profit_inputs_and_rollups"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "profit_dirty_cells",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "org_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id"),
+            nullable=False,
+        ),
+        sa.Column("ad_set_id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.UniqueConstraint(
+            "org_id", "ad_set_id", "date", name="uq_profit_dirty_cells_org_ad_set_date"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("profit_dirty_cells")
@@ -0,0 +1,40 @@
+"""Running unit counts on sku_return_rates for incremental recompute.
+
+- sold / refunded unit sums for the 90 and 180 day windows.
+- rates_through: last day (UTC) included in those sums.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_08_sku_return_rate_counts"
+down_revision: Union[str, None] = "20261018_07_profit_dirty_cells"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_COUNT_COLUMNS = (
+    "sold_units_90d",
+    "refunded_units_90d",
+    "sold_units_180d",
+    "refunded_units_180d",
+)
+
+
+def upgrade() -> None:
+    for name in _COUNT_COLUMNS:
+        op.add_column(
+            "sku_return_rates",
+            sa.Column(name, sa.BigInteger(), server_default="0", nullable=False),
+        )
+    op.add_column("sku_return_rates", sa.Column("rates_through", sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("sku_return_rates", "rates_through")
+    for name in reversed(_COUNT_COLUMNS):
+        op.drop_column("sku_return_rates", name)
@@ -0,0 +1,177 @@
+"""Automation rules, their evaluation log and the action audit log.
+
+- automation_rules: per-org rule definitions (conditions, action, guardrails).
+- rule_executions: one row per rule per evaluation pass, written in bulk
+  after every sync (hash-partitioned on org_id).
+- audit_log: append-only record of every action taken on an ad platform.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_09_automation_rules"
+down_revision: Union[str, None] = "20261018_08_sku_return_rate_counts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+HASH_PARTITIONS = 16
+
+
+def _create_hash_partitions(table: str) -> None:
+    for remainder in range(HASH_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE {table}_p{remainder:02d} PARTITION OF {table} "
+            f"FOR VALUES WITH (MODULUS {HASH_PARTITIONS}, REMAINDER {remainder})"
+        )
+
+
+def _timestamps() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    ]
+
+
+def _org_id() -> sa.Column:
+    return sa.Column(
+        "org_id",
+        pg.UUID(as_uuid=True),
+        sa.ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+
+def upgrade() -> None:
+    # Reuse the enum created with ad_accounts.
+    ad_platform_enum = pg.ENUM(
+        "meta",
+        "google",
+        "tiktok",
+        name="ad_platform",
+        create_type=False,
+    )
+    rule_scope_enum = sa.Enum("campaign", "adset", "ad", name="rule_scope")
+    rule_action_enum = sa.Enum(
+        "pause",
+        "reduce_budget",
+        "increase_budget",
+        "alert",
+        name="rule_action_type",
+    )
+    audit_actor_enum = sa.Enum("user", "system", name="audit_actor_type")
+
+    # automation_rules
+    op.create_table(
+        "automation_rules",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True),
+        _org_id(),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("platform", ad_platform_enum, nullable=False),
+        sa.Column("scope", rule_scope_enum, nullable=False),
+        sa.Column("conditions_json", pg.JSONB(), nullable=False),
+        sa.Column("action_type", rule_action_enum, nullable=False),
+        sa.Column(
+            "action_params_json",
+            pg.JSONB(),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column(
+            "guardrails_json",
+            pg.JSONB(),
+            server_default=sa.text("'{}'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("is_active", sa.Boolean(), server_default=sa.true(), nullable=False),
+        sa.Column(
+            "created_by", pg.UUID(as_uuid=True), sa.ForeignKey("users.id"), nullable=True
+        ),
+        *_timestamps(),
+    )
+    op.create_index(
+        "ix_automation_rules_org_active", "automation_rules", ["org_id", "is_active"]
+    )
+
+    # rule_executions
+    op.create_table(
+        "rule_executions",
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        _org_id(),
+        sa.Column(
+            "rule_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("automation_rules.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("evaluated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("entities_evaluated", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("entities_triggered", sa.Integer(), server_default="0", nullable=False),
+        sa.Column(
+            "entities_blocked_by_guardrail",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("action_queued", sa.Boolean(), server_default=sa.false(), nullable=False),
+        *_timestamps(),
+        sa.PrimaryKeyConstraint("org_id", "id", name="pk_rule_executions"),
+        postgresql_partition_by="HASH (org_id)",
+    )
+    op.create_index(
+        "ix_rule_executions_org_rule_evaluated",
+        "rule_executions",
+        ["org_id", "rule_id", "evaluated_at"],
+    )
+    _create_hash_partitions("rule_executions")
+
+    # audit_log (insert-only)
+    op.create_table(
+        "audit_log",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True),
+        _org_id(),
+        sa.Column(
+            "actor_user_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=True,
+        ),
+        sa.Column("actor_type", audit_actor_enum, nullable=False),
+        sa.Column("action_type", sa.String(length=64), nullable=False),
+        sa.Column("entity_type", sa.String(length=32), nullable=True),
+        sa.Column("entity_id", sa.String(length=255), nullable=True),
+        sa.Column("platform", ad_platform_enum, nullable=True),
+        sa.Column("rule_id", pg.UUID(as_uuid=True), nullable=True),
+        sa.Column("metric_snapshot_json", pg.JSONB(), nullable=True),
+        sa.Column("api_request_json", pg.JSONB(), nullable=True),
+        sa.Column("api_response_code", sa.Integer(), nullable=True),
+        sa.Column("api_response_json", pg.JSONB(), nullable=True),
+        *_timestamps(),
+    )
+    op.create_index("ix_audit_log_org_created", "audit_log", ["org_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("audit_log")
+    op.drop_table("rule_executions")
+    op.drop_table("automation_rules")
+
+    bind = op.get_bind()
+    sa.Enum(name="audit_actor_type").drop(bind, checkfirst=True)
+    sa.Enum(name="rule_action_type").drop(bind, checkfirst=True)
+    sa.Enum(name="rule_scope").drop(bind, checkfirst=True)
@@ -0,0 +1,157 @@
+"""Store audit_log in monthly range partitions.
+
+- audit_log: range-partitioned on created_at, one partition per month plus
+  a default catch-all, so reads filtered by date prune to a few months and
+  old months are detached for archiving instead of DELETEd.
+- BRIN index on created_at (rows arrive in time order, so it stays tiny)
+  next to the (org_id, created_at) btree tenant queries use.
+- pfam_ensure_monthly_range_partitions() creates upcoming months of a
+  table range-partitioned directly on its parent.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_10_audit_log_monthly_partitions"
+down_revision: Union[str, None] = "20261018_09_automation_rules"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Months created up front around the migration date; later months are
+# added by pfam_ensure_monthly_range_partitions() from a scheduled job.
+MONTHS_BACK = 4
+MONTHS_AHEAD = 3
+
+_COLUMNS = (
+    "id, org_id, actor_user_id, actor_type, action_type, entity_type, entity_id, "
+    "platform, rule_id, metric_snapshot_json, api_request_json, api_response_code, "
+    "api_response_json, created_at, updated_at"
+)
+
+
+def _audit_columns() -> list[sa.Column]:
+    ad_platform_enum = pg.ENUM(
+        "meta",
+        "google",
+        "tiktok",
+        name="ad_platform",
+        create_type=False,
+    )
+    audit_actor_enum = pg.ENUM("user", "system", name="audit_actor_type", create_type=False)
+    return [
+        sa.Column("id", pg.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "org_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "actor_user_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("users.id"),
+            nullable=True,
+        ),
+        sa.Column("actor_type", audit_actor_enum, nullable=False),
+        sa.Column("action_type", sa.String(length=64), nullable=False),
+        sa.Column("entity_type", sa.String(length=32), nullable=True),
+        sa.Column("entity_id", sa.String(length=255), nullable=True),
+        sa.Column("platform", ad_platform_enum, nullable=True),
+        sa.Column("rule_id", pg.UUID(as_uuid=True), nullable=True),
+        sa.Column("metric_snapshot_json", pg.JSONB(), nullable=True),
+        sa.Column("api_request_json", pg.JSONB(), nullable=True),
+        sa.Column("api_response_code", sa.Integer(), nullable=True),
+        sa.Column("api_response_json", pg.JSONB(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pfam_ensure_monthly_range_partitions(
+            parent text, from_month date, months integer
+        ) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            n integer;
+            month_start date;
+            part_name text;
+        BEGIN
+            FOR n IN 0 .. months - 1 LOOP
+                month_start := (date_trunc('month', from_month)
+                                + make_interval(months => n))::date;
+                part_name := format('%s_%s', parent, to_char(month_start, 'YYYY_MM'));
+                IF to_regclass(part_name) IS NULL THEN
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                        part_name, parent, month_start,
+                        (month_start + interval '1 month')::date
+                    );
+                END IF;
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+    op.drop_index("ix_audit_log_org_created", table_name="audit_log")
+    op.rename_table("audit_log", "audit_log_unpartitioned")
+
+    op.create_table(
+        "audit_log",
+        *_audit_columns(),
+        # The partition key must be part of the primary key.
+        sa.PrimaryKeyConstraint("created_at", "id", name="pk_audit_log"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+    op.execute(
+        "SELECT pfam_ensure_monthly_range_partitions('audit_log', "
+        f"(date_trunc('month', now()) - interval '{MONTHS_BACK} months')::date, "
+        f"{MONTHS_BACK + MONTHS_AHEAD + 1})"
+    )
+    op.create_index("ix_audit_log_org_created", "audit_log", ["org_id", "created_at"])
+    op.create_index(
+        "ix_audit_log_created_brin", "audit_log", ["created_at"], postgresql_using="brin"
+    )
+
+    op.execute(
+        f"INSERT INTO audit_log ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM audit_log_unpartitioned"
+    )
+    op.drop_table("audit_log_unpartitioned")
+
+
+def downgrade() -> None:
+    op.rename_table("audit_log", "audit_log_partitioned")
+    op.create_table(
+        "audit_log",
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint("id", name="audit_log_pkey"),
+    )
+    op.execute(
+        f"INSERT INTO audit_log ({_COLUMNS}) "
+        f"SELECT {_COLUMNS} FROM audit_log_partitioned"
+    )
+    # Dropping a partitioned parent drops all of its partitions.
+    op.drop_table("audit_log_partitioned")
+    op.create_index("ix_audit_log_org_created", "audit_log", ["org_id", "created_at"])
+    op.execute("DROP FUNCTION IF EXISTS pfam_ensure_monthly_range_partitions(text, date, integer)")
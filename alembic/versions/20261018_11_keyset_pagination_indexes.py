@@ -0,0 +1,85 @@
+"""Indexes for keyset-paginated listings.
+
+- audit_log: (org_id, created_at, id) replaces (org_id, created_at), so
+  the /audit-log cursor seek and its id tie-break come from the index.
+- attributed_orders: (org_id, ad_set_id, created_at, id) replaces
+  (org_id, ad_set_id) for /campaigns/{id}/attributed-orders, and INCLUDEs
+  every other column the listing selects, so pages come from an
+  index-only scan.
+- profit_metrics: the (org_id, window_type, window_start) index now
+  INCLUDEs ad_set_id and the money columns, so /campaigns and
+  /dashboard/overview aggregate with an index-only scan.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_11_keyset_pagination_indexes"
+down_revision: Union[str, None] = "20261018_10_audit_log_monthly_partitions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ATTRIBUTED_ORDER_LISTED = [
+    "order_id",
+    "attribution_tier",
+    "confidence_score",
+    "attribution_method",
+    "attributed_revenue_cents",
+]
+
+PROFIT_METRIC_TOTALS = [
+    "ad_set_id",
+    "spend_cents",
+    "attributed_revenue_cents",
+    "attributed_cogs_cents",
+    "estimated_returns_cents",
+    "platform_fees_cents",
+    "net_profit_cents",
+    "order_count",
+]
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_audit_log_org_created_id", "audit_log", ["org_id", "created_at", "id"]
+    )
+    op.drop_index("ix_audit_log_org_created", table_name="audit_log")
+
+    op.create_index(
+        "ix_attributed_orders_org_ad_set_created",
+        "attributed_orders",
+        ["org_id", "ad_set_id", "created_at", "id"],
+        postgresql_include=ATTRIBUTED_ORDER_LISTED,
+    )
+    op.drop_index("ix_attributed_orders_org_ad_set", table_name="attributed_orders")
+
+    op.create_index(
+        "ix_profit_metrics_org_window_totals",
+        "profit_metrics",
+        ["org_id", "window_type", "window_start"],
+        postgresql_include=PROFIT_METRIC_TOTALS,
+    )
+    op.drop_index("ix_profit_metrics_org_window", table_name="profit_metrics")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_profit_metrics_org_window",
+        "profit_metrics",
+        ["org_id", "window_type", "window_start"],
+    )
+    op.drop_index("ix_profit_metrics_org_window_totals", table_name="profit_metrics")
+
+    op.create_index(
+        "ix_attributed_orders_org_ad_set", "attributed_orders", ["org_id", "ad_set_id"]
+    )
+    op.drop_index(
+        "ix_attributed_orders_org_ad_set_created", table_name="attributed_orders"
+    )
+
+    op.create_index("ix_audit_log_org_created", "audit_log", ["org_id", "created_at"])
+    op.drop_index("ix_audit_log_org_created_id", table_name="audit_log")
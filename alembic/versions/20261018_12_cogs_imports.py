@@ -0,0 +1,70 @@
+"""Track COGS CSV imports.
+
+- cogs_imports: one row per uploaded CSV (status, staged object key, row
+  counts and the first rejected rows), written by POST /cogs/import and
+  the import worker.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql as pg
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_12_cogs_imports"
+down_revision: Union[str, None] = "20261018_11_keyset_pagination_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    status_enum = sa.Enum(
+        "queued", "running", "succeeded", "failed", name="cogs_import_status"
+    )
+    op.create_table(
+        "cogs_imports",
+        sa.Column("id", pg.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "org_id",
+            pg.UUID(as_uuid=True),
+            sa.ForeignKey("organizations.id"),
+            nullable=False,
+        ),
+        sa.Column("status", status_enum, nullable=False),
+        sa.Column("object_key", sa.String(length=512), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("rows_total", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("rows_invalid", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column("skus_changed", sa.BigInteger(), server_default="0", nullable=False),
+        sa.Column(
+            "row_errors_json",
+            pg.JSONB(),
+            server_default=sa.text("'[]'::jsonb"),
+            nullable=False,
+        ),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.create_index("ix_cogs_imports_org_created", "cogs_imports", ["org_id", "created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cogs_imports_org_created", table_name="cogs_imports")
+    op.drop_table("cogs_imports")
+    bind = op.get_bind()
+    sa.Enum(name="cogs_import_status").drop(bind, checkfirst=True)
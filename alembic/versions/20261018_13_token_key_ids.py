@@ -0,0 +1,40 @@
+"""Record which AES key encrypted each OAuth token.
+
+- stores.access_token_key_id / ad_accounts.access_token_key_id: key id
+  for access_token_enc, so keys can be rotated in batches while old and
+  new keys are both loaded. Existing rows were written with the original
+  key, "k1".
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_13_token_key_ids"
+down_revision: Union[str, None] = "20261018_12_cogs_imports"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TOKEN_TABLES = ("stores", "ad_accounts")
+
+
+def upgrade() -> None:
+    for table in TOKEN_TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                "access_token_key_id",
+                sa.String(32),
+                nullable=False,
+                server_default="k1",
+            ),
+        )
+
+
+def downgrade() -> None:
+    for table in TOKEN_TABLES:
+        op.drop_column(table, "access_token_key_id")
@@ -0,0 +1,132 @@
+"""Let pfam_ensure_monthly_partitions() create months the DEFAULT already holds.
+
+- pfam_ensure_monthly_partitions(): when a hash partition's DEFAULT
+  sub-partition already has rows for a missing month (written before the
+  month was created), CREATE TABLE ... PARTITION OF fails. The function now
+  moves those rows into a standalone table and ATTACHes it as the month.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "20261018_14_monthly_partitions_from_default"
+down_revision: Union[str, None] = "20261018_13_token_key_ids"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pfam_ensure_monthly_partitions(
+            parent text, from_month date, months integer
+        ) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            child record;
+            n integer;
+            month_start date;
+            month_end date;
+            part_name text;
+            in_default boolean;
+        BEGIN
+            -- Range sub-partitions hang off each hash partition of `parent`.
+            FOR child IN
+                SELECT c.relname, pt.partdefid, a.attname AS range_column
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                JOIN pg_partitioned_table pt ON pt.partrelid = c.oid
+                JOIN pg_attribute a
+                  ON a.attrelid = c.oid AND a.attnum = pt.partattrs[0]
+                WHERE p.relname = parent AND c.relkind = 'p'
+            LOOP
+                FOR n IN 0 .. months - 1 LOOP
+                    month_start := (date_trunc('month', from_month)
+                                    + make_interval(months => n))::date;
+                    month_end := (month_start + interval '1 month')::date;
+                    part_name := format('%s_%s', child.relname,
+                                        to_char(month_start, 'YYYY_MM'));
+                    CONTINUE WHEN to_regclass(part_name) IS NOT NULL;
+
+                    in_default := false;
+                    IF child.partdefid <> 0 THEN
+                        EXECUTE format(
+                            'SELECT EXISTS (SELECT 1 FROM %s WHERE %I >= %L AND %I < %L)',
+                            child.partdefid::regclass, child.range_column, month_start,
+                            child.range_column, month_end
+                        ) INTO in_default;
+                    END IF;
+
+                    IF in_default THEN
+                        -- The DEFAULT may not keep rows of a new partition's
+                        -- range: move them out, then attach them as the month.
+                        EXECUTE format(
+                            'CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                            part_name, child.relname
+                        );
+                        EXECUTE format(
+                            'WITH moved AS (DELETE FROM %s WHERE %I >= %L AND %I < %L '
+                            'RETURNING *) INSERT INTO %I SELECT * FROM moved',
+                            child.partdefid::regclass, child.range_column, month_start,
+                            child.range_column, month_end, part_name
+                        );
+                        EXECUTE format(
+                            'ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                            child.relname, part_name, month_start, month_end
+                        );
+                    ELSE
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                            part_name, child.relname, month_start, month_end
+                        );
+                    END IF;
+                END LOOP;
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pfam_ensure_monthly_partitions(
+            parent text, from_month date, months integer
+        ) RETURNS void
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            child record;
+            n integer;
+            month_start date;
+            part_name text;
+        BEGIN
+            FOR child IN
+                SELECT c.relname
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                JOIN pg_class p ON p.oid = i.inhparent
+                WHERE p.relname = parent AND c.relkind = 'p'
+            LOOP
+                FOR n IN 0 .. months - 1 LOOP
+                    month_start := (date_trunc('month', from_month)
+                                    + make_interval(months => n))::date;
+                    part_name := format('%s_%s', child.relname,
+                                        to_char(month_start, 'YYYY_MM'));
+                    IF to_regclass(part_name) IS NULL THEN
+                        EXECUTE format(
+                            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                            part_name, child.relname, month_start,
+                            (month_start + interval '1 month')::date
+                        );
+                    END IF;
+                END LOOP;
+            END LOOP;
+        END
+        $$
+        """
+    )
@@ -1,14 +1,17 @@
+import hashlib
 import os
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
-import httpx
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt, jwk
 from jose.utils import base64url_decode
 
+from app.jwks import JWKSKeyStore
+
 
 CLERK_JWT_ISSUER_URL = os.getenv("CLERK_JWT_ISSUER_URL")
 CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL")
@@ -21,10 +24,49 @@ if not CLERK_JWKS_URL:
 
 security = HTTPBearer(auto_error=False)
 
-_jwks_cache: Optional[Dict[str, Any]] = None
-_jwks_fetched_at: Optional[float] = None
 _JWKS_TTL_SECONDS = 300.0
 
+jwks_store = JWKSKeyStore(CLERK_JWKS_URL, refresh_after=_JWKS_TTL_SECONDS * 0.8)
+
+# Constructed public keys, keyed by `kid`. Bounded and expired on the same
+# TTL as the JWKS document so rotated keys drop out on their own.
+_PUBLIC_KEY_CACHE_MAX = 32
+# Already-verified claims, keyed by a SHA-256 digest of the raw token (the
+# token itself is never kept). Entries expire at the token's `exp`.
+_CLAIMS_CACHE_MAX = 4096
+
+
+class _TTLCache:
+    """Small bounded LRU whose entries each carry their own expiry time."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_public_key_cache = _TTLCache(_PUBLIC_KEY_CACHE_MAX)
+_claims_cache = _TTLCache(_CLAIMS_CACHE_MAX)
+
 
 @dataclass
 class CurrentUser:
@@ -36,25 +78,6 @@ class CurrentUser:
     role: Optional[str] = None
 
 
-async def _get_jwks() -> Dict[str, Any]:
-    """Fetch and cache Clerk JWKS."""
-    global _jwks_cache, _jwks_fetched_at
-
-    if _jwks_cache and _jwks_fetched_at:
-        if time.time() - _jwks_fetched_at < _JWKS_TTL_SECONDS:
-            return _jwks_cache
-
-    if not CLERK_JWKS_URL:
-        raise RuntimeError("CLERK_JWKS_URL is not configured")
-
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        resp = await client.get(CLERK_JWKS_URL)
-        resp.raise_for_status()
-        _jwks_cache = resp.json()
-        _jwks_fetched_at = time.time()
-        return _jwks_cache
-
-
 def _get_token_from_header(
     credentials: Optional[HTTPAuthorizationCredentials],
 ) -> str:
@@ -66,7 +89,7 @@ def _get_token_from_header(
     return credentials.credentials
 
 
-def _select_jwk(token: str, jwks: Dict[str, Any]) -> Dict[str, Any]:
+def _get_token_kid(token: str) -> str:
     try:
         headers = jwt.get_unverified_header(token)
     except Exception:
@@ -82,15 +105,40 @@ def _select_jwk(token: str, jwks: Dict[str, Any]) -> Dict[str, Any]:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token header",
         )
+    return kid
+
+
+async def _select_jwk(token: str) -> Dict[str, Any]:
+    key = await jwks_store.get_key(_get_token_kid(token))
+    if key is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No matching JWK for token",
+        )
+    return key
 
-    for key in jwks.get("keys", []):
-        if key.get("kid") == kid:
-            return key
 
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="No matching JWK for token",
-    )
+def _get_public_key(key_dict: Dict[str, Any]) -> Any:
+    """Return the constructed public key for a JWK, reusing it per `kid`."""
+    kid = key_dict.get("kid")
+    public_key = _public_key_cache.get(kid) if kid else None
+    if public_key is None:
+        public_key = jwk.construct(key_dict, algorithm=key_dict.get("alg"))
+        if kid:
+            _public_key_cache.set(kid, public_key, time.time() + _JWKS_TTL_SECONDS)
+    return public_key
+
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _cache_verified_claims(digest: str, claims: Dict[str, Any]) -> None:
+    exp = claims.get("exp")
+    if exp is None:
+        # Without an expiry there is no safe point to drop the entry.
+        return
+    _claims_cache.set(digest, claims, float(exp))
 
 
 def _verify_signature(token: str, key_dict: Dict[str, Any]) -> Dict[str, Any]:
@@ -100,7 +148,7 @@ def _verify_signature(token: str, key_dict: Dict[str, Any]) -> Dict[str, Any]:
     We do explicit signature verification so we don't accidentally skip checks.
     """
     try:
-        public_key = jwk.construct(key_dict, algorithm=key_dict.get("alg"))
+        public_key = _get_public_key(key_dict)
         message, encoded_sig = token.rsplit(".", 1)
         decoded_sig = base64url_decode(encoded_sig.encode())
 
@@ -149,9 +197,14 @@ async def get_current_user(
     - Raises 401 on any validation error.
     """
     token = _get_token_from_header(credentials)
-    jwks = await _get_jwks()
-    key_dict = _select_jwk(token, jwks)
-    claims = _verify_signature(token, key_dict)
+
+    # Repeat requests with the same token skip JWKS lookup and RSA verify.
+    digest = _token_digest(token)
+    claims = _claims_cache.get(digest)
+    if claims is None:
+        key_dict = await _select_jwk(token)
+        claims = _verify_signature(token, key_dict)
+        _cache_verified_claims(digest, claims)
 
     org_id = claims.get("org_id")
     if not org_id:
@@ -0,0 +1,267 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Mapping, Optional, Set, Tuple
+
+from fastapi import Request, Response, status
+from redis.asyncio import Redis
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Entries are keyed by generation, so TTLs only bound memory, not staleness.
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600"))
+RESPONSE_CACHE_LOCAL_MAX = int(os.getenv("RESPONSE_CACHE_LOCAL_MAX", "1024"))
+
+_INVALIDATE_KEY = "response_cache_invalidate_orgs"
+
+
+class _LRU:
+    """Bounded in-process LRU with one TTL for every entry."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def normalize_params(params: Mapping[str, Any]) -> str:
+    """Stable text form of query params: None dropped, keys sorted."""
+    return json.dumps(
+        {k: str(v) for k, v in sorted(params.items()) if v is not None},
+        separators=(",", ":"),
+    )
+
+
+class ResponseCache:
+    """
+    Per-org cache of rendered JSON responses: an in-process LRU in front of
+    Redis.
+
+    Every org has a generation counter in Redis; it is part of every key
+    and ETag, so bumping it (one INCR when a profit run commits) invalidates
+    all of the org's cached responses at once. Without Redis nothing is
+    cached: a process-local generation would never see the bumps made by
+    worker processes.
+    """
+
+    def __init__(
+        self,
+        redis: Optional[Redis] = None,
+        *,
+        key_prefix: str = "respcache",
+        local_max: int = RESPONSE_CACHE_LOCAL_MAX,
+        ttl: int = RESPONSE_CACHE_TTL_SECONDS,
+    ) -> None:
+        self._redis = redis
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self._local = _LRU(local_max, ttl)
+
+    @classmethod
+    def from_url(cls, url: Optional[str] = REDIS_URL, **kwargs) -> "ResponseCache":
+        return cls(Redis.from_url(url) if url else None, **kwargs)
+
+    def _generation_key(self, org_id: uuid.UUID) -> str:
+        return f"{self.key_prefix}:{org_id}:generation"
+
+    async def _seed_generation(self, key: str) -> None:
+        """
+        Start a missing counter at the current time in microseconds. If Redis
+        lost the key, restarting from 0 would bring back old ETags and old
+        entries still in the local LRU; a time-based start never reuses them.
+        """
+        await self._redis.set(key, time.time_ns() // 1000, nx=True)
+
+    async def generation(self, org_id: uuid.UUID) -> int:
+        """The org's current generation, or -1 to serve uncached."""
+        if self._redis is None:
+            return -1
+        key = self._generation_key(org_id)
+        try:
+            value = await self._redis.get(key)
+            if value is None:
+                await self._seed_generation(key)
+                value = await self._redis.get(key)
+            return int(value) if value is not None else -1
+        except Exception as exc:
+            # Cache-only failure: serve uncached rather than fail the request.
+            logger.warning("response cache: generation read failed: %s", exc)
+            return -1
+
+    async def bump_generation(self, org_id: uuid.UUID) -> None:
+        """Invalidate every cached response of the org."""
+        if self._redis is None:
+            return
+        key = self._generation_key(org_id)
+        await self._seed_generation(key)
+        await self._redis.incr(key)
+
+    def entry_key(
+        self, org_id: uuid.UUID, endpoint: str, params: Mapping[str, Any], generation: int
+    ) -> str:
+        digest = hashlib.sha256(
+            f"{endpoint}?{normalize_params(params)}".encode()
+        ).hexdigest()[:32]
+        return f"{self.key_prefix}:{org_id}:{generation}:{digest}"
+
+    @staticmethod
+    def etag(entry_key: str) -> str:
+        return '"' + hashlib.sha256(entry_key.encode()).hexdigest()[:32] + '"'
+
+    async def get(self, key: str) -> Optional[bytes]:
+        body = self._local.get(key)
+        if body is not None or self._redis is None:
+            return body
+        try:
+            body = await self._redis.get(key)
+        except Exception as exc:
+            logger.warning("response cache: redis get failed: %s", exc)
+            return None
+        if body is not None:
+            self._local.set(key, body)
+        return body
+
+    async def set(self, key: str, body: bytes) -> None:
+        self._local.set(key, body)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(key, body, ex=self.ttl)
+        except Exception as exc:
+            logger.warning("response cache: redis set failed: %s", exc)
+
+
+response_cache = ResponseCache.from_url()
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+async def cached_json(
+    request: Request,
+    org_id: uuid.UUID,
+    endpoint: str,
+    params: Mapping[str, Any],
+    compute: Callable[[], Awaitable[Any]],
+    *,
+    cache: Optional[ResponseCache] = None,
+) -> Response:
+    """
+    Serve `compute()`'s JSON through the cache.
+
+    A matching If-None-Match gets a 304 after one generation read; a hit in
+    either tier skips `compute()` (and Postgres) entirely.
+    """
+    cache = cache or response_cache
+    generation = await cache.generation(org_id)
+    if generation < 0:
+        return Response(content=json.dumps(await compute()), media_type="application/json")
+
+    key = cache.entry_key(org_id, endpoint, params, generation)
+    etag = cache.etag(key)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    body = await cache.get(key)
+    if body is None:
+        body = json.dumps(await compute(), separators=(",", ":")).encode()
+        await cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def invalidate_on_commit(session: AsyncSession, org_id: uuid.UUID) -> None:
+    """
+    Bump the org's cache generation once `session` commits (awaited when
+    the caller commits with `commit_and_invalidate`).
+
+    Bumping only after commit means a request can never cache pre-commit
+    data under the new generation. A rollback discards the request.
+    """
+    session.info.setdefault(_INVALIDATE_KEY, set()).add(org_id)
+
+
+async def commit_and_invalidate(session: AsyncSession) -> None:
+    """
+    Commit, then bump the generation of every org marked with
+    `invalidate_on_commit`, awaiting the bumps.
+
+    Use it wherever the caller can await (Celery tasks in particular:
+    `run_async` returns as soon as the task coroutine does, so a bump left
+    to the after_commit hook could sit on the worker's loop until its next
+    task). A failed bump is logged and does not fail the commit; entries
+    then expire after RESPONSE_CACHE_TTL_SECONDS.
+    """
+    orgs = session.info.pop(_INVALIDATE_KEY, None)
+    await session.commit()
+    for org_id in orgs or ():
+        try:
+            await response_cache.bump_generation(org_id)
+        except Exception:
+            logger.exception("response cache: generation bump failed org=%s", org_id)
+
+
+_pending_bumps: Set[asyncio.Task] = set()
+
+
+def _bump_done(task: asyncio.Task) -> None:
+    _pending_bumps.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(
+            "response cache: generation bump failed", exc_info=task.exception()
+        )
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session) -> None:
+    # Fallback for plain `session.commit()`; prefer commit_and_invalidate.
+    orgs = session.info.pop(_INVALIDATE_KEY, None)
+    if not orgs:
+        return
+    # AsyncSession commits run in a greenlet on the event loop's thread.
+    loop = asyncio.get_running_loop()
+    for org_id in orgs:
+        task = loop.create_task(response_cache.bump_generation(org_id))
+        _pending_bumps.add(task)
+        task.add_done_callback(_bump_done)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_rollback(session: Session) -> None:
+    session.info.pop(_INVALIDATE_KEY, None)
@@ -1,11 +1,18 @@
 import logging
 import os
-from typing import AsyncIterator, Optional
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Annotated, Any, AsyncIterator, Dict, Optional
 
 from dotenv import load_dotenv
+from fastapi import Depends
 from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
 
 
 logger = logging.getLogger(__name__)
@@ -14,22 +21,343 @@ load_dotenv()
 
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# Optional read replica for dashboard reads; unset means reads use the primary.
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "30"))
 
 
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
 
 
+DB_POOL_PROFILE = os.getenv("DB_POOL_PROFILE", "api")
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    """Connection-pool settings for one kind of process (API, worker, ...)."""
+
+    name: str
+    pool_size: int
+    max_overflow: int
+    pool_recycle: int
+    pool_timeout: float
+    pool_pre_ping: bool
+    # asyncpg prepared-statement cache per connection; 0 disables it.
+    statement_cache_size: int = 100
+    # Open and close a connection per checkout instead of pooling.
+    use_null_pool: bool = False
+
+
+# Sizes are per process. Neon sits behind PgBouncer, so many small pools
+# multiplexed by the bouncer beat a few large ones.
+POOL_PROFILES: Dict[str, PoolProfile] = {
+    "api": PoolProfile(
+        name="api",
+        pool_size=5,
+        max_overflow=10,
+        pool_recycle=300,
+        pool_timeout=10.0,
+        pool_pre_ping=True,
+    ),
+    "worker": PoolProfile(
+        name="worker",
+        pool_size=2,
+        max_overflow=3,
+        pool_recycle=300,
+        pool_timeout=30.0,
+        pool_pre_ping=True,
+    ),
+    "migration": PoolProfile(
+        name="migration",
+        pool_size=0,
+        max_overflow=0,
+        pool_recycle=-1,
+        pool_timeout=30.0,
+        pool_pre_ping=False,
+        use_null_pool=True,
+    ),
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _uses_pgbouncer(url: Optional[str]) -> bool:
+    """
+    PgBouncer in transaction mode cannot keep named prepared statements.
+
+    Neon's pooled endpoints have "-pooler" in the host name; DB_PGBOUNCER
+    overrides the detection either way.
+    """
+    flag = os.getenv("DB_PGBOUNCER")
+    if flag not in (None, ""):
+        return flag.lower() in ("1", "true", "yes")
+    return bool(url) and "-pooler" in url
+
+
+def get_pool_profile(name: Optional[str] = None) -> PoolProfile:
+    """
+    Resolve a named profile, applying DB_POOL_* environment overrides.
+
+    Raises RuntimeError for an unknown profile name.
+    """
+    name = name or DB_POOL_PROFILE
+    try:
+        profile = POOL_PROFILES[name]
+    except KeyError:
+        raise RuntimeError(f"Unknown DB_POOL_PROFILE: {name!r}")
+
+    return PoolProfile(
+        name=profile.name,
+        pool_size=_env_int("DB_POOL_SIZE", profile.pool_size),
+        max_overflow=_env_int("DB_MAX_OVERFLOW", profile.max_overflow),
+        pool_recycle=_env_int("DB_POOL_RECYCLE", profile.pool_recycle),
+        pool_timeout=_env_float("DB_POOL_TIMEOUT", profile.pool_timeout),
+        pool_pre_ping=profile.pool_pre_ping,
+        statement_cache_size=_env_int(
+            "DB_STATEMENT_CACHE_SIZE", profile.statement_cache_size
+        ),
+        use_null_pool=profile.use_null_pool,
+    )
+
+
+class PoolStats:
+    """Running counters for one engine's pool, safe to read from any thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.pool: Optional[Pool] = None
+        self.acquires = 0
+        self.acquire_timeouts = 0
+        self.acquire_seconds_total = 0.0
+        self.acquire_seconds_max = 0.0
+        self.connects = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+
+    def record_acquire(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.acquires += 1
+            self.acquire_timeouts += int(timed_out)
+            self.acquire_seconds_total += seconds
+            self.acquire_seconds_max = max(self.acquire_seconds_max, seconds)
+
+    def record_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.connects += 1
+            self.connect_seconds_total += seconds
+            self.connect_seconds_max = max(self.connect_seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Current pool state plus cumulative timings.
+
+        `acquire_ms_*` is the time spent waiting for a pooled connection and
+        includes `connect_ms_*` whenever the checkout had to open a new one.
+        """
+        with self._lock:
+            data: Dict[str, Any] = {
+                "acquires": self.acquires,
+                "acquire_timeouts": self.acquire_timeouts,
+                "acquire_ms_avg": (
+                    self.acquire_seconds_total * 1000 / self.acquires
+                    if self.acquires
+                    else 0.0
+                ),
+                "acquire_ms_max": self.acquire_seconds_max * 1000,
+                "connects": self.connects,
+                "connect_ms_avg": (
+                    self.connect_seconds_total * 1000 / self.connects
+                    if self.connects
+                    else 0.0
+                ),
+                "connect_ms_max": self.connect_seconds_max * 1000,
+            }
+
+        pool = self.pool
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update(
+                {
+                    "pool_size": pool.size(),
+                    "checked_out": pool.checkedout(),
+                    "idle": pool.checkedin(),
+                    # Negative until the base pool is full, like QueuePool.
+                    "overflow": pool.overflow(),
+                    "max_overflow": pool._max_overflow,
+                }
+            )
+        return data
+
+
+def _instrumented_pool_class(base: type, stats: PoolStats) -> type:
+    """
+    Subclass a pool class so checkouts and connects feed `stats`.
+
+    A generated class (rather than instance state) survives Pool.recreate(),
+    which SQLAlchemy calls on dispose and after invalidation.
+    """
+
+    class InstrumentedPool(base):  # type: ignore[misc, valid-type]
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            stats.pool = self
+
+        def _do_get(self) -> Any:
+            start = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except PoolTimeoutError:
+                stats.record_acquire(time.perf_counter() - start, timed_out=True)
+                raise
+            except Exception:
+                # e.g. the server refused a new connection; not a pool timeout.
+                stats.record_acquire(time.perf_counter() - start)
+                raise
+            stats.record_acquire(time.perf_counter() - start)
+            return conn
+
+        def _create_connection(self) -> Any:
+            start = time.perf_counter()
+            conn = super()._create_connection()
+            stats.record_connect(time.perf_counter() - start)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
+
+
+def engine_options(
+    profile: PoolProfile,
+    url: Optional[str] = DATABASE_URL,
+    stats: Optional[PoolStats] = None,
+) -> Dict[str, Any]:
+    """Keyword arguments for `create_async_engine` under `profile`."""
+    connect_args: Dict[str, Any] = {
+        "prepared_statement_cache_size": profile.statement_cache_size,
+    }
+    if _uses_pgbouncer(url):
+        # Statements prepared on one server connection may be executed on
+        # another, so disable both caches and use unique statement names.
+        connect_args.update(
+            {
+                "prepared_statement_cache_size": 0,
+                "statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+            }
+        )
+
+    base_pool = NullPool if profile.use_null_pool else AsyncAdaptedQueuePool
+    options: Dict[str, Any] = {
+        "future": True,
+        "echo": False,
+        "connect_args": connect_args,
+        "poolclass": (
+            _instrumented_pool_class(base_pool, stats) if stats else base_pool
+        ),
+    }
+    if not profile.use_null_pool:
+        options.update(
+            {
+                "pool_size": profile.pool_size,
+                "max_overflow": profile.max_overflow,
+                "pool_recycle": profile.pool_recycle,
+                "pool_timeout": profile.pool_timeout,
+                "pool_pre_ping": profile.pool_pre_ping,
+            }
+        )
+    return options
+
+
+pool_stats = PoolStats()
+
 engine = (
-    create_async_engine(DATABASE_URL, future=True, echo=False)
+    create_async_engine(
+        DATABASE_URL, **engine_options(get_pool_profile(), DATABASE_URL, pool_stats)
+    )
     if DATABASE_URL
     else None
 )
 
+replica_pool_stats = PoolStats()
+
+replica_engine = (
+    create_async_engine(
+        DATABASE_REPLICA_URL,
+        **engine_options(
+            get_pool_profile(), DATABASE_REPLICA_URL, replica_pool_stats
+        ),
+    )
+    if DATABASE_REPLICA_URL
+    else None
+)
+
 async_session_maker: Optional[async_sessionmaker[AsyncSession]] = (
     async_sessionmaker(engine, expire_on_commit=False) if engine is not None else None
 )
 
+replica_session_maker: Optional[async_sessionmaker[AsyncSession]] = (
+    async_sessionmaker(replica_engine, expire_on_commit=False)
+    if replica_engine is not None
+    else None
+)
+
+
+@dataclass
+class ReplicaStatus:
+    """Last observed replica health, refreshed by the health prober."""
+
+    available: bool = True
+    lag_seconds: Optional[float] = None
+    checked_at: Optional[float] = None
+
+    def usable(self) -> bool:
+        if not self.available:
+            return False
+        return self.lag_seconds is None or self.lag_seconds <= DB_REPLICA_MAX_LAG_SECONDS
+
+
+replica_status = ReplicaStatus()
+
+# Zero when the replica has replayed everything it received, so an idle
+# primary does not make the replica look behind.
+_REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+
+async def check_replica() -> ReplicaStatus:
+    """Measure replica lag and update `replica_status` (no-op without a replica)."""
+    if replica_engine is None:
+        return replica_status
+
+    try:
+        async with replica_engine.connect() as conn:
+            lag = (await conn.execute(_REPLICA_LAG_SQL)).scalar_one()
+    except Exception as exc:
+        logger.warning("Read replica check failed: %s", exc)
+        replica_status.available = False
+    else:
+        replica_status.available = True
+        replica_status.lag_seconds = float(lag)
+    replica_status.checked_at = time.time()
+    return replica_status
+
 
 async def get_db() -> AsyncIterator[AsyncSession]:
     """
@@ -41,24 +369,67 @@ async def get_db() -> AsyncIterator[AsyncSession]:
         raise RuntimeError("DATABASE_URL is not configured")
 
     async with async_session_maker() as session:
+        session.info["intent"] = "write"
         yield session
 
 
-async def check_database_health() -> bool:
+async def get_read_db() -> AsyncIterator[AsyncSession]:
     """
-    Try a trivial `SELECT 1` to confirm DB connectivity.
+    FastAPI dependency that yields a session for read-only work.
 
-    Returns False if DATABASE_URL is missing or query fails.
+    Routes to the read replica when one is configured, reachable and within
+    DB_REPLICA_MAX_LAG_SECONDS; otherwise falls back to the primary. Never
+    write through this session.
     """
+    if replica_session_maker is not None and replica_status.usable():
+        async with replica_session_maker() as session:
+            try:
+                # Connect eagerly so an unreachable replica can still fall back.
+                await session.connection()
+            except Exception as exc:
+                logger.warning("Read replica unavailable, using primary: %s", exc)
+                replica_status.available = False
+            else:
+                session.info["intent"] = "read"
+                yield session
+                return
+
     if async_session_maker is None:
-        logger.warning("Database health check: async_session_maker is None")
-        return False
+        raise RuntimeError("DATABASE_URL is not configured")
+
+    async with async_session_maker() as session:
+        session.info["intent"] = "read"
+        yield session
+
+
+# Routes declare intent through their parameter type, e.g.
+# `async def overview(db: ReadSession)` or `async def create(db: WriteSession)`.
+ReadSession = Annotated[AsyncSession, Depends(get_read_db)]
+WriteSession = Annotated[AsyncSession, Depends(get_db)]
+
+
+async def ping_database() -> float:
+    """
+    Run `SELECT 1` on a pooled connection and return the round-trip seconds.
+
+    Raises RuntimeError if DATABASE_URL is missing; driver errors propagate.
+    """
+    if engine is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+
+    start = time.perf_counter()
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return time.perf_counter() - start
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Live statistics for the primary engine's connection pool."""
+    return {"profile": get_pool_profile().name, **pool_stats.snapshot()}
 
-    try:
-        async with async_session_maker() as session:
-            await session.execute(text("SELECT 1"))
-        return True
-    except Exception as exc:
-        logger.exception("Database health check failed", exc_info=exc)
-        return False
 
+def get_replica_pool_stats() -> Optional[Dict[str, Any]]:
+    """Live statistics for the read replica's pool, or None without a replica."""
+    if replica_engine is None:
+        return None
+    return {"profile": get_pool_profile().name, **replica_pool_stats.snapshot()}
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from app.db import (
+    DATABASE_URL,
+    DATABASE_REPLICA_URL,
+    check_replica,
+    get_pool_stats,
+    ping_database,
+    replica_status,
+)
+
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PROBE_INTERVAL_SECONDS = float(os.getenv("HEALTH_PROBE_INTERVAL_SECONDS", "15"))
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "5"))
+
+
+@dataclass
+class HealthSnapshot:
+    """Last known state of the app's dependencies, as served by the probes."""
+
+    database: str = "unknown"
+    checked_at: Optional[float] = None
+    last_ok_at: Optional[float] = None
+    consecutive_failures: int = 0
+    latency_ms: Dict[str, Optional[float]] = field(default_factory=dict)
+    pool: Dict[str, Any] = field(default_factory=dict)
+    replica: Optional[Dict[str, Any]] = None
+
+
+def _percentile(sorted_values: list[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile; plenty for a window of a few hundred samples.
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class HealthProber:
+    """
+    Background task that checks the database on an interval.
+
+    `/health/*` endpoints read `snapshot()` and never touch the database
+    themselves, so probe traffic does not load Postgres or the pool and a
+    cold-starting Neon compute cannot make the probes hang.
+    """
+
+    def __init__(
+        self,
+        interval: float = HEALTH_PROBE_INTERVAL_SECONDS,
+        timeout: float = HEALTH_PROBE_TIMEOUT_SECONDS,
+        window: int = 240,
+    ) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._snapshot = HealthSnapshot()
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe_once(self) -> HealthSnapshot:
+        now = time.time()
+        snapshot = self._snapshot
+        snapshot.checked_at = now
+
+        if not DATABASE_URL:
+            snapshot.database = "unavailable"
+        else:
+            try:
+                latency = await asyncio.wait_for(ping_database(), self.timeout)
+            except Exception as exc:
+                logger.warning("Database health probe failed: %s", exc)
+                snapshot.database = "unavailable"
+                snapshot.consecutive_failures += 1
+            else:
+                self._latencies.append(latency * 1000)
+                snapshot.database = "ok"
+                snapshot.last_ok_at = now
+                snapshot.consecutive_failures = 0
+
+        ordered = sorted(self._latencies)
+        snapshot.latency_ms = {
+            "p50": _percentile(ordered, 50),
+            "p95": _percentile(ordered, 95),
+            "p99": _percentile(ordered, 99),
+        }
+        if DATABASE_URL:
+            pool = get_pool_stats()
+            capacity = pool.get("pool_size", 0) + pool.get("max_overflow", 0)
+            pool["saturation"] = (
+                pool.get("checked_out", 0) / capacity if capacity else None
+            )
+            snapshot.pool = pool
+        if DATABASE_REPLICA_URL:
+            # Also decides whether get_read_db routes to the replica.
+            try:
+                replica = await asyncio.wait_for(check_replica(), self.timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Read replica check timed out")
+                replica_status.available = False
+                replica = replica_status
+            snapshot.replica = {
+                "available": replica.available,
+                "lag_seconds": replica.lag_seconds,
+                "usable": replica.usable(),
+            }
+        return snapshot
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.probe_once()
+            except Exception:
+                logger.exception("Health prober iteration failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def is_ready(self) -> bool:
+        """Ready once the last probe succeeded and is not older than 3 intervals."""
+        snapshot = self._snapshot
+        if snapshot.database != "ok" or snapshot.checked_at is None:
+            return False
+        return time.time() - snapshot.checked_at <= 3 * self.interval
+
+    def snapshot(self) -> Dict[str, Any]:
+        return asdict(self._snapshot)
+
+
+health_prober = HealthProber()
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+
+class JWKSKeyStore:
+    """
+    Process-wide cache of a JWKS document with single-flight refresh.
+
+    - One shared, connection-pooled `httpx.AsyncClient` for every fetch.
+    - Concurrent callers that need a refresh await the same in-flight fetch.
+    - Once keys are older than `refresh_after` seconds they are refreshed in
+      the background while the current (stale) keys keep being served.
+    - Callers only block on the network when there are no keys yet, the keys
+      are older than `max_stale` seconds, or a token carries an unknown `kid`.
+    - Unknown-`kid` refreshes are rate limited by `min_forced_interval` so
+      garbage tokens cannot be used to hammer the JWKS endpoint.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        *,
+        refresh_after: float = 240.0,
+        max_stale: float = 3600.0,
+        min_forced_interval: float = 10.0,
+        timeout: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.url = url
+        self.refresh_after = refresh_after
+        self.max_stale = max_stale
+        self.min_forced_interval = min_forced_interval
+        self._timeout = timeout
+        self._client = client
+        self._owns_client = client is None
+
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[float] = None
+        self._last_forced_at: float = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=2),
+            )
+        return self._client
+
+    async def _fetch(self) -> None:
+        if not self.url:
+            raise RuntimeError("CLERK_JWKS_URL is not configured")
+
+        resp = await self._get_client().get(self.url)
+        resp.raise_for_status()
+        keys = {
+            key["kid"]: key for key in resp.json().get("keys", []) if key.get("kid")
+        }
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def _start_refresh(self) -> asyncio.Task:
+        """Return the in-flight refresh, starting one if none is running."""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+            self._inflight.add_done_callback(self._log_refresh_failure)
+        return self._inflight
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("JWKS refresh failed", exc_info=task.exception())
+
+    async def refresh(self) -> None:
+        """Refresh now, joining any refresh that is already in flight."""
+        # Shield so one cancelled caller does not cancel the shared fetch.
+        await asyncio.shield(self._start_refresh())
+
+    async def get_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        """Return the JWK for `kid`, or None if the issuer does not publish it."""
+        now = time.monotonic()
+        age = None if self._fetched_at is None else now - self._fetched_at
+
+        if age is None or age >= self.max_stale:
+            await self.refresh()
+        elif age >= self.refresh_after:
+            self._start_refresh()
+
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        # Unknown kid: the issuer may have rotated keys since the last fetch.
+        if now - self._last_forced_at < self.min_forced_interval:
+            return None
+        self._last_forced_at = now
+        await self.refresh()
+        return self._keys.get(kid)
+
+    async def aclose(self) -> None:
+        if self._inflight is not None and not self._inflight.done():
+            self._inflight.cancel()
+        if self._client is not None and self._owns_client:
+            await self._client.aclose()
+            self._client = None
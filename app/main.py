@@ -1,9 +1,27 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
-from app.db import check_database_health
+from fastapi import Depends, FastAPI, Response, status
 
+from app.auth import CurrentUser, get_current_user, jwks_store
+from app.db import get_pool_stats
+from app.health import health_prober
+from app.routers import audit_log, cogs, dashboard, reports
 
-app = FastAPI(title="PFAM Backend", version="0.1.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    health_prober.start()
+    yield
+    await health_prober.stop()
+    await jwks_store.aclose()
+
+
+app = FastAPI(title="PFAM Backend", version="0.1.0", lifespan=lifespan)
+app.include_router(audit_log.router)
+app.include_router(cogs.router)
+app.include_router(dashboard.router)
+app.include_router(reports.router)
 
 
 @app.get("/health")
@@ -12,13 +30,38 @@ async def health_check() -> dict:
     Lightweight health check.
 
     - Always returns {"status": "ok"} when the app is running.
-    - If DATABASE_URL is configured, also attempts a trivial DB query.
+    - `database` reflects the background prober's last result; this
+      endpoint never queries the database itself.
+    """
+    snapshot = health_prober.snapshot()
+    return {"status": "ok", "database": snapshot["database"]}
+
+
+@app.get("/health/live")
+async def liveness() -> dict:
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+async def readiness(response: Response) -> dict:
+    """
+    Readiness from the cached prober snapshot (DB latency, pool saturation).
+
+    Returns 503 until the database has been reached recently.
     """
-    db_ok = await check_database_health()
-    return {"status": "ok", "database": "ok" if db_ok else "unavailable"}
+    ready = health_prober.is_ready()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"status": "ok" if ready else "unavailable", **health_prober.snapshot()}
+
+
+@app.get("/health/pool")
+async def pool_stats(user: CurrentUser = Depends(get_current_user)) -> dict:
+    """Connection-pool statistics for the primary database engine (authenticated)."""
+    return get_pool_stats()
 
 
 @app.get("/")
 async def root() -> dict:
     return {"message": "PFAM backend is running"}
-    
\ No newline at end of file
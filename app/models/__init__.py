@@ -3,6 +3,47 @@ from app.models.organizations import Organization
 from app.models.users import User
 from app.models.stores import Store
 from app.models.ad_accounts import AdAccount
+from app.models.orders import Order
+from app.models.line_items import LineItem
+from app.models.ad_insights import AdInsight
+from app.models.attributed_orders import AttributedOrder
+from app.models.profit_metrics import ProfitMetric
+from app.models.sync_runs import SyncRun
+from app.models.click_ids import ClickId
+from app.models.conversion_events import ConversionEvent
+from app.models.sku_affinity import SkuAffinity
+from app.models.returns import Return
+from app.models.cogs_settings import CogsSetting
+from app.models.sku_return_rates import SkuReturnRate
+from app.models.ad_set_daily_rollups import AdSetDailyRollup
+from app.models.profit_dirty_cells import ProfitDirtyCell
+from app.models.automation_rules import AutomationRule
+from app.models.rule_executions import RuleExecution
+from app.models.audit_log import AuditLog
+from app.models.cogs_imports import CogsImport
 
-__all__ = ["Base", "Organization", "User", "Store", "AdAccount"]
-
+__all__ = [
+    "Base",
+    "Organization",
+    "User",
+    "Store",
+    "AdAccount",
+    "Order",
+    "LineItem",
+    "AdInsight",
+    "AttributedOrder",
+    "ProfitMetric",
+    "SyncRun",
+    "ClickId",
+    "ConversionEvent",
+    "SkuAffinity",
+    "Return",
+    "CogsSetting",
+    "SkuReturnRate",
+    "AdSetDailyRollup",
+    "ProfitDirtyCell",
+    "AutomationRule",
+    "RuleExecution",
+    "AuditLog",
+    "CogsImport",
+]
@@ -0,0 +1,62 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    Integer,
+    Numeric,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class AdInsight(TenantScoped, Base):
+    """Daily ad-set metrics; hash-partitioned by org, range by month on `date`."""
+
+    __tablename__ = "ad_insights"
+    __table_args__ = (
+        UniqueConstraint(
+            "org_id",
+            "ad_set_id",
+            "date",
+            name="uq_ad_insights_org_ad_set_date",
+        ),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    ad_set_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    spend_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    impressions: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    clicks: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    reach: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    conversions: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    conversion_value_cents: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )
+    cpm_cents: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    cpc_cents: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    ctr: Mapped[Decimal | None] = mapped_column(Numeric(10, 6), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
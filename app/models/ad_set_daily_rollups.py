@@ -0,0 +1,62 @@
+import uuid
+from datetime import date, datetime
+
+from sqlalchemy import BigInteger, Date, DateTime, Index, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class AdSetDailyRollup(TenantScoped, Base):
+    """
+    Profit inputs for one ad set and day; profit windows are sums of these.
+
+    Spend is by insight date; revenue, COGS, returns and order counts are by
+    the attributed order's placement day (UTC).
+    """
+
+    __tablename__ = "ad_set_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "org_id",
+            "ad_set_id",
+            "date",
+            name="uq_ad_set_daily_rollups_org_ad_set_date",
+        ),
+        Index("ix_ad_set_daily_rollups_org_date", "org_id", "date"),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    ad_set_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    date: Mapped[date] = mapped_column(Date, nullable=False)
+    spend_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    attributed_revenue_cents: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )
+    attributed_cogs_cents: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    estimated_returns_cents: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Orders matched by Tier 1/2 (click id or pixel event).
+    high_confidence_order_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
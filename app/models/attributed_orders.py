@@ -0,0 +1,80 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    ForeignKeyConstraint,
+    Index,
+    Numeric,
+    SmallInteger,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class AttributedOrder(TenantScoped, Base):
+    __tablename__ = "attributed_orders"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["org_id", "order_id"],
+            ["orders.org_id", "orders.id"],
+            name="fk_attributed_orders_order",
+            ondelete="CASCADE",
+        ),
+        UniqueConstraint("org_id", "order_id", name="uq_attributed_orders_org_order"),
+        CheckConstraint(
+            "attribution_tier BETWEEN 1 AND 5",
+            name="ck_attributed_orders_tier",
+        ),
+        Index(
+            "ix_attributed_orders_org_ad_set_created",
+            "org_id",
+            "ad_set_id",
+            "created_at",
+            "id",
+            postgresql_include=[
+                "order_id",
+                "attribution_tier",
+                "confidence_score",
+                "attribution_method",
+                "attributed_revenue_cents",
+            ],
+        ),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    ad_set_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    attribution_tier: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    confidence_score: Mapped[Decimal] = mapped_column(Numeric(4, 2), nullable=False)
+    attribution_method: Mapped[str] = mapped_column(String(50), nullable=False)
+    matched_click_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    attributed_revenue_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    window_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    window_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
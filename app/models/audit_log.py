@@ -0,0 +1,83 @@
+import enum
+import uuid
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import DateTime, Enum as SAEnum, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.models.ad_accounts import AdPlatform
+
+
+class AuditActorType(str, enum.Enum):
+    USER = "user"
+    SYSTEM = "system"
+
+
+class AuditLog(Base):
+    """
+    Append-only record of actions taken on ad platforms. Never UPDATE or DELETE.
+
+    Range-partitioned by month on `created_at`; write through
+    `app.services.audit.AuditWriter`.
+    """
+
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        Index("ix_audit_log_org_created_id", "org_id", "created_at", "id"),
+        Index("ix_audit_log_created_brin", "created_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+    actor_user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=True
+    )
+    actor_type: Mapped[AuditActorType] = mapped_column(
+        SAEnum(
+            AuditActorType,
+            name="audit_actor_type",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+    )
+    action_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity_type: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    entity_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    platform: Mapped[AdPlatform | None] = mapped_column(
+        SAEnum(
+            AdPlatform,
+            name="ad_platform",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+            create_type=False,
+        ),
+        nullable=True,
+    )
+    rule_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    metric_snapshot_json: Mapped[Dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    api_request_json: Mapped[Dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+    api_response_code: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    api_response_json: Mapped[Dict[str, Any] | None] = mapped_column(JSONB, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
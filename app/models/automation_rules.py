@@ -0,0 +1,99 @@
+import enum
+import uuid
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import Boolean, DateTime, Enum as SAEnum, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.models.ad_accounts import AdPlatform
+
+
+class RuleScope(str, enum.Enum):
+    CAMPAIGN = "campaign"
+    ADSET = "adset"
+    AD = "ad"
+
+
+class RuleActionType(str, enum.Enum):
+    PAUSE = "pause"
+    REDUCE_BUDGET = "reduce_budget"
+    INCREASE_BUDGET = "increase_budget"
+    ALERT = "alert"
+
+
+class AutomationRule(Base):
+    """
+    IF <conditions over a profit window> THEN <action>, per org.
+
+    `updated_at` doubles as the rule's version: compiled predicates are
+    cached per (id, updated_at), so any update invalidates them.
+    """
+
+    __tablename__ = "automation_rules"
+    __table_args__ = (Index("ix_automation_rules_org_active", "org_id", "is_active"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    platform: Mapped[AdPlatform] = mapped_column(
+        SAEnum(
+            AdPlatform,
+            name="ad_platform",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+            create_type=False,
+        ),
+        nullable=False,
+    )
+    scope: Mapped[RuleScope] = mapped_column(
+        SAEnum(
+            RuleScope,
+            name="rule_scope",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+    )
+    # {"window": "7d", "match": "all", "conditions": [
+    #     {"metric": "net_profit_cents", "operator": "lt", "value": 0}]}
+    conditions_json: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    action_type: Mapped[RuleActionType] = mapped_column(
+        SAEnum(
+            RuleActionType,
+            name="rule_action_type",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+    )
+    action_params_json: Mapped[Dict[str, Any]] = mapped_column(
+        JSONB, nullable=False, default=dict
+    )
+    # {"min_orders": 5, "min_spend_cents": 10000, "max_actions_per_day": 3}
+    guardrails_json: Mapped[Dict[str, Any]] = mapped_column(
+        JSONB, nullable=False, default=dict
+    )
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_by: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
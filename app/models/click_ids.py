@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, Enum as SAEnum, Index, String, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.models.ad_accounts import AdPlatform
+from app.tenancy import TenantScoped
+
+
+class ClickId(TenantScoped, Base):
+    """
+    One platform click id (gclid / fbclid / ttclid) seen by either side.
+
+    - Shopify ingest sets `order_id` / `ordered_at` from the landing URL.
+    - Ad connectors set `ad_set_id` / `clicked_at` from click reports.
+    Tier 1 attributes orders whose row has both sides filled.
+    """
+
+    __tablename__ = "click_ids"
+    __table_args__ = (
+        UniqueConstraint(
+            "org_id",
+            "click_id",
+            "platform",
+            name="uq_click_ids_org_click_platform",
+        ),
+        Index(
+            "ix_click_ids_org_order",
+            "org_id",
+            "order_id",
+            postgresql_where=text("order_id IS NOT NULL"),
+        ),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    platform: Mapped[AdPlatform] = mapped_column(
+        SAEnum(
+            AdPlatform,
+            name="ad_platform",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+            create_type=False,
+        ),
+        nullable=False,
+    )
+    click_id: Mapped[str] = mapped_column(String(255), nullable=False)
+
+    order_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    ordered_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    ad_set_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    clicked_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -0,0 +1,71 @@
+import enum
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import BigInteger, DateTime, Enum as SAEnum, ForeignKey, Index, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class CogsImportStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class CogsImport(Base):
+    """One COGS CSV upload: where the file is staged, progress and outcome."""
+
+    __tablename__ = "cogs_imports"
+    __table_args__ = (Index("ix_cogs_imports_org_created", "org_id", "created_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
+        nullable=False,
+    )
+    status: Mapped[CogsImportStatus] = mapped_column(
+        SAEnum(
+            CogsImportStatus,
+            name="cogs_import_status",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+    )
+    # Object-store key of the uploaded CSV; deleted once the import finishes.
+    object_key: Mapped[str] = mapped_column(String(512), nullable=False)
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rows_total: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rows_invalid: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    skus_changed: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    # The first COGS_IMPORT_MAX_REPORTED_ERRORS rejected rows: line, sku, error.
+    row_errors_json: Mapped[List[Dict[str, Any]]] = mapped_column(
+        JSONB, nullable=False, default=list
+    )
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    started_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -0,0 +1,105 @@
+import enum
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKey,
+    Numeric,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.models.line_items import CogsSource
+
+
+class CogsScope(str, enum.Enum):
+    SKU = "sku"
+    CATEGORY = "category"
+    GLOBAL = "global"
+
+
+class CogsType(str, enum.Enum):
+    ABSOLUTE = "absolute"
+    PERCENTAGE = "percentage"
+
+
+class CogsSetting(Base):
+    """
+    COGS fallback for line items without a unit cost.
+
+    Resolution order: line item cost, then SKU, category and global settings.
+    Absolute settings are cents per unit; percentage settings are a percent
+    of the unit price.
+    """
+
+    __tablename__ = "cogs_settings"
+    __table_args__ = (
+        UniqueConstraint(
+            "org_id", "scope", "scope_value", name="uq_cogs_settings_org_scope_value"
+        ),
+        CheckConstraint(
+            "(cogs_type = 'absolute' AND cogs_value_cents IS NOT NULL) "
+            "OR (cogs_type = 'percentage' AND cogs_percent IS NOT NULL)",
+            name="ck_cogs_settings_value",
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+    scope: Mapped[CogsScope] = mapped_column(
+        SAEnum(
+            CogsScope,
+            name="cogs_scope",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+    )
+    # SKU or category name; empty string for the global setting.
+    scope_value: Mapped[str] = mapped_column(String(255), nullable=False, default="")
+    cogs_type: Mapped[CogsType] = mapped_column(
+        SAEnum(
+            CogsType,
+            name="cogs_type",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+    )
+    cogs_value_cents: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    cogs_percent: Mapped[Decimal | None] = mapped_column(Numeric(7, 4), nullable=True)
+    source: Mapped[CogsSource] = mapped_column(
+        SAEnum(
+            CogsSource,
+            name="cogs_source",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+            create_type=False,
+        ),
+        nullable=False,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
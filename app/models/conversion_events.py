@@ -0,0 +1,58 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Enum as SAEnum, Index, String, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.models.ad_accounts import AdPlatform
+from app.tenancy import TenantScoped
+
+
+class ConversionEvent(TenantScoped, Base):
+    """Meta Pixel / Google Tag purchase event attributed by the platform."""
+
+    __tablename__ = "conversion_events"
+    __table_args__ = (
+        UniqueConstraint(
+            "org_id",
+            "platform",
+            "event_id",
+            name="uq_conversion_events_org_platform_event",
+        ),
+        Index("ix_conversion_events_org_occurred_at", "org_id", "occurred_at"),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    platform: Mapped[AdPlatform] = mapped_column(
+        SAEnum(
+            AdPlatform,
+            name="ad_platform",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+            create_type=False,
+        ),
+        nullable=False,
+    )
+    event_id: Mapped[str] = mapped_column(String(255), nullable=False)
+    ad_set_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    # Shopify order id when the pixel / tag event carries it.
+    order_ref: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    value_cents: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -0,0 +1,81 @@
+import enum
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class CogsSource(str, enum.Enum):
+    SHOPIFY = "shopify"
+    CSV = "csv"
+    MANUAL = "manual"
+    ESTIMATED = "estimated"
+
+
+class LineItem(TenantScoped, Base):
+    __tablename__ = "line_items"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["org_id", "order_id"],
+            ["orders.org_id", "orders.id"],
+            name="fk_line_items_order",
+            ondelete="CASCADE",
+        ),
+        UniqueConstraint(
+            "org_id",
+            "order_id",
+            "shopify_line_item_id",
+            name="uq_line_items_org_order_shopify_line_item",
+        ),
+        Index("ix_line_items_org_sku", "org_id", "sku"),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    shopify_line_item_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    product_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    variant_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    sku: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    # Shopify product type; used by category-scoped COGS settings.
+    product_category: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    unit_price_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    unit_cogs_cents: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    unit_cogs_source: Mapped[CogsSource | None] = mapped_column(
+        SAEnum(
+            CogsSource,
+            name="cogs_source",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=True,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
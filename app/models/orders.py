@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class Order(TenantScoped, Base):
+    __tablename__ = "orders"
+    __table_args__ = (
+        UniqueConstraint(
+            "org_id",
+            "store_id",
+            "shopify_order_id",
+            name="uq_orders_org_store_shopify_order",
+        ),
+        Index("ix_orders_org_created_at", "org_id", "created_at"),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    store_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("stores.id"),
+        nullable=False,
+    )
+    shopify_order_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    total_amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    total_discounts_cents: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, default=0
+    )
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    customer_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    financial_status: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    fulfillment_status: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    # Landing URL including UTM and fbclid / gclid query parameters.
+    landing_site: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # When the order was placed in Shopify.
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
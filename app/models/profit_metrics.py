@@ -0,0 +1,104 @@
+import enum
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    Enum as SAEnum,
+    Index,
+    Integer,
+    Numeric,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class ProfitWindowType(str, enum.Enum):
+    DAILY = "daily"
+    D7 = "7d"
+    D14 = "14d"
+    D30 = "30d"
+
+
+class ProfitMetric(TenantScoped, Base):
+    """Per ad set profit for one window; hash by org, range by `window_start`."""
+
+    __tablename__ = "profit_metrics"
+    __table_args__ = (
+        UniqueConstraint(
+            "org_id",
+            "ad_set_id",
+            "window_type",
+            "window_start",
+            "window_end",
+            name="uq_profit_metrics_org_ad_set_window",
+        ),
+        Index(
+            "ix_profit_metrics_org_window_totals",
+            "org_id",
+            "window_type",
+            "window_start",
+            postgresql_include=[
+                "ad_set_id",
+                "spend_cents",
+                "attributed_revenue_cents",
+                "attributed_cogs_cents",
+                "estimated_returns_cents",
+                "platform_fees_cents",
+                "net_profit_cents",
+                "order_count",
+            ],
+        ),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    ad_set_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    window_type: Mapped[ProfitWindowType] = mapped_column(
+        SAEnum(
+            ProfitWindowType,
+            name="profit_window_type",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=False,
+    )
+    window_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    window_end: Mapped[date] = mapped_column(Date, nullable=False)
+
+    spend_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    attributed_revenue_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    attributed_cogs_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    estimated_returns_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    platform_fees_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    net_profit_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    net_profit_pct: Mapped[Decimal | None] = mapped_column(Numeric(12, 4), nullable=True)
+    true_roas: Mapped[Decimal | None] = mapped_column(Numeric(12, 4), nullable=True)
+    order_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    attribution_coverage_pct: Mapped[Decimal | None] = mapped_column(
+        Numeric(7, 4), nullable=True
+    )
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
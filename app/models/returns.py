@@ -0,0 +1,86 @@
+import enum
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum as SAEnum,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class ReturnReason(str, enum.Enum):
+    DEFECTIVE = "defective"
+    WRONG = "wrong"
+    CHANGE_MIND = "change_mind"
+    SIZING = "sizing"
+    OTHER = "other"
+
+
+class Return(TenantScoped, Base):
+    """One refunded Shopify line (or order-level refund adjustment)."""
+
+    __tablename__ = "returns"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["org_id", "order_id"],
+            ["orders.org_id", "orders.id"],
+            name="fk_returns_order",
+            ondelete="CASCADE",
+        ),
+        UniqueConstraint(
+            "org_id",
+            "order_id",
+            "shopify_refund_id",
+            "shopify_refund_line_id",
+            name="uq_returns_org_order_refund_line",
+        ),
+        Index("ix_returns_org_refunded_at", "org_id", "refunded_at"),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    order_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    line_item_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )
+    shopify_refund_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    # Refund line item id, or the refund id for order-level adjustments.
+    shopify_refund_line_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    sku: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    refund_amount_cents: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    quantity_returned: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    reason_category: Mapped[ReturnReason | None] = mapped_column(
+        SAEnum(
+            ReturnReason,
+            name="return_reason",
+            values_callable=lambda enum_cls: [member.value for member in enum_cls],
+        ),
+        nullable=True,
+    )
+    refunded_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -0,0 +1,50 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+from app.tenancy import TenantScoped
+
+
+class RuleExecution(TenantScoped, Base):
+    """Outcome of one rule in one evaluation pass; hash-partitioned by org."""
+
+    __tablename__ = "rule_executions"
+    __table_args__ = (
+        Index(
+            "ix_rule_executions_org_rule_evaluated", "org_id", "rule_id", "evaluated_at"
+        ),
+        {"postgresql_partition_by": "HASH (org_id)"},
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    rule_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("automation_rules.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    evaluated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    entities_evaluated: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    entities_triggered: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    entities_blocked_by_guardrail: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )
+    action_queued: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -0,0 +1,48 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class SkuAffinity(Base):
+    """
+    Persisted SKU x ad-set affinity for Tier 3 attribution, one row per org.
+
+    `payload` is the compressed NumPy archive written by
+    `app.services.attribution.affinity.AffinityMatrix`; `watermark` is the
+    newest attributed_orders.created_at folded into it.
+    """
+
+    __tablename__ = "sku_affinity"
+    __table_args__ = (UniqueConstraint("org_id", name="uq_sku_affinity_org"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    watermark: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -0,0 +1,62 @@
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    BigInteger,
+    Date,
+    DateTime,
+    ForeignKey,
+    Numeric,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class SkuReturnRate(Base):
+    """Trailing refunded / sold unit ratio per SKU; the manual override wins."""
+
+    __tablename__ = "sku_return_rates"
+    __table_args__ = (UniqueConstraint("org_id", "sku", name="uq_sku_return_rates_org_sku"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
+        nullable=False,
+    )
+
+    sku: Mapped[str] = mapped_column(String(255), nullable=False)
+    trailing_90d_rate: Mapped[Decimal | None] = mapped_column(Numeric(7, 6), nullable=True)
+    trailing_180d_rate: Mapped[Decimal | None] = mapped_column(Numeric(7, 6), nullable=True)
+    manual_override_rate: Mapped[Decimal | None] = mapped_column(
+        Numeric(7, 6), nullable=True
+    )
+    # Running unit sums behind the trailing rates, through `rates_through`.
+    sold_units_90d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    refunded_units_90d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    sold_units_180d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    refunded_units_180d: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rates_through: Mapped[date | None] = mapped_column(Date, nullable=True)
+    last_computed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
@@ -16,8 +16,8 @@ class Store(Base):
     )
 
     org_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("organizations.id"),
         UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
         nullable=False,
         index=True,
     )
@@ -25,11 +25,20 @@ class Store(Base):
     shopify_store_id: Mapped[str] = mapped_column(String(255), nullable=False)
     access_token_enc: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
     access_token_iv: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Which AES key encrypted the token; see app/services/credentials.py.
+    access_token_key_id: Mapped[str] = mapped_column(
+        String(32), nullable=False, default="k1", server_default="k1"
+    )
     region: Mapped[str | None] = mapped_column(String(50), nullable=True)
     last_sync_at: Mapped[datetime | None] = mapped_column(
         DateTime(timezone=True),
         nullable=True,
     )
+    # Upper bound of data already ingested; incremental syncs resume here.
+    sync_watermark_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
     sync_status: Mapped[str | None] = mapped_column(String(50), nullable=True)
 
     created_at: Mapped[datetime] = mapped_column(
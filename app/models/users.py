@@ -24,8 +24,8 @@ class User(Base):
     )
 
     org_id: Mapped[uuid.UUID] = mapped_column(
-        ForeignKey("organizations.id"),
         UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
         nullable=False,
         index=True,
     )
@@ -1,3 +1,3 @@
-"""Router package. Individual routers will be added in later phases."""
+"""API routers, included by app.main."""
 
 
@@ -0,0 +1,118 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+
+from app.auth import CurrentUser, get_current_user
+from app.db import ReadSession
+from app.models.ad_accounts import AdPlatform
+from app.models.audit_log import AuditLog
+from app.pagination import (
+    MAX_PAGE_SIZE,
+    KeysetSort,
+    cursor_scope,
+    decode_cursor,
+    keyset_page,
+)
+
+
+router = APIRouter(tags=["audit-log"])
+
+DEFAULT_RANGE_DAYS = 30
+
+AUDIT_LOG_SORTS = {
+    "created_at": KeysetSort(
+        "created_at", AuditLog.created_at, AuditLog.id, True, datetime.fromisoformat
+    ),
+}
+
+
+def _row(entry: AuditLog) -> Dict[str, Any]:
+    return {
+        "id": str(entry.id),
+        "created_at": entry.created_at.isoformat(),
+        "actor_type": entry.actor_type.value,
+        "actor_user_id": str(entry.actor_user_id) if entry.actor_user_id else None,
+        "action_type": entry.action_type,
+        "entity_type": entry.entity_type,
+        "entity_id": entry.entity_id,
+        "platform": entry.platform.value if entry.platform else None,
+        "rule_id": str(entry.rule_id) if entry.rule_id else None,
+        "metric_snapshot": entry.metric_snapshot_json,
+        "api_request": entry.api_request_json,
+        "api_response_code": entry.api_response_code,
+        "api_response": entry.api_response_json,
+    }
+
+
+@router.get("/audit-log")
+async def list_audit_log(
+    db: ReadSession,
+    user: CurrentUser = Depends(get_current_user),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    platform: Optional[AdPlatform] = None,
+    action_type: Optional[str] = None,
+    sort_by: Literal["created_at"] = "created_at",
+    cursor: Optional[str] = None,
+    page_size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+) -> Dict[str, Any]:
+    """
+    Audit entries for the caller's org, newest first.
+
+    The query is always bounded by a created_at range (default: the last
+    DEFAULT_RANGE_DAYS days), so Postgres only scans the monthly
+    partitions that overlap it. Pages continue from `next_cursor`.
+    """
+    org_id = uuid.UUID(user.org_id)
+    scope = cursor_scope(
+        org_id,
+        "audit-log",
+        {
+            "start_date": start_date,
+            "end_date": end_date,
+            "platform": platform.value if platform else None,
+            "action_type": action_type,
+            "sort_by": sort_by,
+        },
+    )
+    sort = AUDIT_LOG_SORTS[sort_by]
+    end_date = end_date or datetime.now(timezone.utc).date()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start_date must not be after end_date",
+        )
+
+    stmt = (
+        select(AuditLog)
+        .where(
+            AuditLog.org_id == org_id,
+            AuditLog.created_at >= datetime.combine(start_date, time.min, tzinfo=timezone.utc),
+            AuditLog.created_at
+            < datetime.combine(end_date + timedelta(days=1), time.min, tzinfo=timezone.utc),
+        )
+        .order_by(*sort.order_by())
+        .limit(page_size + 1)
+    )
+    if cursor:
+        stmt = stmt.where(sort.after(decode_cursor(cursor, sort, scope)))
+    if platform is not None:
+        stmt = stmt.where(AuditLog.platform == platform)
+    if action_type is not None:
+        stmt = stmt.where(AuditLog.action_type == action_type)
+
+    entries = (await db.execute(stmt)).scalars().all()
+    items, next_cursor = keyset_page(
+        entries, page_size, sort, scope, lambda entry: (entry.created_at, entry.id)
+    )
+    return {
+        "items": [_row(entry) for entry in items],
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
@@ -0,0 +1,110 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+
+from app.auth import CurrentUser, get_current_user
+from app.db import WriteSession
+from app.models.cogs_imports import CogsImport, CogsImportStatus
+from app.services.ingest.cogs_csv import IMPORT_COGS_TASK
+from app.services.reports.object_store import PartWriter, get_object_store
+from app.workers.celery_app import send_task
+
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["cogs"])
+
+COGS_IMPORT_MAX_BYTES = int(os.getenv("COGS_IMPORT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def _status(job: CogsImport) -> Dict[str, Any]:
+    return {
+        "id": str(job.id),
+        "status": job.status.value,
+        "size_bytes": job.size_bytes,
+        "rows_total": job.rows_total,
+        "rows_invalid": job.rows_invalid,
+        "skus_changed": job.skus_changed,
+        "row_errors": job.row_errors_json,
+        "error": job.error,
+        "created_at": job.created_at.isoformat(),
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+@router.post("/cogs/import", status_code=status.HTTP_202_ACCEPTED)
+async def import_cogs(
+    request: Request,
+    db: WriteSession,
+    user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Upload a SKU + value CSV as the raw request body (`Content-Type: text/csv`).
+
+    The body is streamed into the object store chunk by chunk and a worker
+    imports it; poll GET /cogs/import/{id} for the outcome and per-row errors.
+    """
+    org_id = uuid.UUID(user.org_id)
+    import_id = uuid.uuid4()
+    object_key = f"{org_id}/imports/cogs_{import_id}.csv"
+
+    store = get_object_store()
+    upload = await store.start_upload(object_key, "text/csv")
+    writer = PartWriter(upload, store.min_part_size)
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > COGS_IMPORT_MAX_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"CSV larger than {COGS_IMPORT_MAX_BYTES} bytes",
+                )
+            await writer.write(chunk)
+        if size == 0:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="empty upload"
+            )
+        await writer.close()
+        await upload.complete()
+    except BaseException:
+        await upload.abort()
+        raise
+
+    job = CogsImport(
+        id=import_id,
+        org_id=org_id,
+        status=CogsImportStatus.QUEUED,
+        object_key=object_key,
+        size_bytes=size,
+        row_errors_json=[],
+        created_at=datetime.now(timezone.utc),
+    )
+    db.add(job)
+    await db.commit()
+    send_task(IMPORT_COGS_TASK, org_id=str(org_id), import_id=str(import_id))
+    return _status(job)
+
+
+@router.get("/cogs/import/{import_id}")
+async def get_cogs_import(
+    import_id: uuid.UUID,
+    db: WriteSession,
+    user: CurrentUser = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Import status; read from the primary so a just-queued import is visible."""
+    result = await db.execute(
+        select(CogsImport).where(
+            CogsImport.org_id == uuid.UUID(user.org_id), CogsImport.id == import_id
+        )
+    )
+    job = result.scalar_one_or_none()
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="import not found")
+    return _status(job)
@@ -0,0 +1,229 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Literal, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, select
+
+from app.auth import CurrentUser, get_current_user
+from app.cache import cached_json
+from app.db import ReadSession
+from app.models.attributed_orders import AttributedOrder
+from app.models.profit_metrics import ProfitMetric, ProfitWindowType
+from app.pagination import (
+    MAX_PAGE_SIZE,
+    KeysetSort,
+    cursor_scope,
+    decode_cursor,
+    keyset_page,
+)
+
+
+router = APIRouter(tags=["dashboard"])
+
+DEFAULT_RANGE_DAYS = 30
+
+_TOTALS = {
+    "spend_cents": func.sum(ProfitMetric.spend_cents),
+    "revenue_cents": func.sum(ProfitMetric.attributed_revenue_cents),
+    "cogs_cents": func.sum(ProfitMetric.attributed_cogs_cents),
+    "estimated_returns_cents": func.sum(ProfitMetric.estimated_returns_cents),
+    "platform_fees_cents": func.sum(ProfitMetric.platform_fees_cents),
+    "net_profit_cents": func.sum(ProfitMetric.net_profit_cents),
+    "order_count": func.sum(ProfitMetric.order_count),
+}
+
+# Campaign sorts run over per-ad-set sums, so their seek goes in HAVING.
+CAMPAIGN_SORTS = {
+    "net_profit": KeysetSort(
+        "net_profit", _TOTALS["net_profit_cents"], ProfitMetric.ad_set_id, False, int
+    ),
+    "spend": KeysetSort("spend", _TOTALS["spend_cents"], ProfitMetric.ad_set_id, True, int),
+}
+ATTRIBUTED_ORDER_SORTS = {
+    "created_at": KeysetSort(
+        "created_at",
+        AttributedOrder.created_at,
+        AttributedOrder.id,
+        True,
+        datetime.fromisoformat,
+    ),
+}
+
+
+def _date_range(start_date: Optional[date], end_date: Optional[date]) -> Tuple[date, date]:
+    end_date = end_date or datetime.now(timezone.utc).date()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start_date must not be after end_date",
+        )
+    return start_date, end_date
+
+
+def _daily_rows(org_id: uuid.UUID, start_date: date, end_date: date):
+    return (
+        ProfitMetric.org_id == org_id,
+        ProfitMetric.window_type == ProfitWindowType.DAILY,
+        ProfitMetric.window_start.between(start_date, end_date),
+    )
+
+
+def _totals(row) -> Dict[str, int]:
+    return {name: int(getattr(row, name) or 0) for name in _TOTALS}
+
+
+@router.get("/dashboard/overview")
+async def dashboard_overview(
+    request: Request,
+    db: ReadSession,
+    user: CurrentUser = Depends(get_current_user),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Response:
+    """Org-wide profit totals over daily profit_metrics in the date range."""
+    org_id = uuid.UUID(user.org_id)
+    start_date, end_date = _date_range(start_date, end_date)
+
+    async def compute() -> Dict[str, Any]:
+        stmt = select(
+            *(column.label(name) for name, column in _TOTALS.items())
+        ).where(*_daily_rows(org_id, start_date, end_date))
+        row = (await db.execute(stmt)).one()
+        return {
+            **_totals(row),
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+        }
+
+    return await cached_json(
+        request,
+        org_id,
+        "dashboard/overview",
+        {"start_date": start_date, "end_date": end_date},
+        compute,
+    )
+
+
+@router.get("/campaigns")
+async def list_campaigns(
+    request: Request,
+    db: ReadSession,
+    user: CurrentUser = Depends(get_current_user),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    sort_by: Literal["net_profit", "spend"] = "net_profit",
+    cursor: Optional[str] = None,
+    page_size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+) -> Response:
+    """
+    Per ad set profit totals over the date range: lowest net profit first,
+    or highest spend first.
+
+    profit_metrics is kept at ad set grain, so each ad set is one row here.
+    Pages continue from `next_cursor`.
+    """
+    org_id = uuid.UUID(user.org_id)
+    filters = {"start_date": start_date, "end_date": end_date, "sort_by": sort_by}
+    scope = cursor_scope(org_id, "campaigns", filters)
+    sort = CAMPAIGN_SORTS[sort_by]
+    position = decode_cursor(cursor, sort, scope) if cursor else None
+    start_date, end_date = _date_range(start_date, end_date)
+
+    async def compute() -> Dict[str, Any]:
+        stmt = (
+            select(
+                ProfitMetric.ad_set_id,
+                *(column.label(name) for name, column in _TOTALS.items()),
+            )
+            .where(*_daily_rows(org_id, start_date, end_date))
+            .group_by(ProfitMetric.ad_set_id)
+            .order_by(*sort.order_by())
+            .limit(page_size + 1)
+        )
+        if position is not None:
+            stmt = stmt.having(sort.after(position))
+        rows = (await db.execute(stmt)).all()
+        sort_total = "net_profit_cents" if sort_by == "net_profit" else "spend_cents"
+        items, next_cursor = keyset_page(
+            rows,
+            page_size,
+            sort,
+            scope,
+            lambda row: (int(getattr(row, sort_total)), row.ad_set_id),
+        )
+        return {
+            "items": [{"ad_set_id": str(row.ad_set_id), **_totals(row)} for row in items],
+            "page_size": page_size,
+            "next_cursor": next_cursor,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+        }
+
+    return await cached_json(
+        request,
+        org_id,
+        "campaigns",
+        {**filters, "cursor": cursor, "page_size": page_size},
+        compute,
+    )
+
+
+@router.get("/campaigns/{ad_set_id}/attributed-orders")
+async def list_attributed_orders(
+    ad_set_id: uuid.UUID,
+    db: ReadSession,
+    user: CurrentUser = Depends(get_current_user),
+    sort_by: Literal["created_at"] = "created_at",
+    cursor: Optional[str] = None,
+    page_size: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+) -> Dict[str, Any]:
+    """
+    Orders attributed to one ad set, newest first; pages continue from
+    `next_cursor`. Selects only columns in
+    ix_attributed_orders_org_ad_set_created, so pages are index-only scans.
+    """
+    org_id = uuid.UUID(user.org_id)
+    scope = cursor_scope(
+        org_id, "attributed-orders", {"ad_set_id": ad_set_id, "sort_by": sort_by}
+    )
+    sort = ATTRIBUTED_ORDER_SORTS[sort_by]
+
+    stmt = (
+        select(
+            AttributedOrder.id,
+            AttributedOrder.order_id,
+            AttributedOrder.attribution_tier,
+            AttributedOrder.confidence_score,
+            AttributedOrder.attribution_method,
+            AttributedOrder.attributed_revenue_cents,
+            AttributedOrder.created_at,
+        )
+        .where(AttributedOrder.org_id == org_id, AttributedOrder.ad_set_id == ad_set_id)
+        .order_by(*sort.order_by())
+        .limit(page_size + 1)
+    )
+    if cursor:
+        stmt = stmt.where(sort.after(decode_cursor(cursor, sort, scope)))
+
+    rows = (await db.execute(stmt)).all()
+    items, next_cursor = keyset_page(
+        rows, page_size, sort, scope, lambda row: (row.created_at, row.id)
+    )
+    return {
+        "items": [
+            {
+                "id": str(row.id),
+                "order_id": str(row.order_id),
+                "attribution_tier": row.attribution_tier,
+                "confidence_score": str(row.confidence_score),
+                "attribution_method": row.attribution_method,
+                "attributed_revenue_cents": row.attributed_revenue_cents,
+                "created_at": row.created_at.isoformat(),
+            }
+            for row in items
+        ],
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    }
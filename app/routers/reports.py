@@ -0,0 +1,53 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.auth import CurrentUser, get_current_user
+from app.db import ReadSession
+from app.services.reports.export import EXPORT_URL_EXPIRES_SECONDS, export_orders_csv
+from app.services.reports.object_store import get_object_store
+
+
+router = APIRouter(tags=["reports"])
+
+DEFAULT_RANGE_DAYS = 30
+
+
+@router.get("/reports/export")
+async def export_report(
+    db: ReadSession,
+    user: CurrentUser = Depends(get_current_user),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    gzip: bool = True,
+) -> Dict[str, Any]:
+    """
+    Export the org's orders (with attribution) in the date range as CSV and
+    return a signed download URL.
+
+    Rows are streamed from a server-side cursor straight into a multipart
+    upload, so the export never sits in memory as a whole.
+    """
+    end_date = end_date or datetime.now(timezone.utc).date()
+    start_date = start_date or end_date - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="start_date must not be after end_date",
+        )
+
+    store = get_object_store()
+    result = await export_orders_csv(
+        db, uuid.UUID(user.org_id), start_date, end_date, gzip=gzip, store=store
+    )
+    return {
+        "url": await store.presigned_url(result.key, EXPORT_URL_EXPIRES_SECONDS),
+        "expires_in": EXPORT_URL_EXPIRES_SECONDS,
+        "key": result.key,
+        "rows": result.rows,
+        "bytes": result.uploaded_bytes,
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
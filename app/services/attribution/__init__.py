@@ -0,0 +1 @@
+"""Order → ad set attribution (Tiers 1-4), run as set-based SQL passes."""
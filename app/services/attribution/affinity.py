@@ -0,0 +1,258 @@
+import io
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+# Tier 3 looks at this many days of Tier 1/2 history before the run window.
+AFFINITY_WINDOW_DAYS = 30
+# Days of history kept in the stored matrix, so backfill runs within the
+# sync backfill horizon still see their own 30-day window.
+AFFINITY_RETENTION_DAYS = int(os.getenv("AFFINITY_RETENTION_DAYS", "120"))
+
+_EPOCH = np.datetime64("1970-01-01", "D")
+
+# Units sold per (order day, SKU, ad set) for Tier 1/2 matches not yet folded
+# into the stored matrix.
+_DELTA_SQL = """
+SELECT
+    (o.created_at AT TIME ZONE 'UTC')::date AS day,
+    li.sku,
+    a.ad_set_id,
+    sum(li.quantity) AS units,
+    max(a.created_at) AS attributed_at
+FROM attributed_orders a
+JOIN orders o ON o.org_id = :org_id AND o.id = a.order_id
+JOIN line_items li ON li.org_id = :org_id AND li.order_id = a.order_id
+WHERE a.org_id = :org_id
+  AND a.attribution_tier IN (1, 2)
+  AND a.created_at > coalesce(CAST(:watermark AS timestamptz), '-infinity')
+  AND o.created_at >= :retain_from
+  AND li.sku IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+
+@dataclass
+class AffinityMatrix:
+    """
+    Sparse SKU x ad-set units sold, bucketed by order day.
+
+    Stored as COO arrays (one entry per day, SKU and ad set) so new Tier 1/2
+    matches are appended and old days expired without a rebuild. `csr()`
+    collapses a date range into a CSR matrix of per-SKU ad-set shares.
+    """
+
+    skus: List[str] = field(default_factory=list)
+    ad_set_ids: List[uuid.UUID] = field(default_factory=list)
+    days: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int32))
+    sku_idx: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int32))
+    ad_set_idx: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int32))
+    units: np.ndarray = field(default_factory=lambda: np.zeros(0, np.int64))
+    watermark: Optional[datetime] = None
+
+    def __post_init__(self) -> None:
+        self._sku_index: Dict[str, int] = {s: i for i, s in enumerate(self.skus)}
+        self._ad_set_index: Dict[uuid.UUID, int] = {
+            a: i for i, a in enumerate(self.ad_set_ids)
+        }
+
+    def sku_index(self, sku: str) -> int:
+        """Column of `sku`, or -1 when it has no Tier 1/2 history."""
+        return self._sku_index.get(sku, -1)
+
+    def _intern(self, values: Sequence, vocab: list, index: dict) -> np.ndarray:
+        out = np.empty(len(values), np.int32)
+        for i, value in enumerate(values):
+            pos = index.get(value)
+            if pos is None:
+                pos = index[value] = len(vocab)
+                vocab.append(value)
+            out[i] = pos
+        return out
+
+    def add(
+        self,
+        days: Sequence[date],
+        skus: Sequence[str],
+        ad_set_ids: Sequence[uuid.UUID],
+        units: Sequence[int],
+    ) -> None:
+        """Fold new (day, sku, ad set, units) observations into the matrix."""
+        if not len(units):
+            return
+        day_numbers = (np.array(days, dtype="datetime64[D]") - _EPOCH).astype(np.int32)
+        self.days = np.concatenate([self.days, day_numbers])
+        self.sku_idx = np.concatenate(
+            [self.sku_idx, self._intern(skus, self.skus, self._sku_index)]
+        )
+        self.ad_set_idx = np.concatenate(
+            [self.ad_set_idx, self._intern(ad_set_ids, self.ad_set_ids, self._ad_set_index)]
+        )
+        self.units = np.concatenate([self.units, np.asarray(units, dtype=np.int64)])
+        self._compact()
+
+    def _compact(self) -> None:
+        """Merge duplicate (day, sku, ad set) entries."""
+        keys = np.stack([self.days, self.sku_idx, self.ad_set_idx], axis=1)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        units = np.zeros(len(unique), np.int64)
+        np.add.at(units, inverse.reshape(-1), self.units)
+        self.days = unique[:, 0].astype(np.int32)
+        self.sku_idx = unique[:, 1].astype(np.int32)
+        self.ad_set_idx = unique[:, 2].astype(np.int32)
+        self.units = units
+
+    def expire(self, before: date) -> None:
+        """Drop days before `before` and the SKUs / ad sets left unused."""
+        keep = self.days >= (np.datetime64(before, "D") - _EPOCH).astype(np.int32)
+        self.days = self.days[keep]
+        self.units = self.units[keep]
+
+        used_skus, self.sku_idx = np.unique(self.sku_idx[keep], return_inverse=True)
+        used_ad_sets, self.ad_set_idx = np.unique(
+            self.ad_set_idx[keep], return_inverse=True
+        )
+        self.sku_idx = self.sku_idx.astype(np.int32)
+        self.ad_set_idx = self.ad_set_idx.astype(np.int32)
+        self.skus = [self.skus[i] for i in used_skus]
+        self.ad_set_ids = [self.ad_set_ids[i] for i in used_ad_sets]
+        self.__post_init__()
+
+    def csr(self, since: date, until: date) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (indptr, indices, data) over SKUs for days in [since, until): row s
+        holds each ad set's share of SKU s's matched units in that range.
+        """
+        lo = (np.datetime64(since, "D") - _EPOCH).astype(np.int32)
+        hi = (np.datetime64(until, "D") - _EPOCH).astype(np.int32)
+        mask = (self.days >= lo) & (self.days < hi)
+
+        n_ad_sets = max(len(self.ad_set_ids), 1)
+        flat = self.sku_idx[mask].astype(np.int64) * n_ad_sets + self.ad_set_idx[mask]
+        cells, inverse = np.unique(flat, return_inverse=True)
+        units = np.zeros(len(cells), np.int64)
+        np.add.at(units, inverse.reshape(-1), self.units[mask])
+
+        rows = cells // n_ad_sets
+        indices = (cells % n_ad_sets).astype(np.int32)
+        indptr = np.zeros(len(self.skus) + 1, np.int64)
+        np.add.at(indptr, rows + 1, 1)
+        np.cumsum(indptr, out=indptr)
+
+        totals = np.zeros(len(self.skus), np.int64)
+        np.add.at(totals, rows, units)
+        data = units / np.maximum(totals[rows], 1)
+        return indptr, indices, data
+
+    def to_bytes(self) -> bytes:
+        buf = io.BytesIO()
+        np.savez_compressed(
+            buf,
+            skus=np.array(self.skus, dtype=str),
+            ad_set_ids=np.frombuffer(
+                b"".join(a.bytes for a in self.ad_set_ids), dtype=np.uint8
+            ).reshape(-1, 16),
+            days=self.days,
+            sku_idx=self.sku_idx,
+            ad_set_idx=self.ad_set_idx,
+            units=self.units,
+        )
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes, watermark: Optional[datetime]) -> "AffinityMatrix":
+        with np.load(io.BytesIO(payload), allow_pickle=False) as arrays:
+            return cls(
+                skus=[str(s) for s in arrays["skus"]],
+                ad_set_ids=[uuid.UUID(bytes=row.tobytes()) for row in arrays["ad_set_ids"]],
+                days=arrays["days"],
+                sku_idx=arrays["sku_idx"],
+                ad_set_idx=arrays["ad_set_idx"],
+                units=arrays["units"],
+                watermark=watermark,
+            )
+
+
+async def load_affinity(session: AsyncSession, org_id: uuid.UUID) -> AffinityMatrix:
+    result = await session.execute(
+        text("SELECT payload, watermark FROM sku_affinity WHERE org_id = :org_id"),
+        {"org_id": org_id},
+    )
+    row = result.first()
+    if row is None:
+        return AffinityMatrix()
+    return AffinityMatrix.from_bytes(row.payload, row.watermark)
+
+
+async def save_affinity(
+    session: AsyncSession, org_id: uuid.UUID, matrix: AffinityMatrix
+) -> None:
+    await session.execute(
+        text(
+            "INSERT INTO sku_affinity (id, org_id, payload, watermark, created_at, updated_at) "
+            "VALUES (:id, :org_id, :payload, :watermark, now(), now()) "
+            "ON CONFLICT (org_id) DO UPDATE SET payload = EXCLUDED.payload, "
+            "watermark = EXCLUDED.watermark, updated_at = now()"
+        ),
+        {
+            "id": uuid.uuid4(),
+            "org_id": org_id,
+            "payload": matrix.to_bytes(),
+            "watermark": matrix.watermark,
+        },
+    )
+
+
+async def refresh_affinity(
+    session: AsyncSession, org_id: uuid.UUID, *, today: Optional[date] = None
+) -> AffinityMatrix:
+    """
+    Fold Tier 1/2 matches newer than the stored watermark into the org's
+    matrix, expire days past retention and persist it. Assumes attribution
+    runs for one org are serialized (one Celery task per org). Caller commits.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    retain_from = today - timedelta(days=AFFINITY_RETENTION_DAYS)
+    matrix = await load_affinity(session, org_id)
+
+    result = await session.execute(
+        text(_DELTA_SQL),
+        {
+            "org_id": org_id,
+            "watermark": matrix.watermark,
+            "retain_from": datetime.combine(retain_from, datetime.min.time(), timezone.utc),
+        },
+    )
+    rows = result.all()
+    if rows:
+        matrix.add(
+            [r.day for r in rows],
+            [r.sku for r in rows],
+            [r.ad_set_id for r in rows],
+            [int(r.units) for r in rows],
+        )
+        newest = max(r.attributed_at for r in rows)
+        if matrix.watermark is None or newest > matrix.watermark:
+            matrix.watermark = newest
+    matrix.expire(retain_from)
+    await save_affinity(session, org_id, matrix)
+
+    logger.info(
+        "sku affinity org=%s +%s cells, %s entries, %s skus x %s ad sets",
+        org_id,
+        len(rows),
+        len(matrix.units),
+        len(matrix.skus),
+        len(matrix.ad_set_ids),
+    )
+    return matrix
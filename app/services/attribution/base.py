@@ -0,0 +1,77 @@
+import os
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Working set of orders still unattributed in the current run. Tiers read it
+# and the engine deletes matched orders from it after every tier.
+UNMATCHED_TABLE = "_attr_unmatched"
+# Staging table for matches computed in Python by `Tier.matcher`.
+MATCHES_TABLE = "_attr_matches"
+
+# Days of ad activity before an order that can claim it (Tiers 3 and 4).
+ATTRIBUTION_LOOKBACK_DAYS = int(os.getenv("ATTRIBUTION_LOOKBACK_DAYS", "7"))
+
+# (order_id, ad_set_id, matched_click_id, attributed_revenue_cents)
+Match = Tuple[uuid.UUID, uuid.UUID, Optional[str], int]
+
+
+@dataclass(frozen=True)
+class RunContext:
+    """Parameters of one `run_attribution` call, as seen by a tier."""
+
+    org_id: uuid.UUID
+    window_start: datetime
+    window_end: datetime
+    lookback_days: int
+
+    @property
+    def first_day(self) -> date:
+        """UTC day of `window_start`, as `to_days` computes order days."""
+        return self.window_start.astimezone(timezone.utc).date()
+
+    @property
+    def last_day(self) -> date:
+        """UTC day of the last instant before `window_end` (exclusive)."""
+        return (self.window_end - timedelta(microseconds=1)).astimezone(timezone.utc).date()
+
+
+@dataclass(frozen=True)
+class Tier:
+    """
+    One attribution tier, as a single SELECT or a vectorized matcher.
+
+    - `select_sql` reads from `UNMATCHED_TABLE` (alias `u`: order_id,
+      shopify_order_id, created_at, revenue_cents) and returns at most one
+      row per order with columns `order_id, ad_set_id, matched_click_id,
+      attributed_revenue_cents`. Bind params available: `:org_id`,
+      `:window_start`, `:window_end`, `:lookback_days`. Every table it reads
+      must be filtered on `org_id = :org_id`.
+    - `matcher` returns the same rows computed in Python; the engine COPYs
+      them into `MATCHES_TABLE` and writes them exactly like `select_sql`.
+    """
+
+    number: int
+    method: str
+    confidence: Decimal
+    select_sql: Optional[str] = None
+    matcher: Optional[Callable[[AsyncSession, RunContext], Awaitable[List[Match]]]] = None
+
+
+async def load_unmatched(
+    session: AsyncSession,
+) -> List[Tuple[uuid.UUID, datetime, int]]:
+    """(order_id, created_at, revenue_cents) of the current working set."""
+    result = await session.execute(
+        text(
+            f"SELECT order_id, created_at, revenue_cents FROM {UNMATCHED_TABLE} "
+            "ORDER BY order_id"
+        )
+    )
+    return [tuple(row) for row in result.all()]
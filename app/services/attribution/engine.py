@@ -0,0 +1,258 @@
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.attribution.base import (
+    ATTRIBUTION_LOOKBACK_DAYS,
+    MATCHES_TABLE,
+    UNMATCHED_TABLE,
+    Match,
+    RunContext,
+    Tier,
+)
+from app.services.attribution.tier1_tier2 import TIER_1, TIER_2
+from app.services.attribution.tier3 import TIER_3
+from app.services.attribution.tier4 import TIER_4
+from app.services.ingest.bulk import driver_connection
+from app.services.profit.rollups import refresh_daily_rollups
+
+
+logger = logging.getLogger(__name__)
+
+TIERS: Sequence[Tier] = (TIER_1, TIER_2, TIER_3, TIER_4)
+
+
+@dataclass
+class TierStats:
+    """Outcome and timing of one tier pass."""
+
+    tier: int
+    method: str
+    candidates: int
+    matched: int
+    seconds: float
+
+    @property
+    def match_rate(self) -> float:
+        return self.matched / self.candidates if self.candidates else 0.0
+
+
+@dataclass
+class AttributionStats:
+    """Per-tier metrics and overall coverage for one `run_attribution` call."""
+
+    org_id: uuid.UUID
+    window_start: datetime
+    window_end: datetime
+    orders_in_window: int = 0
+    previously_attributed: int = 0
+    prepare_seconds: float = 0.0
+    tiers: List[TierStats] = field(default_factory=list)
+
+    @property
+    def attributed(self) -> int:
+        return self.previously_attributed + sum(t.matched for t in self.tiers)
+
+    @property
+    def unmatched(self) -> int:
+        return self.orders_in_window - self.attributed
+
+    @property
+    def coverage(self) -> float:
+        if not self.orders_in_window:
+            return 0.0
+        return self.attributed / self.orders_in_window
+
+    @property
+    def seconds(self) -> float:
+        return self.prepare_seconds + sum(t.seconds for t in self.tiers)
+
+
+_CREATE_UNMATCHED_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {UNMATCHED_TABLE} (
+    order_id uuid PRIMARY KEY,
+    shopify_order_id varchar(64) NOT NULL,
+    created_at timestamptz NOT NULL,
+    revenue_cents bigint NOT NULL
+) ON COMMIT DROP
+"""
+
+# Anti-join against attributed_orders: orders matched by an earlier run are
+# never re-scored, so hourly runs only pay for new orders.
+_FILL_UNMATCHED_SQL = f"""
+INSERT INTO {UNMATCHED_TABLE} (order_id, shopify_order_id, created_at, revenue_cents)
+SELECT o.id, o.shopify_order_id, o.created_at, o.total_amount_cents
+FROM orders o
+WHERE o.org_id = :org_id
+  AND o.created_at >= :window_start
+  AND o.created_at < :window_end
+  AND NOT EXISTS (
+      SELECT 1
+      FROM attributed_orders a
+      WHERE a.org_id = :org_id AND a.order_id = o.id
+  )
+"""
+
+_COUNT_WINDOW_SQL = """
+SELECT count(*)
+FROM orders
+WHERE org_id = :org_id AND created_at >= :window_start AND created_at < :window_end
+"""
+
+
+_CREATE_MATCHES_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {MATCHES_TABLE} (
+    order_id uuid NOT NULL,
+    ad_set_id uuid NOT NULL,
+    matched_click_id varchar(255),
+    attributed_revenue_cents bigint NOT NULL
+) ON COMMIT DROP
+"""
+
+_SELECT_MATCHES_SQL = f"""
+SELECT order_id, ad_set_id, matched_click_id, attributed_revenue_cents
+FROM {MATCHES_TABLE}
+"""
+
+
+async def _stage_matches(session: AsyncSession, matches: List[Match]) -> None:
+    await session.execute(text(_CREATE_MATCHES_SQL))
+    await session.execute(text(f"TRUNCATE {MATCHES_TABLE}"))
+    if matches:
+        driver = await driver_connection(session)
+        await driver.copy_records_to_table(
+            MATCHES_TABLE,
+            records=matches,
+            columns=["order_id", "ad_set_id", "matched_click_id", "attributed_revenue_cents"],
+        )
+
+
+def _tier_sql(select_sql: str) -> str:
+    """
+    Insert a tier's matches and drop them from the working set in one
+    statement. ON CONFLICT keeps the run idempotent if another run attributed
+    an order meanwhile; such orders simply stay in the working set.
+    """
+    return f"""
+WITH matched AS (
+{select_sql}
+),
+inserted AS (
+    INSERT INTO attributed_orders (
+        id, org_id, order_id, ad_set_id, attribution_tier, confidence_score,
+        attribution_method, matched_click_id, attributed_revenue_cents,
+        window_start, window_end, created_at, updated_at
+    )
+    SELECT
+        gen_random_uuid(), :org_id, m.order_id, m.ad_set_id, :tier, :confidence,
+        :method, m.matched_click_id, m.attributed_revenue_cents,
+        :window_start, :window_end, now(), now()
+    FROM matched m
+    ON CONFLICT (org_id, order_id) DO NOTHING
+    RETURNING order_id
+)
+DELETE FROM {UNMATCHED_TABLE} u
+USING inserted i
+WHERE u.order_id = i.order_id
+"""
+
+
+async def run_attribution(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    window_start: datetime,
+    window_end: datetime,
+    *,
+    tiers: Sequence[Tier] = TIERS,
+    lookback_days: int = ATTRIBUTION_LOOKBACK_DAYS,
+) -> AttributionStats:
+    """
+    Attribute every unattributed order placed in [window_start, window_end).
+
+    Unmatched orders are loaded once into a temp table; each tier is one
+    set-based pass over it (SQL, or a vectorized matcher whose results are
+    COPYed in) that bulk-inserts its matches into attributed_orders and
+    removes them from the working set, so later tiers only see what earlier
+    tiers could not match. The window's ad_set_daily_rollups are refreshed
+    afterwards. Runs in the caller's transaction (the temp tables are dropped
+    on commit). Caller commits.
+    """
+    stats = AttributionStats(org_id=org_id, window_start=window_start, window_end=window_end)
+    context = RunContext(org_id, window_start, window_end, lookback_days)
+    params = {
+        "org_id": org_id,
+        "window_start": window_start,
+        "window_end": window_end,
+        "lookback_days": lookback_days,
+    }
+
+    started = time.perf_counter()
+    await session.execute(text(_CREATE_UNMATCHED_SQL))
+    await session.execute(text(f"TRUNCATE {UNMATCHED_TABLE}"))
+    filled = await session.execute(text(_FILL_UNMATCHED_SQL), params)
+    candidates = filled.rowcount
+    stats.orders_in_window = (
+        await session.execute(text(_COUNT_WINDOW_SQL), params)
+    ).scalar_one()
+    stats.previously_attributed = stats.orders_in_window - candidates
+    # Temp tables are never auto-analyzed; give the planner real row counts.
+    await session.execute(text(f"ANALYZE {UNMATCHED_TABLE}"))
+    stats.prepare_seconds = time.perf_counter() - started
+
+    for tier in tiers:
+        if candidates == 0:
+            break
+        started = time.perf_counter()
+        if tier.matcher is not None:
+            await _stage_matches(session, await tier.matcher(session, context))
+            select_sql = _SELECT_MATCHES_SQL
+        else:
+            select_sql = tier.select_sql
+        result = await session.execute(
+            text(_tier_sql(select_sql)),
+            {
+                **params,
+                "tier": tier.number,
+                "confidence": tier.confidence,
+                "method": tier.method,
+            },
+        )
+        tier_stats = TierStats(
+            tier=tier.number,
+            method=tier.method,
+            candidates=candidates,
+            matched=result.rowcount,
+            seconds=time.perf_counter() - started,
+        )
+        stats.tiers.append(tier_stats)
+        candidates -= tier_stats.matched
+        logger.info(
+            "attribution tier %s (%s) org=%s matched=%s/%s in %.3fs",
+            tier.number,
+            tier.method,
+            org_id,
+            tier_stats.matched,
+            tier_stats.candidates,
+            tier_stats.seconds,
+        )
+
+    # Keep the profit rollups of the days this run attributed into current.
+    await refresh_daily_rollups(session, org_id, context.first_day, context.last_day)
+
+    logger.info(
+        "attribution org=%s window=[%s, %s) orders=%s attributed=%s coverage=%.1f%% in %.3fs",
+        org_id,
+        window_start.isoformat(),
+        window_end.isoformat(),
+        stats.orders_in_window,
+        stats.attributed,
+        stats.coverage * 100,
+        stats.seconds,
+    )
+    return stats
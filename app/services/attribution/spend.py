@@ -0,0 +1,82 @@
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import List, Sequence
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def to_days(values: Sequence[datetime]) -> np.ndarray:
+    """UTC calendar days of timestamps as a datetime64[D] array."""
+    return np.array(
+        [v.astimezone(timezone.utc).date() for v in values], dtype="datetime64[D]"
+    )
+
+
+@dataclass
+class SpendMatrix:
+    """
+    Dense day x ad-set spend in integer cents for one org.
+
+    Columns are sorted by ad set id so argmax ties resolve to the smallest
+    id, matching the SQL tiers' `ORDER BY ..., ad_set_id`.
+    """
+
+    start: np.datetime64
+    ad_set_ids: List[uuid.UUID]
+    cents: np.ndarray  # (days, ad_sets) int64
+
+    @classmethod
+    def from_rows(
+        cls, start: date, end: date, rows: Sequence[tuple]
+    ) -> "SpendMatrix":
+        """Build from (ad_set_id, date, spend_cents) rows within [start, end]."""
+        first = np.datetime64(start, "D")
+        n_days = int((np.datetime64(end, "D") - first).astype(np.int64)) + 1
+        ad_set_ids = sorted({row[0] for row in rows})
+        column = {ad_set_id: i for i, ad_set_id in enumerate(ad_set_ids)}
+
+        cents = np.zeros((max(n_days, 0), len(ad_set_ids)), dtype=np.int64)
+        if rows:
+            day_idx = (
+                np.array([row[1] for row in rows], dtype="datetime64[D]") - first
+            ).astype(np.int64)
+            col_idx = np.fromiter((column[row[0]] for row in rows), np.int64, len(rows))
+            np.add.at(
+                cents,
+                (day_idx, col_idx),
+                np.fromiter((row[2] for row in rows), np.int64, len(rows)),
+            )
+        return cls(first, ad_set_ids, cents)
+
+    @classmethod
+    async def load(
+        cls, session: AsyncSession, org_id: uuid.UUID, start: date, end: date
+    ) -> "SpendMatrix":
+        result = await session.execute(
+            text(
+                "SELECT ad_set_id, date, spend_cents FROM ad_insights "
+                "WHERE org_id = :org_id AND date BETWEEN :start AND :end "
+                "AND spend_cents > 0"
+            ),
+            {"org_id": org_id, "start": start, "end": end},
+        )
+        return cls.from_rows(start, end, result.all())
+
+    def window_sums(self, order_days: np.ndarray, lookback_days: int) -> np.ndarray:
+        """
+        Spend per ad set over [day - lookback_days, day] for each order day.
+
+        One cumulative sum over the day axis, then two row gathers per order:
+        (orders, ad_sets) int64 cents.
+        """
+        n_days = self.cents.shape[0]
+        cumulative = np.zeros((n_days + 1, self.cents.shape[1]), dtype=np.int64)
+        np.cumsum(self.cents, axis=0, out=cumulative[1:])
+
+        idx = (order_days - self.start).astype(np.int64)
+        hi = np.clip(idx + 1, 0, n_days)
+        lo = np.clip(idx - lookback_days, 0, n_days)
+        return cumulative[hi] - cumulative[lo]
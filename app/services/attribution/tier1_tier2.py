@@ -0,0 +1,64 @@
+from decimal import Decimal
+
+from app.services.attribution.base import UNMATCHED_TABLE, Tier
+
+
+# Tier 1: the order's landing-URL click id (written to click_ids at ingest)
+# also reported by an ad connector for an ad set. An indexed join on
+# (org_id, order_id); no landing URLs are parsed here.
+TIER_1 = Tier(
+    number=1,
+    method="click_id",
+    confidence=Decimal("0.95"),
+    select_sql=f"""
+SELECT DISTINCT ON (u.order_id)
+    u.order_id,
+    c.ad_set_id,
+    c.click_id AS matched_click_id,
+    u.revenue_cents AS attributed_revenue_cents
+FROM {UNMATCHED_TABLE} u
+JOIN click_ids c ON c.org_id = :org_id AND c.order_id = u.order_id
+WHERE c.ad_set_id IS NOT NULL
+ORDER BY u.order_id, c.clicked_at DESC NULLS LAST, c.click_id
+""",
+)
+
+# Tier 2: a pixel / tag purchase event within an hour of the order. An
+# event naming a different Shopify order never matches it, and each event
+# attributes at most one order: every event first picks its best order
+# (one naming it, then the closest in time), then every order keeps the best
+# of the events that picked it. Orders left without an event fall through.
+TIER_2 = Tier(
+    number=2,
+    method="pixel_event",
+    confidence=Decimal("0.85"),
+    select_sql=f"""
+WITH candidates AS (
+    SELECT
+        u.order_id,
+        u.revenue_cents,
+        e.id AS event_id,
+        e.ad_set_id,
+        e.order_ref IS NOT NULL AS names_order,
+        abs(extract(epoch FROM e.occurred_at - u.created_at)) AS distance
+    FROM {UNMATCHED_TABLE} u
+    JOIN conversion_events e
+        ON e.org_id = :org_id
+        AND e.occurred_at BETWEEN u.created_at - interval '1 hour'
+                              AND u.created_at + interval '1 hour'
+        AND (e.order_ref IS NULL OR e.order_ref = u.shopify_order_id)
+),
+claimed AS (
+    SELECT DISTINCT ON (event_id) *
+    FROM candidates
+    ORDER BY event_id, names_order DESC, distance, order_id
+)
+SELECT DISTINCT ON (order_id)
+    order_id,
+    ad_set_id,
+    NULL::varchar AS matched_click_id,
+    revenue_cents AS attributed_revenue_cents
+FROM claimed
+ORDER BY order_id, names_order DESC, distance, event_id
+""",
+)
@@ -0,0 +1,152 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.attribution.affinity import (
+    AFFINITY_WINDOW_DAYS,
+    AffinityMatrix,
+    refresh_affinity,
+)
+from app.services.attribution.base import (
+    UNMATCHED_TABLE,
+    Match,
+    RunContext,
+    Tier,
+    load_unmatched,
+)
+from app.services.attribution.spend import SpendMatrix, to_days
+
+
+# Orders scored per dense (orders x ad sets) block.
+TIER_3_BATCH_SIZE = 5000
+
+_ORDER_SKUS_SQL = f"""
+SELECT DISTINCT li.order_id, li.sku
+FROM {UNMATCHED_TABLE} u
+JOIN line_items li ON li.org_id = :org_id AND li.order_id = u.order_id
+WHERE li.sku IS NOT NULL
+"""
+
+
+def score_orders(
+    order_sku_pairs: Tuple[np.ndarray, np.ndarray],
+    n_orders: int,
+    csr: Tuple[np.ndarray, np.ndarray, np.ndarray],
+    column_of_ad_set: np.ndarray,
+    spend_windows: np.ndarray,
+) -> np.ndarray:
+    """
+    Best spend column per order, or -1.
+
+    score[o, a] = sum over the order's SKUs of (a's share of that SKU's
+    Tier 1/2 units) x (a's spend in the order's lookback window). The CSR
+    rows of every (order, SKU) pair are expanded with one repeat/gather,
+    accumulated into a dense block and reduced with argmax.
+    """
+    order_pos, sku_idx = order_sku_pairs
+    indptr, indices, data = csr
+
+    counts = indptr[sku_idx + 1] - indptr[sku_idx]
+    total = int(counts.sum())
+    best = np.full(n_orders, -1, dtype=np.int64)
+    if total == 0 or spend_windows.shape[1] == 0:
+        return best
+
+    row_offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    entries = np.repeat(indptr[sku_idx], counts) + (np.arange(total) - row_offsets)
+    orders = np.repeat(order_pos, counts)
+    columns = column_of_ad_set[indices[entries]]
+    spending = columns >= 0
+
+    shares = np.zeros((n_orders, spend_windows.shape[1]), dtype=np.float64)
+    np.add.at(shares, (orders[spending], columns[spending]), data[entries[spending]])
+
+    scores = shares * spend_windows
+    candidate = np.argmax(scores, axis=1)
+    has_score = scores[np.arange(n_orders), candidate] > 0
+    best[has_score] = candidate[has_score]
+    return best
+
+
+def _column_map(affinity: AffinityMatrix, spend: SpendMatrix) -> np.ndarray:
+    column = {ad_set_id: i for i, ad_set_id in enumerate(spend.ad_set_ids)}
+    return np.array(
+        [column.get(ad_set_id, -1) for ad_set_id in affinity.ad_set_ids], dtype=np.int64
+    )
+
+
+def _pairs(
+    order_ids: Sequence[uuid.UUID],
+    skus_by_order: dict,
+    affinity: AffinityMatrix,
+) -> Tuple[np.ndarray, np.ndarray]:
+    order_pos: List[int] = []
+    sku_idx: List[int] = []
+    for pos, order_id in enumerate(order_ids):
+        for sku in skus_by_order.get(order_id, ()):
+            idx = affinity.sku_index(sku)
+            if idx >= 0:
+                order_pos.append(pos)
+                sku_idx.append(idx)
+    return np.array(order_pos, dtype=np.int64), np.array(sku_idx, dtype=np.int64)
+
+
+async def match_sku_weighted(session: AsyncSession, context: RunContext) -> List[Match]:
+    affinity = await refresh_affinity(session, context.org_id)
+    if not affinity.skus:
+        return []
+
+    orders = await load_unmatched(session)
+    result = await session.execute(text(_ORDER_SKUS_SQL), {"org_id": context.org_id})
+    skus_by_order: dict = {}
+    for order_id, sku in result.all():
+        skus_by_order.setdefault(order_id, []).append(sku)
+
+    # UTC days, like the order days `to_days` produces.
+    start = context.first_day
+    csr = affinity.csr(
+        start - timedelta(days=AFFINITY_WINDOW_DAYS),
+        context.last_day + timedelta(days=1),
+    )
+    spend = await SpendMatrix.load(
+        session,
+        context.org_id,
+        start - timedelta(days=context.lookback_days),
+        context.last_day,
+    )
+    column_of_ad_set = _column_map(affinity, spend)
+
+    matches: List[Match] = []
+    for i in range(0, len(orders), TIER_3_BATCH_SIZE):
+        batch = orders[i : i + TIER_3_BATCH_SIZE]
+        order_ids = [o[0] for o in batch]
+        windows = spend.window_sums(to_days([o[1] for o in batch]), context.lookback_days)
+        best = score_orders(
+            _pairs(order_ids, skus_by_order, affinity),
+            len(batch),
+            csr,
+            column_of_ad_set,
+            windows,
+        )
+        matches.extend(
+            (order_id, spend.ad_set_ids[col], None, revenue_cents)
+            for (order_id, _, revenue_cents), col in zip(batch, best.tolist())
+            if col >= 0
+        )
+    return matches
+
+
+# Tier 3: ad sets spending around the order, weighted by how much of each
+# SKU in the order they have historically sold (Tier 1/2 matches over the 30
+# days before the window), scored from the persisted affinity matrix.
+TIER_3 = Tier(
+    number=3,
+    method="sku_weighted",
+    confidence=Decimal("0.70"),
+    matcher=match_sku_weighted,
+)
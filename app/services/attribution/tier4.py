@@ -0,0 +1,66 @@
+from datetime import timedelta
+from decimal import Decimal
+from typing import List
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.attribution.base import Match, RunContext, Tier, load_unmatched
+from app.services.attribution.spend import SpendMatrix, to_days
+
+
+# Orders assigned per (orders x ad sets) window-sum block.
+TIER_4_BATCH_SIZE = 5000
+
+
+def assign_by_spend(
+    spend: SpendMatrix, order_days: np.ndarray, lookback_days: int
+) -> np.ndarray:
+    """
+    Spend column with the most cents in each order's lookback window, or -1
+    when nothing spent. Integer cents throughout; ties go to the lowest
+    column, i.e. the smallest ad set id.
+    """
+    windows = spend.window_sums(order_days, lookback_days)
+    best = np.full(len(order_days), -1, dtype=np.int64)
+    if windows.shape[1] == 0:
+        return best
+    candidate = np.argmax(windows, axis=1)
+    has_spend = windows[np.arange(len(order_days)), candidate] > 0
+    best[has_spend] = candidate[has_spend]
+    return best
+
+
+async def match_blended(session: AsyncSession, context: RunContext) -> List[Match]:
+    orders = await load_unmatched(session)
+    if not orders:
+        return []
+    spend = await SpendMatrix.load(
+        session,
+        context.org_id,
+        context.first_day - timedelta(days=context.lookback_days),
+        context.last_day,
+    )
+
+    matches: List[Match] = []
+    for i in range(0, len(orders), TIER_4_BATCH_SIZE):
+        batch = orders[i : i + TIER_4_BATCH_SIZE]
+        best = assign_by_spend(spend, to_days([o[1] for o in batch]), context.lookback_days)
+        matches.extend(
+            (order_id, spend.ad_set_ids[col], None, revenue_cents)
+            for (order_id, _, revenue_cents), col in zip(batch, best.tolist())
+            if col >= 0
+        )
+    return matches
+
+
+# Tier 4: blended attribution. Each order goes to the ad set with the
+# largest share of total spend in the lookback window before the order.
+# Daily spend is loaded once into a day x ad-set array and windowed with a
+# cumulative sum.
+TIER_4 = Tier(
+    number=4,
+    method="blended",
+    confidence=Decimal("0.50"),
+    matcher=match_blended,
+)
@@ -0,0 +1,178 @@
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app import db
+from app.models.audit_log import AuditActorType, AuditLog
+
+
+logger = logging.getLogger(__name__)
+
+# Buffered entries are written once this many accumulate (and always on exit).
+AUDIT_FLUSH_SIZE = int(os.getenv("AUDIT_FLUSH_SIZE", "500"))
+# Months kept attached to audit_log; older partitions are detached for archiving.
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "13"))
+AUDIT_MONTHS_AHEAD = 3
+
+
+@dataclass
+class AuditEntry:
+    """One audit_log row; payloads are stored as JSONB as given."""
+
+    org_id: uuid.UUID
+    action_type: str
+    actor_type: AuditActorType = AuditActorType.SYSTEM
+    actor_user_id: Optional[uuid.UUID] = None
+    entity_type: Optional[str] = None
+    entity_id: Optional[str] = None
+    platform: Optional[str] = None
+    rule_id: Optional[uuid.UUID] = None
+    metric_snapshot: Optional[Dict[str, Any]] = None
+    api_request: Optional[Dict[str, Any]] = None
+    api_response_code: Optional[int] = None
+    api_response: Optional[Dict[str, Any]] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "id": uuid.uuid4(),
+            "org_id": self.org_id,
+            "actor_user_id": self.actor_user_id,
+            "actor_type": self.actor_type,
+            "action_type": self.action_type,
+            "entity_type": self.entity_type,
+            "entity_id": self.entity_id,
+            "platform": self.platform,
+            "rule_id": self.rule_id,
+            "metric_snapshot_json": self.metric_snapshot,
+            "api_request_json": self.api_request,
+            "api_response_code": self.api_response_code,
+            "api_response_json": self.api_response,
+            "created_at": self.created_at,
+            "updated_at": self.created_at,
+        }
+
+
+class AuditWriter:
+    """
+    Write-behind buffer for audit_log.
+
+    `add()` only buffers until AUDIT_FLUSH_SIZE entries are pending, then
+    writes them as one multi-row INSERT in its own session and transaction,
+    so a rollback of the caller's work never loses the record of an API call
+    that already happened. Use it as `async with AuditWriter() as audit:`
+    inside the task's coroutine: the exit flush (also on error) completes
+    before the coroutine returns, i.e. before a late-acking Celery task acks.
+    """
+
+    def __init__(
+        self,
+        session_maker: Optional[async_sessionmaker[AsyncSession]] = None,
+        *,
+        flush_size: int = AUDIT_FLUSH_SIZE,
+    ) -> None:
+        self._session_maker = session_maker
+        self.flush_size = flush_size
+        self._pending: List[AuditEntry] = []
+        self.written = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def add(self, entry: AuditEntry) -> None:
+        self._pending.append(entry)
+        if len(self._pending) >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every pending entry; on failure they stay pending and it raises."""
+        if not self._pending:
+            return 0
+        session_maker = self._session_maker or db.async_session_maker
+        if session_maker is None:
+            raise RuntimeError("DATABASE_URL is not configured")
+
+        batch = self._pending
+        async with session_maker() as session:
+            # executemany: SQLAlchemy batches these into multi-row VALUES.
+            await session.execute(insert(AuditLog), [entry.to_row() for entry in batch])
+            await session.commit()
+        self._pending = []
+        self.written += len(batch)
+        logger.debug("audit log: flushed %d entries", len(batch))
+        return len(batch)
+
+    async def __aenter__(self) -> "AuditWriter":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            await self.flush()
+        except Exception:
+            if exc is None:
+                raise
+            # Keep the original error; the flush failure is logged.
+            logger.exception("audit log: flush failed, %d entries lost", len(self._pending))
+
+
+async def get_audit_writer() -> AsyncIterator[AuditWriter]:
+    """FastAPI dependency: entries added during a request are flushed at its end."""
+    async with AuditWriter() as writer:
+        yield writer
+
+
+def _month_start(day: date, months_back: int = 0) -> date:
+    index = day.year * 12 + day.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+async def ensure_audit_partitions(
+    session: AsyncSession, *, now: Optional[datetime] = None
+) -> None:
+    """Create this month's and the next AUDIT_MONTHS_AHEAD months' partitions."""
+    today = (now or datetime.now(timezone.utc)).date()
+    await session.execute(
+        text("SELECT pfam_ensure_monthly_range_partitions('audit_log', :from_month, :months)"),
+        {"from_month": _month_start(today), "months": AUDIT_MONTHS_AHEAD + 1},
+    )
+
+
+async def detach_expired_audit_partitions(
+    session: AsyncSession,
+    *,
+    retention_months: int = AUDIT_RETENTION_MONTHS,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Detach monthly partitions wholly older than the retention window.
+
+    Detached tables keep their rows: archive them (e.g. pg_dump to R2) and
+    DROP them afterwards. Nothing is ever DELETEd from audit_log.
+    """
+    today = (now or datetime.now(timezone.utc)).date()
+    cutoff = _month_start(today, retention_months)
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = 'audit_log' AND c.relname ~ '^audit_log_[0-9]{4}_[0-9]{2}$' "
+            "ORDER BY c.relname"
+        )
+    )
+    detached: List[str] = []
+    for name in result.scalars():
+        year, month = int(name[-7:-3]), int(name[-2:])
+        if date(year, month, 1) >= cutoff:
+            break
+        await session.execute(text(f'ALTER TABLE audit_log DETACH PARTITION "{name}"'))
+        detached.append(name)
+    if detached:
+        logger.info("audit log: detached %s for archiving", ", ".join(detached))
+    return detached
@@ -0,0 +1,395 @@
+import base64
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from sqlalchemy import bindparam, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ad_accounts import AdAccount
+from app.models.stores import Store
+from app.services.sync_state import Connector
+
+
+logger = logging.getLogger(__name__)
+
+ROTATE_KEYS_TASK = "credentials.rotate_keys"
+
+# Current key: base64 of 32 bytes (AES-256), and the id stored next to every
+# token it encrypts.
+AES_KEY = os.getenv("AES_KEY")
+AES_KEY_ID = os.getenv("AES_KEY_ID", "k1")
+# Retired keys still needed to decrypt until rotation finishes: "id:base64,...".
+AES_PREVIOUS_KEYS = os.getenv("AES_PREVIOUS_KEYS", "")
+
+CREDENTIAL_CACHE_TTL_SECONDS = float(os.getenv("CREDENTIAL_CACHE_TTL_SECONDS", "300"))
+CREDENTIAL_CACHE_MAX = int(os.getenv("CREDENTIAL_CACHE_MAX", "10000"))
+ROTATION_BATCH_SIZE = 500
+
+NONCE_BYTES = 12
+
+CONNECTOR_MODELS: Tuple[Type[Connector], ...] = (Store, AdAccount)
+
+
+class CredentialError(Exception):
+    """A token cannot be decrypted: unknown key id, or wrong key / tampered data."""
+
+
+def _zero(buffer: bytearray) -> None:
+    buffer[:] = bytes(len(buffer))
+
+
+class SecretToken:
+    """
+    A decrypted token. Never shows its value in repr / str / logs; call
+    `reveal()` at the point of use (e.g. building an Authorization header).
+
+    Every caller gets its own copy of the plaintext, in a bytearray only
+    that caller can wipe: the vault's cache never touches it. Call `wipe()`
+    once the token has been handed to a client. Strings returned by
+    `reveal()` are ordinary, immutable Python objects; keep them short-lived.
+    """
+
+    __slots__ = ("_value", "_wiped")
+
+    def __init__(self, value: bytearray) -> None:
+        self._value = value
+        self._wiped = False
+
+    def reveal(self) -> str:
+        if self._wiped:
+            raise CredentialError("token was wiped; decrypt it again")
+        return self._value.decode()
+
+    def wipe(self) -> None:
+        _zero(self._value)
+        self._wiped = True
+
+    def __repr__(self) -> str:
+        return "SecretToken('***')"
+
+    __str__ = __repr__
+
+
+def _parse_key(encoded: str) -> bytes:
+    key = base64.b64decode(encoded)
+    if len(key) != 32:
+        raise ValueError("AES keys must be 32 bytes (base64-encoded)")
+    return key
+
+
+def _associated_data(table: str, row_id: uuid.UUID, org_id: uuid.UUID) -> bytes:
+    # Binds a ciphertext to its row: a token copied onto another connector
+    # (or another org) fails authentication instead of decrypting.
+    return f"{table}:{org_id}:{row_id}".encode()
+
+
+CacheKey = Tuple[str, uuid.UUID, uuid.UUID, str, bytes]
+
+
+class _TokenCache:
+    """
+    Bounded cache of decrypted tokens; plaintext leaving it is zeroed.
+
+    Entries are private bytearrays: callers only ever get copies (see
+    `SecretToken`), so evicting an entry never invalidates a token a caller
+    still holds. Every entry gets the same TTL, so insertion order is expiry
+    order: expired entries are always at the front and purging them (or
+    evicting for size) never scans the rest.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: "OrderedDict[CacheKey, Tuple[float, bytearray]]" = OrderedDict()
+
+    def get(self, key: CacheKey) -> Optional[bytearray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() >= entry[0]:
+            self.purge_expired()
+            return None
+        return entry[1]
+
+    def set(self, key: CacheKey, plaintext: bytearray) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None and previous[1] is not plaintext:
+            _zero(previous[1])
+        self._entries[key] = (time.monotonic() + self._ttl, plaintext)
+        while len(self._entries) > self._maxsize:
+            _zero(self._entries.popitem(last=False)[1][1])
+
+    def purge_expired(self) -> None:
+        now = time.monotonic()
+        while self._entries:
+            key, (expires_at, plaintext) = next(iter(self._entries.items()))
+            if now < expires_at:
+                break
+            del self._entries[key]
+            _zero(plaintext)
+
+    def clear(self) -> None:
+        for _, plaintext in self._entries.values():
+            _zero(plaintext)
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass
+class RotationStats:
+    reencrypted: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+class CredentialVault:
+    """
+    Encrypts and decrypts connector OAuth tokens (AES-256-GCM).
+
+    Keys are decoded and their ciphers built once, when the vault is
+    created. Decrypted tokens are cached for CREDENTIAL_CACHE_TTL_SECONDS
+    and zeroed when they expire or are evicted; callers get their own copies.
+    """
+
+    def __init__(
+        self,
+        current_key_id: str,
+        keys: Mapping[str, bytes],
+        *,
+        cache_ttl: float = CREDENTIAL_CACHE_TTL_SECONDS,
+        cache_max: int = CREDENTIAL_CACHE_MAX,
+    ) -> None:
+        if current_key_id not in keys:
+            raise ValueError(f"no key for current key id {current_key_id!r}")
+        self.current_key_id = current_key_id
+        self._ciphers = {key_id: AESGCM(key) for key_id, key in keys.items()}
+        self._cache = _TokenCache(cache_max, cache_ttl)
+
+    @classmethod
+    def from_env(cls) -> "CredentialVault":
+        if not AES_KEY:
+            raise RuntimeError("AES_KEY is not configured")
+        keys = {AES_KEY_ID: _parse_key(AES_KEY)}
+        for item in filter(None, (part.strip() for part in AES_PREVIOUS_KEYS.split(","))):
+            key_id, _, encoded = item.partition(":")
+            keys.setdefault(key_id.strip(), _parse_key(encoded.strip()))
+        return cls(AES_KEY_ID, keys)
+
+    def encrypt(
+        self, table: str, row_id: uuid.UUID, org_id: uuid.UUID, plaintext: str
+    ) -> Tuple[bytes, bytes, str]:
+        """Returns (access_token_enc, access_token_iv, access_token_key_id)."""
+        nonce = os.urandom(NONCE_BYTES)
+        ciphertext = self._ciphers[self.current_key_id].encrypt(
+            nonce, plaintext.encode(), _associated_data(table, row_id, org_id)
+        )
+        return ciphertext, nonce, self.current_key_id
+
+    def set_token(self, connector: Connector, plaintext: str) -> None:
+        """Encrypt `plaintext` onto the connector's token columns (assign its id first)."""
+        if connector.id is None:
+            connector.id = uuid.uuid4()
+        (
+            connector.access_token_enc,
+            connector.access_token_iv,
+            connector.access_token_key_id,
+        ) = self.encrypt(connector.__tablename__, connector.id, connector.org_id, plaintext)
+
+    def _decrypt_raw(
+        self,
+        table: str,
+        row_id: uuid.UUID,
+        org_id: uuid.UUID,
+        ciphertext: bytes,
+        nonce: bytes,
+        key_id: str,
+    ) -> bytearray:
+        cipher = self._ciphers.get(key_id)
+        if cipher is None:
+            raise CredentialError(f"{table} {row_id}: unknown key id {key_id!r}")
+        try:
+            return bytearray(
+                cipher.decrypt(bytes(nonce), bytes(ciphertext), _associated_data(table, row_id, org_id))
+            )
+        except InvalidTag:
+            raise CredentialError(f"{table} {row_id}: token failed authentication") from None
+
+    def decrypt(
+        self,
+        table: str,
+        row_id: uuid.UUID,
+        org_id: uuid.UUID,
+        ciphertext: bytes,
+        nonce: bytes,
+        key_id: str,
+    ) -> SecretToken:
+        # The nonce is fresh for every encryption, so a replaced or rotated
+        # token never matches a stale entry; a cached token is only returned
+        # for the same row and org it was decrypted (and authenticated) for.
+        cache_key = (table, row_id, org_id, key_id, bytes(nonce))
+        plaintext = self._cache.get(cache_key)
+        if plaintext is None:
+            plaintext = self._decrypt_raw(table, row_id, org_id, ciphertext, nonce, key_id)
+            self._cache.set(cache_key, plaintext)
+        return SecretToken(bytearray(plaintext))
+
+    def token_for(self, connector: Connector) -> SecretToken:
+        return self.decrypt(
+            connector.__tablename__,
+            connector.id,
+            connector.org_id,
+            connector.access_token_enc,
+            connector.access_token_iv,
+            connector.access_token_key_id,
+        )
+
+    def decrypt_many(
+        self, connectors: Iterable[Connector]
+    ) -> Tuple[Dict[uuid.UUID, SecretToken], Dict[uuid.UUID, str]]:
+        """
+        Tokens for every connector, from cache or one pass of decryption.
+
+        A bad token does not fail the batch: it is reported in the second
+        dict (connector id -> reason) and its sync can be skipped.
+        """
+        self._cache.purge_expired()
+        tokens: Dict[uuid.UUID, SecretToken] = {}
+        failures: Dict[uuid.UUID, str] = {}
+        for connector in connectors:
+            try:
+                tokens[connector.id] = self.token_for(connector)
+            except CredentialError as exc:
+                failures[connector.id] = str(exc)
+        if failures:
+            logger.warning("credential vault: %d tokens could not be decrypted", len(failures))
+        return tokens, failures
+
+    async def load_tokens(
+        self,
+        session: AsyncSession,
+        model: Type[Connector],
+        keys: Sequence[Tuple[uuid.UUID, uuid.UUID]],
+    ) -> Tuple[Dict[uuid.UUID, SecretToken], Dict[uuid.UUID, str]]:
+        """
+        Bulk variant for fan-out tasks: fetch the token columns for many
+        (org_id, connector id) pairs in one query, then `decrypt_many`.
+        """
+        if not keys:
+            return {}, {}
+        result = await session.execute(
+            select(model).where(tuple_(model.org_id, model.id).in_(list(keys)))
+        )
+        return self.decrypt_many(result.scalars().all())
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    async def rotate(
+        self,
+        session: AsyncSession,
+        *,
+        batch_size: int = ROTATION_BATCH_SIZE,
+        models: Sequence[Type[Connector]] = CONNECTOR_MODELS,
+    ) -> RotationStats:
+        """
+        Re-encrypt every token not yet under the current key, `batch_size`
+        rows per transaction.
+
+        This key-maintenance pass spans all orgs; rows are locked with SKIP
+        LOCKED so concurrent syncs and a second rotation never block, and
+        a rerun resumes where a failed one stopped. A token under an unknown
+        key id raises CredentialError (list the old key in AES_PREVIOUS_KEYS
+        and rerun). Plaintext only exists in memory between the decrypt and
+        encrypt of one row.
+        """
+        started = time.perf_counter()
+        stats = RotationStats()
+        for model in models:
+            table = model.__tablename__
+            stats.reencrypted[table] = 0
+            stmt = (
+                select(
+                    model.id,
+                    model.org_id,
+                    model.access_token_enc,
+                    model.access_token_iv,
+                    model.access_token_key_id,
+                )
+                .where(model.access_token_key_id != self.current_key_id)
+                .order_by(model.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            # Core UPDATE on the table: one executemany per batch, not ORM bulk-by-PK.
+            columns = model.__table__.c
+            update_stmt = (
+                update(model.__table__)
+                .where(
+                    columns.id == bindparam("row_id"),
+                    columns.org_id == bindparam("row_org_id"),
+                )
+                .values(
+                    access_token_enc=bindparam("enc"),
+                    access_token_iv=bindparam("iv"),
+                    access_token_key_id=bindparam("key_id"),
+                )
+            )
+            while True:
+                rows = (await session.execute(stmt)).all()
+                if not rows:
+                    break
+                params: List[Dict[str, object]] = []
+                for row in rows:
+                    plaintext = self._decrypt_raw(
+                        table,
+                        row.id,
+                        row.org_id,
+                        row.access_token_enc,
+                        row.access_token_iv,
+                        row.access_token_key_id,
+                    )
+                    try:
+                        enc, iv, key_id = self.encrypt(
+                            table, row.id, row.org_id, plaintext.decode()
+                        )
+                    finally:
+                        _zero(plaintext)
+                    params.append(
+                        {
+                            "row_id": row.id,
+                            "row_org_id": row.org_id,
+                            "enc": enc,
+                            "iv": iv,
+                            "key_id": key_id,
+                        }
+                    )
+                await session.execute(update_stmt, params)
+                await session.commit()
+                stats.reencrypted[table] += len(rows)
+                logger.info(
+                    "credential rotation: %s re-encrypted %d (total %d)",
+                    table,
+                    len(rows),
+                    stats.reencrypted[table],
+                )
+        stats.seconds = time.perf_counter() - started
+        return stats
+
+
+_vault: Optional[CredentialVault] = None
+
+
+def get_vault() -> CredentialVault:
+    """The process-wide vault; keys are read from the environment once."""
+    global _vault
+    if _vault is None:
+        _vault = CredentialVault.from_env()
+    return _vault
@@ -0,0 +1 @@
+"""Bulk ingestion helpers shared by the connector sync workers."""
@@ -0,0 +1,200 @@
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class UpsertSpec:
+    """
+    How rows map onto a target table for `bulk_upsert`.
+
+    - `columns`: order of the values in every row tuple (include `id`).
+    - `conflict_columns`: the unique key rows are matched on.
+    - `update_columns`: columns overwritten on conflict; defaults to every
+      column except the key, `id` and `created_at`.
+    - `touch_column`: set to now() whenever an existing row actually changes.
+    - `uncompared_columns`: update columns (e.g. a computed_at stamp) that
+      are written when a row changes but do not by themselves make it
+      changed.
+    - `update_where`: extra condition an existing row must meet to be
+      updated, in terms of the table and EXCLUDED.
+    """
+
+    table: str
+    columns: Tuple[str, ...]
+    conflict_columns: Tuple[str, ...]
+    update_columns: Optional[Tuple[str, ...]] = None
+    touch_column: Optional[str] = "updated_at"
+    uncompared_columns: Tuple[str, ...] = ()
+    update_where: Optional[str] = None
+
+    def resolved_update_columns(self) -> Tuple[str, ...]:
+        if self.update_columns is not None:
+            return self.update_columns
+        skip = set(self.conflict_columns) | {"id", "created_at"}
+        return tuple(c for c in self.columns if c not in skip)
+
+    @property
+    def staging_table(self) -> str:
+        return f"_stage_{self.table}"
+
+
+@dataclass
+class BatchStats:
+    """Outcome and timing of one COPY + merge batch."""
+
+    rows: int
+    written: int
+    copy_seconds: float
+    merge_seconds: float
+
+    @property
+    def unchanged(self) -> int:
+        return self.rows - self.written
+
+
+@dataclass
+class UpsertStats:
+    """Totals across all batches of one `bulk_upsert` call."""
+
+    batches: List[BatchStats] = field(default_factory=list)
+
+    @property
+    def rows(self) -> int:
+        return sum(b.rows for b in self.batches)
+
+    @property
+    def written(self) -> int:
+        return sum(b.written for b in self.batches)
+
+    @property
+    def unchanged(self) -> int:
+        return sum(b.unchanged for b in self.batches)
+
+
+def _merge_sql(spec: UpsertSpec) -> str:
+    cols = ", ".join(spec.columns)
+    updates = spec.resolved_update_columns()
+    insert = (
+        f"INSERT INTO {spec.table} ({cols}) "
+        f"SELECT {cols} FROM {spec.staging_table} "
+        f"ON CONFLICT ({', '.join(spec.conflict_columns)}) "
+    )
+    if not updates:
+        return insert + "DO NOTHING"
+
+    assignments = [f"{c} = EXCLUDED.{c}" for c in updates]
+    if spec.touch_column:
+        assignments.append(f"{spec.touch_column} = now()")
+    compared = [c for c in updates if c not in spec.uncompared_columns]
+    target = ", ".join(f"{spec.table}.{c}" for c in compared)
+    excluded = ", ".join(f"EXCLUDED.{c}" for c in compared)
+
+    # The WHERE clause turns re-syncs of unchanged rows into no-ops: no new
+    # row version, no index churn, and they are not counted as written.
+    where = f"({target}) IS DISTINCT FROM ({excluded})"
+    if spec.update_where:
+        where = f"({spec.update_where}) AND {where}"
+    return insert + f"DO UPDATE SET {', '.join(assignments)} WHERE {where}"
+
+
+def _dedupe(spec: UpsertSpec, rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """Keep the last row per conflict key; ON CONFLICT cannot hit a row twice."""
+    key_idx = [spec.columns.index(c) for c in spec.conflict_columns]
+    latest = {tuple(row[i] for i in key_idx): row for row in rows}
+    return list(latest.values())
+
+
+def batched(
+    rows: Iterable[Tuple[Any, ...]], size: int
+) -> Iterable[List[Tuple[Any, ...]]]:
+    batch: List[Tuple[Any, ...]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def driver_connection(session: AsyncSession) -> Any:
+    """The asyncpg connection under the session's current transaction."""
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection  # asyncpg.Connection
+
+
+async def _copy_batch(
+    session: AsyncSession, spec: UpsertSpec, batch: List[Tuple[Any, ...]]
+) -> BatchStats:
+    # Temp tables are never WAL-logged and are private to this connection,
+    # which also keeps them safe behind PgBouncer's transaction pooling.
+    # Creating it through the session starts the transaction the COPY joins.
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {spec.staging_table} "
+            f"(LIKE {spec.table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+    )
+    await session.execute(text(f"TRUNCATE {spec.staging_table}"))
+
+    driver = await driver_connection(session)
+
+    start = time.perf_counter()
+    await driver.copy_records_to_table(
+        spec.staging_table, records=batch, columns=list(spec.columns)
+    )
+    copied = time.perf_counter()
+    result = await session.execute(text(_merge_sql(spec)))
+    merged = time.perf_counter()
+
+    return BatchStats(
+        rows=len(batch),
+        written=result.rowcount,
+        copy_seconds=copied - start,
+        merge_seconds=merged - copied,
+    )
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    spec: UpsertSpec,
+    rows: Iterable[Tuple[Any, ...]],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    commit_each_batch: bool = True,
+) -> UpsertStats:
+    """
+    Idempotently upsert `rows` into `spec.table` and return per-batch stats.
+
+    Every batch is one binary COPY into a temp staging table followed by a
+    single set-based INSERT ... ON CONFLICT DO UPDATE. With
+    `commit_each_batch` the transaction is committed after every batch, so
+    a large load holds locks briefly and a failure only loses one batch;
+    re-running is safe because the merge is idempotent.
+    """
+    totals = UpsertStats()
+    for batch in batched(rows, batch_size):
+        stats = await _copy_batch(session, spec, _dedupe(spec, batch))
+        if commit_each_batch:
+            await session.commit()
+        logger.debug(
+            "bulk upsert %s: %d rows, %d written, copy %.3fs, merge %.3fs",
+            spec.table,
+            stats.rows,
+            stats.written,
+            stats.copy_seconds,
+            stats.merge_seconds,
+        )
+        totals.batches.append(stats)
+    return totals
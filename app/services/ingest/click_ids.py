@@ -0,0 +1,124 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.ingest.bulk import (
+    DEFAULT_BATCH_SIZE,
+    UpsertSpec,
+    UpsertStats,
+    bulk_upsert,
+)
+
+
+# Landing-URL query parameter -> ad platform that issued the click id.
+CLICK_ID_PARAMS = {
+    "fbclid": "meta",
+    "gclid": "google",
+    "ttclid": "tiktok",
+}
+
+_CLICK_KEY = ("org_id", "click_id", "platform")
+
+# Each side only writes its own columns, so an order landing before (or
+# after) the connector reports the click fills the same row. A click keeps
+# the first order synced with it: a later order reusing the click id does
+# not take over the row (and its Tier 1 match).
+ORDER_CLICK_SPEC = UpsertSpec(
+    table="click_ids",
+    columns=("id", "org_id", "platform", "click_id", "order_id", "ordered_at"),
+    conflict_columns=_CLICK_KEY,
+    update_columns=("order_id", "ordered_at"),
+    update_where="click_ids.order_id IS NULL OR click_ids.order_id = EXCLUDED.order_id",
+)
+
+AD_CLICK_SPEC = UpsertSpec(
+    table="click_ids",
+    columns=("id", "org_id", "platform", "click_id", "ad_set_id", "clicked_at"),
+    conflict_columns=_CLICK_KEY,
+    update_columns=("ad_set_id", "clicked_at"),
+)
+
+
+def extract_click_ids(landing_site: Optional[str]) -> List[Tuple[str, str]]:
+    """Return (platform, click_id) pairs found in a landing URL's query string."""
+    if not landing_site:
+        return []
+    try:
+        query = urlsplit(landing_site).query
+    except ValueError:
+        return []
+    return [
+        (CLICK_ID_PARAMS[key], value[:255])
+        for key, value in parse_qsl(query)
+        if key in CLICK_ID_PARAMS and value
+    ]
+
+
+def order_click_rows(
+    org_id: uuid.UUID, order_id: uuid.UUID, ordered_at: datetime, landing_site: Optional[str]
+) -> List[Tuple[Any, ...]]:
+    """ORDER_CLICK_SPEC rows for the click ids on one order's landing URL."""
+    return [
+        (uuid.uuid4(), org_id, platform, click_id, order_id, ordered_at)
+        for platform, click_id in extract_click_ids(landing_site)
+    ]
+
+
+def first_order_per_click(rows: Iterable[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+    """
+    One ORDER_CLICK_SPEC row per click id: the earliest order's. Within a
+    batch, bulk_upsert would otherwise keep whichever row came last.
+    """
+    first: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+    for row in rows:
+        _, org_id, platform, click_id, order_id, ordered_at = row
+        key = (org_id, click_id, platform)
+        kept = first.get(key)
+        if kept is None or (ordered_at, str(order_id)) < (kept[5], str(kept[4])):
+            first[key] = row
+    return list(first.values())
+
+
+def ad_click_rows(
+    org_id: uuid.UUID,
+    platform: str,
+    clicks: Iterable[Dict[str, Any]],
+    ad_set_ids: Mapping[str, uuid.UUID],
+) -> List[Tuple[Any, ...]]:
+    """
+    AD_CLICK_SPEC rows from normalized connector clicks (`platform_adset_id`,
+    `click_id`, `clicked_at`). Clicks on ad sets we do not track are skipped.
+    """
+    return [
+        (
+            uuid.uuid4(),
+            org_id,
+            platform,
+            click["click_id"],
+            ad_set_ids[click["platform_adset_id"]],
+            click["clicked_at"],
+        )
+        for click in clicks
+        if click["platform_adset_id"] in ad_set_ids
+    ]
+
+
+async def upsert_ad_click_ids(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    platform: str,
+    clicks: Iterable[Dict[str, Any]],
+    ad_set_ids: Mapping[str, uuid.UUID],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> UpsertStats:
+    """Write the click id -> ad set side of the index for one connector."""
+    return await bulk_upsert(
+        session,
+        AD_CLICK_SPEC,
+        ad_click_rows(org_id, platform, clicks, ad_set_ids),
+        batch_size=batch_size,
+    )
@@ -0,0 +1,222 @@
+import csv
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cogs_settings import CogsScope, CogsType
+from app.services.ingest.bulk import driver_connection
+from app.services.money import to_cents
+from app.services.profit.dirty import ProfitInputChanges, mark_dirty
+
+
+logger = logging.getLogger(__name__)
+
+IMPORT_COGS_TASK = "cogs.import_csv"
+
+# Rows validated and COPYed per chunk.
+COGS_IMPORT_CHUNK_ROWS = int(os.getenv("COGS_IMPORT_CHUNK_ROWS", "5000"))
+# Rejected rows beyond this many are counted but not listed.
+COGS_IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("COGS_IMPORT_MAX_REPORTED_ERRORS", "1000"))
+
+SKU_HEADERS = ("sku", "variant_sku")
+VALUE_HEADERS = ("cogs", "unit_cost", "cost", "value")
+MAX_SKU_LENGTH = 255
+
+_STAGING_TABLE = "_stage_cogs_import"
+_STAGING_COLUMNS = ("line", "sku", "cogs_type", "cogs_value_cents", "cogs_percent")
+
+# Later lines win for SKUs listed twice. RETURNING yields only inserted or
+# actually changed rows, since unchanged ones are filtered by the WHERE.
+_MERGE_SQL = f"""
+INSERT INTO cogs_settings AS c (
+    id, org_id, scope, scope_value, cogs_type, cogs_value_cents, cogs_percent,
+    source, created_at, updated_at
+)
+SELECT gen_random_uuid(), :org_id, 'sku', s.sku, s.cogs_type::cogs_type,
+       s.cogs_value_cents, s.cogs_percent, 'csv', now(), now()
+FROM (
+    SELECT DISTINCT ON (sku) * FROM {_STAGING_TABLE} ORDER BY sku, line DESC
+) AS s
+ON CONFLICT (org_id, scope, scope_value) DO UPDATE SET
+    cogs_type = EXCLUDED.cogs_type,
+    cogs_value_cents = EXCLUDED.cogs_value_cents,
+    cogs_percent = EXCLUDED.cogs_percent,
+    source = EXCLUDED.source,
+    updated_at = now()
+WHERE (c.cogs_type, c.cogs_value_cents, c.cogs_percent, c.source)
+    IS DISTINCT FROM
+    (EXCLUDED.cogs_type, EXCLUDED.cogs_value_cents, EXCLUDED.cogs_percent, EXCLUDED.source)
+RETURNING c.scope_value
+"""
+
+
+class CogsCsvError(ValueError):
+    """The file as a whole cannot be imported (e.g. missing columns)."""
+
+
+@dataclass(frozen=True)
+class CogsRowError:
+    line: int
+    sku: Optional[str]
+    error: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"line": self.line, "sku": self.sku, "error": self.error}
+
+
+@dataclass
+class CogsImportResult:
+    rows_total: int = 0
+    rows_invalid: int = 0
+    row_errors: List[CogsRowError] = field(default_factory=list)
+    changed_skus: Set[str] = field(default_factory=set)
+    dirty_cells: int = 0
+    seconds: float = 0.0
+
+    def reject(self, line: int, sku: Optional[str], error: str) -> None:
+        self.rows_invalid += 1
+        if len(self.row_errors) < COGS_IMPORT_MAX_REPORTED_ERRORS:
+            self.row_errors.append(CogsRowError(line, sku, error))
+
+
+def parse_cogs_value(raw: str) -> Tuple[CogsType, Optional[int], Optional[Decimal]]:
+    """
+    "12.34" is an absolute cost (1234 cents per unit); "35%" a percentage of
+    the unit price. Raises ValueError for anything else.
+    """
+    value = raw.strip()
+    if not value:
+        raise ValueError("missing value")
+    if value.endswith("%"):
+        try:
+            percent = Decimal(value[:-1].strip())
+        except InvalidOperation:
+            raise ValueError(f"invalid percentage: {raw!r}")
+        if not percent.is_finite() or not 0 <= percent <= 100:
+            raise ValueError(f"percentage out of range: {raw!r}")
+        return CogsType.PERCENTAGE, None, percent.quantize(Decimal("0.0001"))
+    cents = to_cents(value.lstrip("$"))
+    if cents < 0:
+        raise ValueError(f"negative cost: {raw!r}")
+    return CogsType.ABSOLUTE, cents, None
+
+
+def _columns(header: List[str]) -> Tuple[int, int]:
+    names = [name.strip().lower() for name in header]
+    sku = next((names.index(n) for n in SKU_HEADERS if n in names), None)
+    value = next((names.index(n) for n in VALUE_HEADERS if n in names), None)
+    if sku is None or value is None:
+        raise CogsCsvError(
+            f"header must name a SKU column ({', '.join(SKU_HEADERS)}) "
+            f"and a value column ({', '.join(VALUE_HEADERS)})"
+        )
+    return sku, value
+
+
+def validated_chunks(
+    lines: Iterable[str],
+    result: CogsImportResult,
+    *,
+    chunk_rows: int = COGS_IMPORT_CHUNK_ROWS,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Staging rows from CSV `lines`, `chunk_rows` at a time. Rejected rows are
+    recorded on `result` and skipped; only the current chunk is in memory.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        raise CogsCsvError("file is empty")
+    sku_col, value_col = _columns(header)
+    width = max(sku_col, value_col) + 1
+
+    chunk: List[Tuple[Any, ...]] = []
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        result.rows_total += 1
+        line = reader.line_num
+        if len(row) < width:
+            result.reject(line, None, "missing columns")
+            continue
+        sku = row[sku_col].strip()
+        if not sku:
+            result.reject(line, None, "missing sku")
+            continue
+        if len(sku) > MAX_SKU_LENGTH:
+            result.reject(line, sku[:MAX_SKU_LENGTH], f"sku longer than {MAX_SKU_LENGTH}")
+            continue
+        try:
+            cogs_type, cents, percent = parse_cogs_value(row[value_col])
+        except ValueError as exc:
+            result.reject(line, sku, str(exc))
+            continue
+        chunk.append((line, sku, cogs_type.value, cents, percent))
+        if len(chunk) >= chunk_rows:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def import_cogs_csv(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    lines: Iterable[str],
+    *,
+    chunk_rows: int = COGS_IMPORT_CHUNK_ROWS,
+) -> CogsImportResult:
+    """
+    Upsert SKU-scope COGS settings from a SKU + value CSV.
+
+    Each validated chunk is COPYed into a temp staging table, then one
+    set-based INSERT ... ON CONFLICT merges the whole file and returns the
+    SKUs whose setting was created or changed; those are marked dirty for
+    the profit engine. Caller commits.
+    """
+    started = time.perf_counter()
+    result = CogsImportResult()
+
+    await session.execute(
+        text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} ("
+            "line bigint NOT NULL, sku text NOT NULL, cogs_type text NOT NULL, "
+            "cogs_value_cents bigint, cogs_percent numeric(7, 4)"
+            ") ON COMMIT DROP"
+        )
+    )
+    await session.execute(text(f"TRUNCATE {_STAGING_TABLE}"))
+    driver = await driver_connection(session)
+
+    for chunk in validated_chunks(lines, result, chunk_rows=chunk_rows):
+        await driver.copy_records_to_table(
+            _STAGING_TABLE, records=chunk, columns=list(_STAGING_COLUMNS)
+        )
+
+    merged = await session.execute(text(_MERGE_SQL), {"org_id": org_id})
+    result.changed_skus = set(merged.scalars())
+
+    if result.changed_skus:
+        changes = ProfitInputChanges()
+        for sku in result.changed_skus:
+            changes.add_cogs(CogsScope.SKU, sku)
+        result.dirty_cells = await mark_dirty(session, org_id, changes)
+
+    result.seconds = time.perf_counter() - started
+    logger.info(
+        "cogs import org=%s rows=%s invalid=%s changed=%s dirty_cells=%s in %.2fs",
+        org_id,
+        result.rows_total,
+        result.rows_invalid,
+        len(result.changed_skus),
+        result.dirty_cells,
+        result.seconds,
+    )
+    return result
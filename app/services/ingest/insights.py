@@ -0,0 +1,556 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from urllib.parse import urlencode
+
+import httpx
+
+from app.models.ad_accounts import AdAccount
+from app.services.credentials import CredentialVault, get_vault
+from app.services.money import to_cents
+from app.services.rate_limit import RateLimiter
+
+
+logger = logging.getLogger(__name__)
+
+META_GRAPH_URL = "https://graph.facebook.com/v18.0"
+GOOGLE_ADS_URL = "https://googleads.googleapis.com/v16"
+GOOGLE_ADS_DEVELOPER_TOKEN = os.getenv("GOOGLE_ADS_DEVELOPER_TOKEN")
+
+META_INSIGHTS_FIELDS = (
+    "adset_id,date_start,spend,impressions,clicks,reach,actions,action_values"
+)
+# Error code 17 is Meta's "user request limit reached"; 4, 32 and 613 are the
+# app / page / custom-level equivalents and are handled the same way.
+META_THROTTLE_CODES = frozenset({4, 17, 32, 613})
+# Seconds to wait before the 1st, 2nd and 3rd retry after a throttling error,
+# per the connector spec. A fixed per-attempt schedule; the request fails once
+# it runs out.
+DEFAULT_BACKOFF_SCHEDULE: Tuple[float, ...] = (300.0, 900.0, 3600.0)
+
+# Meta's batch endpoint accepts up to 50 requests per call.
+META_BATCH_SIZE = 50
+# Longer ranges go through an async report job instead of per-ad-set calls.
+META_ASYNC_REPORT_MIN_DAYS = 30
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Process-wide pooled client reused by every fetcher."""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
+class PlatformApiError(Exception):
+    """Error returned by an ad platform API."""
+
+    def __init__(self, message: str, status_code: int, code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+
+
+@dataclass
+class InsightsPage:
+    """One page of raw insights rows as returned by the platform."""
+
+    platform: str
+    account_id: str
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+
+
+class _FetcherBase:
+    platform: str = ""
+
+    def __init__(
+        self,
+        *,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = 8,
+        rate_limiter: Optional[RateLimiter] = None,
+        connector_id: Optional[str] = None,
+        backoff_schedule: Sequence[float] = DEFAULT_BACKOFF_SCHEDULE,
+        queue_size: int = 32,
+    ) -> None:
+        self._client = client
+        # One fetcher per ad account, so this bounds per-account parallelism.
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = rate_limiter
+        self._connector_id = connector_id
+        self._backoff_schedule = tuple(backoff_schedule)
+        self._queue_size = queue_size
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or get_shared_client()
+
+    def _is_throttled(self, error: PlatformApiError) -> bool:
+        return error.status_code == 429
+
+    def _raise_for_error(self, resp: httpx.Response) -> None:
+        if resp.status_code >= 400:
+            raise PlatformApiError(resp.text[:500], resp.status_code)
+
+    async def _send(self, method: str, url: str, **kwargs: Any) -> Dict[str, Any]:
+        """Send one request, retrying throttling errors after each wait in the schedule."""
+        attempt = 0
+        while True:
+            if self._rate_limiter is not None and self._connector_id is not None:
+                await self._rate_limiter.acquire(self.platform, self._connector_id)
+
+            resp = await self.client.request(method, url, **kwargs)
+
+            if self._rate_limiter is not None and self._connector_id is not None:
+                await self._rate_limiter.observe(
+                    self.platform, self._connector_id, resp.status_code, resp.headers
+                )
+            try:
+                self._raise_for_error(resp)
+                return resp.json()
+            except PlatformApiError as exc:
+                if not self._is_throttled(exc) or attempt >= len(self._backoff_schedule):
+                    raise
+                delay = self._backoff_schedule[attempt]
+                attempt += 1
+                logger.warning(
+                    "%s throttled (code %s), retry %d in %.0fs",
+                    self.platform,
+                    exc.code,
+                    attempt,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+
+    async def _stream(
+        self, jobs: Sequence[Callable[[], AsyncIterator[InsightsPage]]]
+    ) -> AsyncIterator[InsightsPage]:
+        """
+        Run page-producing jobs concurrently and yield pages as they arrive.
+
+        At most `max_concurrency` jobs hold a connection at once, and the
+        bounded queue pushes back on producers when the consumer (the upsert
+        stage) is slower than the API. A failing job cancels the others and
+        its error (e.g. PlatformApiError) is raised to the consumer as is;
+        only when several jobs fail together is an ExceptionGroup raised.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        finished = object()
+
+        async def run(job: Callable[[], AsyncIterator[InsightsPage]]) -> None:
+            async with self._semaphore:
+                async for page in job():
+                    await queue.put(page)
+
+        async def run_all() -> None:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for job in jobs:
+                        group.create_task(run(job))
+            except* Exception as failed:
+                if len(failed.exceptions) == 1:
+                    raise failed.exceptions[0] from None
+                raise
+            finally:
+                await queue.put(finished)
+
+        producer = asyncio.create_task(run_all())
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                yield item
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+
+def _batch_item_body(ad_set_id: str, item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Decoded body of one Meta batch response item ({} for a missing item)."""
+    if not item:
+        return {}
+    try:
+        body = json.loads(item.get("body") or "{}")
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        raise PlatformApiError(
+            f"malformed batch response body for ad set {ad_set_id}", item.get("code", 500)
+        )
+    return body
+
+
+class MetaInsightsFetcher(_FetcherBase):
+    """
+    Streams daily ad-set insights for one Meta ad account.
+
+    Short ranges are fetched per ad set, 50 ad sets per batch request, with
+    batches running concurrently. Long ranges (a 90-day backfill) use async
+    report jobs at ad-set level, one per 30-day slice, which Meta computes
+    server-side while we poll.
+    """
+
+    platform = "meta"
+
+    def __init__(
+        self,
+        access_token: str,
+        *,
+        base_url: str = META_GRAPH_URL,
+        poll_interval: float = 5.0,
+        async_report_min_days: int = META_ASYNC_REPORT_MIN_DAYS,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._access_token = access_token
+        self._base_url = base_url.rstrip("/")
+        self._poll_interval = poll_interval
+        self._async_report_min_days = async_report_min_days
+
+    def _is_throttled(self, error: PlatformApiError) -> bool:
+        return error.code in META_THROTTLE_CODES or error.status_code == 429
+
+    def _raise_for_error(self, resp: httpx.Response) -> None:
+        if resp.status_code < 400:
+            return
+        try:
+            error = resp.json().get("error", {})
+        except ValueError:
+            error = {}
+        raise PlatformApiError(
+            error.get("message") or resp.text[:500],
+            resp.status_code,
+            error.get("code"),
+        )
+
+    def _url(self, path: str) -> str:
+        return path if path.startswith("http") else f"{self._base_url}/{path.lstrip('/')}"
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        params = dict(params or {})
+        # Paging URLs from Meta already carry the token.
+        if "access_token=" not in path:
+            params["access_token"] = self._access_token
+        return await self._send("GET", self._url(path), params=params)
+
+    @staticmethod
+    def _insights_params(since: date, until: date) -> Dict[str, Any]:
+        return {
+            "fields": META_INSIGHTS_FIELDS,
+            "time_increment": 1,
+            "time_range": json.dumps({"since": since.isoformat(), "until": until.isoformat()}),
+            "limit": 500,
+        }
+
+    async def _follow_pages(
+        self, account_id: str, body: Dict[str, Any]
+    ) -> AsyncIterator[InsightsPage]:
+        while True:
+            yield InsightsPage(self.platform, account_id, body.get("data", []))
+            next_url = body.get("paging", {}).get("next")
+            if not next_url:
+                return
+            body = await self._get(next_url)
+
+    async def _batch_job(
+        self, account_id: str, ad_set_ids: Sequence[str], since: date, until: date
+    ) -> AsyncIterator[InsightsPage]:
+        query = urlencode(self._insights_params(since, until))
+        batch = [
+            {"method": "GET", "relative_url": f"{ad_set_id}/insights?{query}"}
+            for ad_set_id in ad_set_ids
+        ]
+        responses = await self._send(
+            "POST",
+            self._base_url,
+            data={"access_token": self._access_token, "batch": json.dumps(batch)},
+        )
+
+        retry: List[str] = []
+        for ad_set_id, item in zip(ad_set_ids, responses):
+            body = _batch_item_body(ad_set_id, item)
+            if item is None or item.get("code", 500) >= 400:
+                code = body.get("error", {}).get("code")
+                if code in META_THROTTLE_CODES:
+                    retry.append(ad_set_id)
+                    continue
+                raise PlatformApiError(
+                    body.get("error", {}).get("message", "batch request failed"),
+                    item.get("code", 500) if item else 500,
+                    code,
+                )
+            async for page in self._follow_pages(account_id, body):
+                yield page
+
+        # Throttled entries inside a batch come back individually; retry them
+        # as single requests so they get the normal backoff.
+        for ad_set_id in retry:
+            body = await self._get(
+                f"{ad_set_id}/insights", self._insights_params(since, until)
+            )
+            async for page in self._follow_pages(account_id, body):
+                yield page
+
+    async def _async_report_job(
+        self, account_id: str, since: date, until: date
+    ) -> AsyncIterator[InsightsPage]:
+        params = self._insights_params(since, until)
+        params.update({"level": "adset", "access_token": self._access_token})
+        started = await self._send(
+            "POST", self._url(f"act_{account_id}/insights"), data=params
+        )
+        report_id = started["report_run_id"]
+
+        while True:
+            status = await self._get(report_id)
+            state = status.get("async_status")
+            if state == "Job Completed":
+                break
+            if state in ("Job Failed", "Job Skipped"):
+                raise PlatformApiError(f"Async insights report {state}", 500)
+            await asyncio.sleep(self._poll_interval)
+
+        body = await self._get(f"{report_id}/insights", {"limit": 500})
+        async for page in self._follow_pages(account_id, body):
+            yield page
+
+    def iter_insights(
+        self,
+        account_id: str,
+        ad_set_ids: Sequence[str],
+        since: date,
+        until: date,
+    ) -> AsyncIterator[InsightsPage]:
+        """Yield pages of daily ad-set insights for `since`..`until` inclusive."""
+        if (until - since).days + 1 >= self._async_report_min_days:
+            # Split long ranges into monthly report jobs that run in parallel.
+            jobs = []
+            chunk_start = since
+            while chunk_start <= until:
+                chunk_end = min(until, chunk_start + timedelta(days=29))
+                jobs.append(
+                    lambda s=chunk_start, e=chunk_end: self._async_report_job(
+                        account_id, s, e
+                    )
+                )
+                chunk_start = chunk_end + timedelta(days=1)
+            return self._stream(jobs)
+
+        jobs = [
+            lambda ids=ad_set_ids[i : i + META_BATCH_SIZE]: self._batch_job(
+                account_id, ids, since, until
+            )
+            for i in range(0, len(ad_set_ids), META_BATCH_SIZE)
+        ]
+        return self._stream(jobs)
+
+
+class GoogleAdsInsightsFetcher(_FetcherBase):
+    """
+    Streams daily ad-group metrics for one Google Ads customer via GAQL.
+
+    The range is split into weekly slices queried concurrently, each paged
+    with `nextPageToken`.
+    """
+
+    platform = "google"
+
+    def __init__(
+        self,
+        access_token: str,
+        *,
+        developer_token: Optional[str] = GOOGLE_ADS_DEVELOPER_TOKEN,
+        login_customer_id: Optional[str] = None,
+        base_url: str = GOOGLE_ADS_URL,
+        slice_days: int = 7,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        self._headers = {"Authorization": f"Bearer {access_token}"}
+        if developer_token:
+            self._headers["developer-token"] = developer_token
+        if login_customer_id:
+            self._headers["login-customer-id"] = login_customer_id
+        self._base_url = base_url.rstrip("/")
+        self._slice_days = slice_days
+
+    def _is_throttled(self, error: PlatformApiError) -> bool:
+        # RESOURCE_EXHAUSTED maps to HTTP 429.
+        return error.status_code == 429
+
+    @staticmethod
+    def _query(since: date, until: date) -> str:
+        return (
+            "SELECT ad_group.id, segments.date, metrics.cost_micros, "
+            "metrics.impressions, metrics.clicks, metrics.conversions, "
+            "metrics.conversions_value FROM ad_group "
+            f"WHERE segments.date BETWEEN '{since.isoformat()}' AND '{until.isoformat()}'"
+        )
+
+    @staticmethod
+    def _click_view_query(day: date) -> str:
+        # click_view only accepts a single-day segments.date filter.
+        return (
+            "SELECT click_view.gclid, ad_group.id, segments.date FROM click_view "
+            f"WHERE segments.date = '{day.isoformat()}'"
+        )
+
+    async def _search_job(self, customer_id: str, query: str) -> AsyncIterator[InsightsPage]:
+        url = f"{self._base_url}/customers/{customer_id}/googleAds:search"
+        payload: Dict[str, Any] = {"query": query}
+        while True:
+            body = await self._send("POST", url, json=payload, headers=self._headers)
+            yield InsightsPage(self.platform, customer_id, body.get("results", []))
+            token = body.get("nextPageToken")
+            if not token:
+                return
+            payload = {**payload, "pageToken": token}
+
+    def iter_insights(
+        self, customer_id: str, since: date, until: date
+    ) -> AsyncIterator[InsightsPage]:
+        jobs = []
+        chunk_start = since
+        while chunk_start <= until:
+            chunk_end = min(until, chunk_start + timedelta(days=self._slice_days - 1))
+            jobs.append(
+                lambda q=self._query(chunk_start, chunk_end): self._search_job(
+                    customer_id, q
+                )
+            )
+            chunk_start = chunk_end + timedelta(days=1)
+        return self._stream(jobs)
+
+    def iter_click_views(
+        self, customer_id: str, since: date, until: date
+    ) -> AsyncIterator[InsightsPage]:
+        """Stream gclid -> ad group rows for the click-id index, one job per day."""
+        jobs = [
+            lambda q=self._click_view_query(since + timedelta(days=i)): self._search_job(
+                customer_id, q
+            )
+            for i in range((until - since).days + 1)
+        ]
+        return self._stream(jobs)
+
+
+_FETCHERS = {"meta": MetaInsightsFetcher, "google": GoogleAdsInsightsFetcher}
+
+
+def fetchers_for_accounts(
+    accounts: Sequence[AdAccount],
+    *,
+    vault: Optional[CredentialVault] = None,
+    **kwargs: Any,
+) -> Tuple[Dict[uuid.UUID, _FetcherBase], Dict[uuid.UUID, str]]:
+    """
+    One fetcher per ad account for a sync fan-out, with every token
+    decrypted in one `decrypt_many` pass (cache hits skip AES entirely).
+
+    Accounts whose token cannot be decrypted, or whose platform has no
+    fetcher, are returned in the second dict (account id -> reason) so the
+    caller can fail just those syncs. `kwargs` go to every fetcher.
+    """
+    tokens, failures = (vault or get_vault()).decrypt_many(accounts)
+    fetchers: Dict[uuid.UUID, _FetcherBase] = {}
+    for account in accounts:
+        token = tokens.get(account.id)
+        if token is None:
+            continue
+        fetcher_cls = _FETCHERS.get(account.platform.value)
+        if fetcher_cls is None:
+            failures[account.id] = f"no insights fetcher for {account.platform.value}"
+        else:
+            fetchers[account.id] = fetcher_cls(
+                token.reveal(), connector_id=str(account.id), **kwargs
+            )
+        token.wipe()
+    return fetchers, failures
+
+
+# Purchase actions in preference order; "omni_purchase" already de-duplicates
+# pixel, app and offline purchases.
+_META_PURCHASE_ACTIONS = ("omni_purchase", "purchase", "offsite_conversion.fb_pixel_purchase")
+
+
+def _meta_action_value(actions: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    by_type = {a.get("action_type"): a.get("value") for a in actions or []}
+    for action_type in _META_PURCHASE_ACTIONS:
+        if action_type in by_type:
+            return by_type[action_type]
+    return None
+
+
+def normalize_meta_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Meta insights row -> ad_insights values keyed by the platform ad set id."""
+    conversions = _meta_action_value(row.get("actions"))
+    return {
+        "platform_adset_id": row["adset_id"],
+        "date": date.fromisoformat(row["date_start"]),
+        "spend_cents": to_cents(row.get("spend")),
+        "impressions": int(row.get("impressions") or 0),
+        "clicks": int(row.get("clicks") or 0),
+        "reach": int(row.get("reach") or 0),
+        "conversions": int(float(conversions)) if conversions else 0,
+        "conversion_value_cents": to_cents(_meta_action_value(row.get("action_values"))),
+    }
+
+
+def normalize_google_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Google Ads GAQL result -> ad_insights values keyed by the ad group id."""
+    metrics = row.get("metrics", {})
+    # cost_micros is an int64 string: 1,000,000 micros per currency unit.
+    cost_micros = int(metrics.get("costMicros") or 0)
+    return {
+        "platform_adset_id": str(row["adGroup"]["id"]),
+        "date": date.fromisoformat(row["segments"]["date"]),
+        "spend_cents": (cost_micros + 5_000) // 10_000,
+        "impressions": int(metrics.get("impressions") or 0),
+        "clicks": int(metrics.get("clicks") or 0),
+        "reach": 0,
+        "conversions": int(float(metrics.get("conversions") or 0)),
+        "conversion_value_cents": to_cents(str(metrics.get("conversionsValue") or 0)),
+    }
+
+
+def normalize_google_click(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Google Ads click_view result -> click-id index values keyed by ad group id."""
+    day = date.fromisoformat(row["segments"]["date"])
+    return {
+        "platform_adset_id": str(row["adGroup"]["id"]),
+        "click_id": row["clickView"]["gclid"],
+        # click_view is day-grained; store midnight UTC of the click day.
+        "clicked_at": datetime.combine(day, time.min, tzinfo=timezone.utc),
+    }
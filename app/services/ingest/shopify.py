@@ -0,0 +1,219 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.ingest.bulk import (
+    DEFAULT_BATCH_SIZE,
+    UpsertSpec,
+    UpsertStats,
+    batched,
+    bulk_upsert,
+)
+from app.services.ingest.click_ids import (
+    ORDER_CLICK_SPEC,
+    first_order_per_click,
+    order_click_rows,
+)
+from app.services.money import to_cents
+
+
+ORDER_SPEC = UpsertSpec(
+    table="orders",
+    columns=(
+        "id",
+        "org_id",
+        "store_id",
+        "shopify_order_id",
+        "total_amount_cents",
+        "total_discounts_cents",
+        "currency",
+        "customer_id",
+        "financial_status",
+        "fulfillment_status",
+        "landing_site",
+        "created_at",
+    ),
+    conflict_columns=("org_id", "store_id", "shopify_order_id"),
+)
+
+# COGS columns are filled from variant costs / cogs_settings separately, so an
+# order re-sync must not overwrite them.
+LINE_ITEM_SPEC = UpsertSpec(
+    table="line_items",
+    columns=(
+        "id",
+        "org_id",
+        "order_id",
+        "shopify_line_item_id",
+        "product_id",
+        "variant_id",
+        "sku",
+        "quantity",
+        "unit_price_cents",
+        "product_category",
+    ),
+    conflict_columns=("org_id", "order_id", "shopify_line_item_id"),
+)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    # Shopify uses ISO 8601 with an offset, e.g. 2024-01-31T10:15:00-05:00.
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _optional_str(value: Any) -> str | None:
+    return None if value is None else str(value)
+
+
+def order_updated_at(order: Dict[str, Any]) -> datetime:
+    """Shopify `updated_at` of an order; the incremental-sync watermark source."""
+    return _parse_timestamp(order.get("updated_at") or order["created_at"])
+
+
+def order_row(
+    org_id: uuid.UUID, store_id: uuid.UUID, order: Dict[str, Any]
+) -> Tuple[Any, ...]:
+    """Map a Shopify Admin API order payload to an ORDER_SPEC row."""
+    customer = order.get("customer") or {}
+    return (
+        uuid.uuid4(),
+        org_id,
+        store_id,
+        str(order["id"]),
+        to_cents(order.get("total_price")),
+        to_cents(order.get("total_discounts")),
+        order.get("currency") or "USD",
+        _optional_str(customer.get("id")),
+        order.get("financial_status"),
+        order.get("fulfillment_status"),
+        order.get("landing_site"),
+        _parse_timestamp(order["created_at"]),
+    )
+
+
+def line_item_rows(
+    org_id: uuid.UUID,
+    order_id: uuid.UUID,
+    order: Dict[str, Any],
+    product_types: Optional[Mapping[str, str]] = None,
+) -> List[Tuple[Any, ...]]:
+    """
+    Map the `line_items` of a Shopify order payload to LINE_ITEM_SPEC rows.
+
+    The category (for category-scoped COGS) is the Shopify product type:
+    the item's own `product_type` if the payload has one, else
+    `product_types[product_id]`. REST order payloads carry no product type,
+    so syncs pass the store's product id -> product_type map.
+    """
+    product_types = product_types or {}
+    rows = []
+    for item in order.get("line_items", []):
+        product_id = _optional_str(item.get("product_id"))
+        category = item.get("product_type") or (
+            product_types.get(product_id) if product_id is not None else None
+        )
+        rows.append(
+            (
+                uuid.uuid4(),
+                org_id,
+                order_id,
+                str(item["id"]),
+                product_id,
+                _optional_str(item.get("variant_id")),
+                item.get("sku") or None,
+                int(item.get("quantity") or 0),
+                to_cents(item.get("price")),
+                category or None,
+            )
+        )
+    return rows
+
+
+async def upsert_shopify_orders(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    store_id: uuid.UUID,
+    orders: Iterable[Dict[str, Any]],
+    *,
+    product_types: Optional[Mapping[str, str]] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Tuple[UpsertStats, UpsertStats]:
+    """
+    Idempotently upsert Shopify orders and their line items.
+
+    Orders are keyed by (org_id, store_id, shopify_order_id) and line items
+    by (org_id, order_id, shopify_line_item_id). Click ids on the landing URL
+    are written to the click-id index. `product_types` (Shopify product id ->
+    product_type) fills line item categories; pass it on every sync, since a
+    re-synced line item takes the category it maps to now. Each batch
+    commits orders, line items and click ids together. Returns
+    (order_stats, line_item_stats).
+    """
+    order_stats = UpsertStats()
+    line_item_stats = UpsertStats()
+
+    for payloads in batched(orders, batch_size):
+        stats = await bulk_upsert(
+            session,
+            ORDER_SPEC,
+            (order_row(org_id, store_id, o) for o in payloads),
+            batch_size=batch_size,
+            commit_each_batch=False,
+        )
+        order_stats.batches.extend(stats.batches)
+
+        # Unchanged orders are not RETURNed by the merge, so resolve ids with
+        # one indexed lookup per batch instead.
+        result = await session.execute(
+            text(
+                "SELECT shopify_order_id, id FROM orders "
+                "WHERE org_id = :org_id AND store_id = :store_id "
+                "AND shopify_order_id = ANY(:shopify_order_ids)"
+            ),
+            {
+                "org_id": org_id,
+                "store_id": store_id,
+                "shopify_order_ids": [str(o["id"]) for o in payloads],
+            },
+        )
+        order_ids = dict(result.all())
+
+        rows = [
+            row
+            for o in payloads
+            for row in line_item_rows(org_id, order_ids[str(o["id"])], o, product_types)
+        ]
+        stats = await bulk_upsert(
+            session,
+            LINE_ITEM_SPEC,
+            rows,
+            batch_size=max(batch_size, len(rows)),
+            commit_each_batch=False,
+        )
+        line_item_stats.batches.extend(stats.batches)
+
+        # Parse click ids once here so Tier 1 never scans landing URLs.
+        click_rows = first_order_per_click(
+            row
+            for o in payloads
+            for row in order_click_rows(
+                org_id,
+                order_ids[str(o["id"])],
+                _parse_timestamp(o["created_at"]),
+                o.get("landing_site"),
+            )
+        )
+        if click_rows:
+            await bulk_upsert(
+                session,
+                ORDER_CLICK_SPEC,
+                click_rows,
+                batch_size=max(batch_size, len(click_rows)),
+                commit_each_batch=False,
+            )
+        await session.commit()
+
+    return order_stats, line_item_stats
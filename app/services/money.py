@@ -0,0 +1,20 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Union
+
+
+def to_cents(value: Union[str, int, Decimal, None]) -> int:
+    """
+    Convert a decimal currency amount ("12.34", Decimal("12.34")) to integer cents.
+
+    Goes through Decimal so values never pass through float. Missing or empty
+    values are 0; anything unparseable raises ValueError.
+    """
+    if value is None or value == "":
+        return 0
+    try:
+        amount = Decimal(str(value).strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid monetary amount: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid monetary amount: {value!r}")
+    return int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
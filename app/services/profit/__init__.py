@@ -0,0 +1 @@
+"""Profit engine: per-day ad set rollups and windowed profit_metrics."""
@@ -0,0 +1,226 @@
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cogs_settings import CogsScope
+from app.services.profit.engine import WINDOW_DAYS, ProfitRunStats, calculate_profit_metrics
+from app.services.profit.rollups import RETURNS_SETTLE_DAYS, refresh_rollup_cells
+
+
+logger = logging.getLogger(__name__)
+
+RECOMPUTE_DIRTY_TASK = "profit.recompute_dirty"
+SWEEP_DIRTY_TASK = "profit.sweep_dirty"
+
+# Input changes only reach back this far; older profit windows are left as is.
+RECOMPUTE_DAYS = 90
+
+_NO_SKU_SETTING = """NOT EXISTS (
+    SELECT 1 FROM cogs_settings s
+    WHERE s.org_id = :org_id AND s.scope = 'sku' AND s.scope_value = li.sku
+)"""
+_NO_CATEGORY_SETTING = """NOT EXISTS (
+    SELECT 1 FROM cogs_settings s
+    WHERE s.org_id = :org_id AND s.scope = 'category'
+      AND s.scope_value = li.product_category
+)"""
+
+# Which line items each kind of change can move. COGS settings only apply
+# to line items without their own cost, and a narrower setting shadows a
+# wider one; return rates only feed orders still within the settle period.
+_PREDICATES = {
+    "cogs_skus": "(li.unit_cogs_cents IS NULL AND li.sku = ANY(:cogs_skus))",
+    "cogs_categories": (
+        "(li.unit_cogs_cents IS NULL AND li.product_category = ANY(:cogs_categories) "
+        f"AND {_NO_SKU_SETTING})"
+    ),
+    "cogs_global": (
+        f"(li.unit_cogs_cents IS NULL AND {_NO_SKU_SETTING} AND {_NO_CATEGORY_SETTING})"
+    ),
+    "return_rate_skus": (
+        "(li.sku = ANY(:return_rate_skus) AND o.created_at >= :returns_settled_before)"
+    ),
+}
+
+_MARK_SQL = """
+INSERT INTO profit_dirty_cells (id, org_id, ad_set_id, date, created_at, updated_at)
+SELECT gen_random_uuid(), :org_id, cell.ad_set_id, cell.date, now(), now()
+FROM (
+    SELECT DISTINCT a.ad_set_id, (o.created_at AT TIME ZONE 'UTC')::date AS date
+    FROM orders o
+    JOIN attributed_orders a ON a.org_id = :org_id AND a.order_id = o.id
+    JOIN line_items li ON li.org_id = :org_id AND li.order_id = o.id
+    WHERE o.org_id = :org_id
+      AND o.created_at >= :since_at
+      AND ({predicate})
+) AS cell
+ON CONFLICT (org_id, ad_set_id, date) DO NOTHING
+"""
+
+_MARK_SETTLED_DAY_SQL = """
+INSERT INTO profit_dirty_cells (id, org_id, ad_set_id, date, created_at, updated_at)
+SELECT gen_random_uuid(), :org_id, r.ad_set_id, r.date, now(), now()
+FROM ad_set_daily_rollups r
+WHERE r.org_id = :org_id AND r.date = :settled_day AND r.order_count > 0
+ON CONFLICT (org_id, ad_set_id, date) DO NOTHING
+"""
+
+_DIRTY_ORGS_SQL = "SELECT DISTINCT org_id FROM profit_dirty_cells"
+
+_TAKE_SQL = """
+DELETE FROM profit_dirty_cells
+WHERE org_id = :org_id
+RETURNING ad_set_id, date
+"""
+
+
+@dataclass
+class ProfitInputChanges:
+    """
+    A burst of COGS / return-rate changes folded into the dirty set at once.
+
+    Collect every row of a CSV import (or every SKU of a nightly return-rate
+    run) here and call `mark_dirty` once: the affected cells are resolved in
+    one statement and deduplicated by the dirty table's key.
+    """
+
+    cogs_skus: Set[str] = field(default_factory=set)
+    cogs_categories: Set[str] = field(default_factory=set)
+    cogs_global: bool = False
+    return_rate_skus: Set[str] = field(default_factory=set)
+
+    def add_cogs(self, scope: CogsScope, scope_value: str = "") -> None:
+        if scope == CogsScope.SKU:
+            self.cogs_skus.add(scope_value)
+        elif scope == CogsScope.CATEGORY:
+            self.cogs_categories.add(scope_value)
+        else:
+            self.cogs_global = True
+
+    def add_return_rate(self, sku: str) -> None:
+        self.return_rate_skus.add(sku)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.cogs_skus or self.cogs_categories or self.cogs_global or self.return_rate_skus
+        )
+
+
+@dataclass
+class DirtyRecomputeStats:
+    """Outcome of one `recompute_dirty_cells` call."""
+
+    cells: int
+    rollup_rows: int
+    profit: Optional[ProfitRunStats]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+async def mark_dirty(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    changes: ProfitInputChanges,
+    *,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Record the (ad_set_id, day) cells whose rollups `changes` can alter,
+    via attributed orders and their line items. Returns newly marked cells.
+    Caller commits.
+    """
+    if not changes:
+        return 0
+    now = now or _utcnow()
+    params: Dict[str, Any] = {
+        "org_id": org_id,
+        "since_at": datetime.combine(
+            now.date() - timedelta(days=RECOMPUTE_DAYS), time.min, timezone.utc
+        ),
+    }
+    predicates: List[str] = []
+    if changes.cogs_skus:
+        predicates.append(_PREDICATES["cogs_skus"])
+        params["cogs_skus"] = sorted(changes.cogs_skus)
+    if changes.cogs_categories:
+        predicates.append(_PREDICATES["cogs_categories"])
+        params["cogs_categories"] = sorted(changes.cogs_categories)
+    if changes.cogs_global:
+        predicates.append(_PREDICATES["cogs_global"])
+    if changes.return_rate_skus:
+        predicates.append(_PREDICATES["return_rate_skus"])
+        params["return_rate_skus"] = sorted(changes.return_rate_skus)
+        params["returns_settled_before"] = now - timedelta(days=RETURNS_SETTLE_DAYS)
+
+    result = await session.execute(
+        text(_MARK_SQL.format(predicate=" OR ".join(predicates))), params
+    )
+    logger.info("profit dirty cells org=%s marked=%s", org_id, result.rowcount)
+    return result.rowcount
+
+
+async def mark_settled_day_dirty(
+    session: AsyncSession, org_id: uuid.UUID, *, now: Optional[datetime] = None
+) -> int:
+    """
+    Mark the cells of the last day whose orders all crossed
+    RETURNS_SETTLE_DAYS, so their rollups swap estimated returns for the
+    refunds recorded. Run nightly; returns newly marked cells. Caller
+    commits.
+    """
+    now = now or _utcnow()
+    settled_day = (now - timedelta(days=RETURNS_SETTLE_DAYS)).date() - timedelta(days=1)
+    result = await session.execute(
+        text(_MARK_SETTLED_DAY_SQL), {"org_id": org_id, "settled_day": settled_day}
+    )
+    return result.rowcount
+
+
+async def orgs_with_dirty_cells(session: AsyncSession) -> List[uuid.UUID]:
+    """Every org with cells waiting for recompute (for the periodic sweep)."""
+    result = await session.execute(text(_DIRTY_ORGS_SQL))
+    return list(result.scalars())
+
+
+async def take_dirty_cells(
+    session: AsyncSession, org_id: uuid.UUID
+) -> List[Tuple[uuid.UUID, date]]:
+    """Claim and clear the org's dirty cells; a rollback puts them back."""
+    result = await session.execute(text(_TAKE_SQL), {"org_id": org_id})
+    return [(row.ad_set_id, row.date) for row in result.all()]
+
+
+async def recompute_dirty_cells(
+    session: AsyncSession, org_id: uuid.UUID, *, today: Optional[date] = None
+) -> DirtyRecomputeStats:
+    """
+    Rebuild exactly the dirty rollup cells, then only the profit windows
+    (for those ad sets) that contain one of them. Caller commits with
+    `app.cache.commit_and_invalidate`.
+    """
+    today = today or _utcnow().date()
+    cells = await take_dirty_cells(session, org_id)
+    if not cells:
+        return DirtyRecomputeStats(cells=0, rollup_rows=0, profit=None)
+
+    rollup_rows = await refresh_rollup_cells(session, org_id, cells)
+
+    # A day feeds every window ending up to 29 days after it.
+    first_day = min(day for _, day in cells)
+    last_day = min(
+        max(day for _, day in cells) + timedelta(days=max(WINDOW_DAYS.values()) - 1),
+        today,
+    )
+    profit = None
+    if first_day <= last_day:
+        profit = await calculate_profit_metrics(
+            session, org_id, first_day, last_day, only_cells=cells
+        )
+    return DirtyRecomputeStats(cells=len(cells), rollup_rows=rollup_rows, profit=profit)
@@ -0,0 +1,331 @@
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache import invalidate_on_commit
+from app.models.profit_metrics import ProfitWindowType
+from app.services.ingest.bulk import UpsertSpec, UpsertStats, bulk_upsert
+
+
+logger = logging.getLogger(__name__)
+
+# Shopify Payments style fee: a percentage of revenue (in basis points) plus
+# a fixed amount per order.
+PLATFORM_FEE_BPS = int(os.getenv("PLATFORM_FEE_BPS", "290"))
+PLATFORM_FEE_FIXED_CENTS = int(os.getenv("PLATFORM_FEE_FIXED_CENTS", "30"))
+
+WINDOW_DAYS: Dict[ProfitWindowType, int] = {
+    ProfitWindowType.DAILY: 1,
+    ProfitWindowType.D7: 7,
+    ProfitWindowType.D14: 14,
+    ProfitWindowType.D30: 30,
+}
+
+# Order of the rollup columns in the metrics array.
+_ROLLUP_COLUMNS = (
+    "spend_cents",
+    "attributed_revenue_cents",
+    "attributed_cogs_cents",
+    "estimated_returns_cents",
+    "order_count",
+    "high_confidence_order_count",
+)
+SPEND, REVENUE, COGS, RETURNS, ORDERS, HIGH_CONFIDENCE = range(len(_ROLLUP_COLUMNS))
+
+_FOUR_PLACES = Decimal("0.0001")
+
+PROFIT_METRIC_SPEC = UpsertSpec(
+    table="profit_metrics",
+    columns=(
+        "id",
+        "org_id",
+        "ad_set_id",
+        "window_type",
+        "window_start",
+        "window_end",
+        "spend_cents",
+        "attributed_revenue_cents",
+        "attributed_cogs_cents",
+        "estimated_returns_cents",
+        "platform_fees_cents",
+        "net_profit_cents",
+        "net_profit_pct",
+        "true_roas",
+        "order_count",
+        "attribution_coverage_pct",
+        "computed_at",
+    ),
+    conflict_columns=("org_id", "ad_set_id", "window_type", "window_start", "window_end"),
+    # Rewritten with the metrics, but an unchanged window is left alone.
+    uncompared_columns=("computed_at",),
+)
+
+
+# (ad_set_ids, window types, window ends) of windows whose rows must go.
+StaleWindows = Tuple[List[uuid.UUID], List[str], List[date]]
+
+_DELETE_STALE_SQL = """
+DELETE FROM profit_metrics p
+USING unnest(
+    CAST(:ad_set_ids AS uuid[]), CAST(:window_types AS text[]), CAST(:window_ends AS date[])
+) AS s (ad_set_id, window_type, window_end)
+WHERE p.org_id = :org_id
+  AND p.ad_set_id = s.ad_set_id
+  AND p.window_type::text = s.window_type
+  AND p.window_end = s.window_end
+"""
+
+# Full recompute: ad sets with no rollups left in the loaded range at all.
+_DELETE_ABSENT_SQL = """
+DELETE FROM profit_metrics
+WHERE org_id = :org_id
+  AND window_end BETWEEN :first_day AND :last_day
+  AND ad_set_id <> ALL(CAST(:ad_set_ids AS uuid[]))
+"""
+
+
+@dataclass
+class ProfitRunStats:
+    """Size and timing of one `calculate_profit_metrics` call."""
+
+    ad_sets: int
+    rollup_rows: int
+    metric_rows: int
+    stale_rows_deleted: int
+    load_seconds: float
+    compute_seconds: float
+    upsert: UpsertStats
+
+
+def platform_fees_cents(revenue_cents: np.ndarray, order_count: np.ndarray) -> np.ndarray:
+    """Percentage fee rounded half up to the cent, plus the per-order fee."""
+    return (revenue_cents * PLATFORM_FEE_BPS + 5_000) // 10_000 + (
+        order_count * PLATFORM_FEE_FIXED_CENTS
+    )
+
+
+def _ratio(numerator: int, denominator: int, scale: int = 1) -> Optional[Decimal]:
+    if denominator == 0:
+        return None
+    return (Decimal(numerator * scale) / Decimal(denominator)).quantize(_FOUR_PLACES)
+
+
+def window_sums(
+    daily: np.ndarray, end_offsets: np.ndarray, days: int
+) -> np.ndarray:
+    """
+    Sums over `days` trailing days ending at each offset of the last axis,
+    from one prefix sum: (metrics, ad_sets, ends) int64.
+    """
+    prefix = np.zeros(daily.shape[:-1] + (daily.shape[-1] + 1,), dtype=np.int64)
+    np.cumsum(daily, axis=-1, out=prefix[..., 1:])
+    hi = end_offsets + 1
+    lo = np.maximum(hi - days, 0)
+    return prefix[..., hi] - prefix[..., lo]
+
+
+def _metric_rows(
+    org_id: uuid.UUID,
+    ad_set_ids: List[uuid.UUID],
+    load_from: date,
+    first_day: date,
+    last_day: date,
+    daily: np.ndarray,
+    computed_at: datetime,
+    dirty: Optional[np.ndarray] = None,
+) -> Tuple[List[Tuple[Any, ...]], StaleWindows]:
+    """
+    Metric rows for the recomputed windows, plus the recomputed windows that
+    are now inactive: a row left from an earlier run there is stale.
+    """
+    first_offset = (first_day - load_from).days
+    end_offsets = np.arange(first_offset, first_offset + (last_day - first_day).days + 1)
+
+    rows: List[Tuple[Any, ...]] = []
+    stale: StaleWindows = ([], [], [])
+    for window_type, days in WINDOW_DAYS.items():
+        sums = window_sums(daily, end_offsets, days)
+        fees = platform_fees_cents(sums[REVENUE], sums[ORDERS])
+        net = sums[REVENUE] - sums[SPEND] - sums[COGS] - sums[RETURNS] - fees
+
+        # Only ad sets with spend or attributed orders in the window get a row.
+        has_activity = (sums[SPEND] > 0) | (sums[ORDERS] > 0)
+        # For a dirty-set recompute, only windows covering a dirty day.
+        recomputed = (
+            np.ones_like(has_activity)
+            if dirty is None
+            else window_sums(dirty, end_offsets, days) > 0
+        )
+        active = has_activity & recomputed
+        for ad_set_pos, end_pos in zip(*np.nonzero(recomputed & ~has_activity)):
+            stale[0].append(ad_set_ids[ad_set_pos])
+            stale[1].append(window_type.value)
+            stale[2].append(first_day + timedelta(days=int(end_pos)))
+        for ad_set_pos, end_pos in zip(*np.nonzero(active)):
+            window_end = first_day + timedelta(days=int(end_pos))
+            spend, revenue, cogs, returns, orders, high = (
+                int(v) for v in sums[:, ad_set_pos, end_pos]
+            )
+            net_cents = int(net[ad_set_pos, end_pos])
+            rows.append(
+                (
+                    uuid.uuid4(),
+                    org_id,
+                    ad_set_ids[ad_set_pos],
+                    window_type.value,
+                    window_end - timedelta(days=days - 1),
+                    window_end,
+                    spend,
+                    revenue,
+                    cogs,
+                    returns,
+                    int(fees[ad_set_pos, end_pos]),
+                    net_cents,
+                    _ratio(net_cents, revenue, 100),
+                    _ratio(revenue, spend),
+                    orders,
+                    _ratio(high, orders, 100),
+                    computed_at,
+                )
+            )
+    return rows, stale
+
+
+async def calculate_profit_metrics(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    first_day: date,
+    last_day: Optional[date] = None,
+    *,
+    only_cells: Optional[Iterable[Tuple[uuid.UUID, date]]] = None,
+) -> ProfitRunStats:
+    """
+    Upsert daily / 7d / 14d / 30d profit_metrics for every ad set of the org,
+    for windows ending on each day in [first_day, last_day].
+
+    One scan of ad_set_daily_rollups feeds a (metric, ad set, day) int64
+    array; every window type is a difference of its prefix sums, so all
+    money stays in integer cents. With `only_cells`, just those ad sets are
+    loaded and only windows containing one of the (ad_set_id, day) cells
+    are written. Rows of recomputed windows that no longer have spend or
+    orders are deleted. Caller commits with `app.cache.commit_and_invalidate`,
+    which then invalidates the org's cached dashboard responses.
+    """
+    last_day = last_day or first_day
+    load_from = first_day - timedelta(days=max(WINDOW_DAYS.values()) - 1)
+    cells = sorted(set(only_cells)) if only_cells is not None else None
+
+    sql = (
+        f"SELECT ad_set_id, date, {', '.join(_ROLLUP_COLUMNS)} "
+        "FROM ad_set_daily_rollups "
+        "WHERE org_id = :org_id AND date BETWEEN :load_from AND :last_day"
+    )
+    params: Dict[str, Any] = {"org_id": org_id, "load_from": load_from, "last_day": last_day}
+    if cells is not None:
+        sql += " AND ad_set_id = ANY(:ad_set_ids)"
+        params["ad_set_ids"] = sorted({ad_set_id for ad_set_id, _ in cells})
+
+    started = time.perf_counter()
+    result = await session.execute(text(sql), params)
+    rollups = result.all()
+    loaded = time.perf_counter()
+
+    ad_set_ids = sorted({row[0] for row in rollups})
+    position = {ad_set_id: i for i, ad_set_id in enumerate(ad_set_ids)}
+    n_days = (last_day - load_from).days + 1
+    daily = np.zeros((len(_ROLLUP_COLUMNS), len(ad_set_ids), n_days), dtype=np.int64)
+    if rollups:
+        values = np.array([row[2:] for row in rollups], dtype=np.int64).T
+        ad_set_pos = np.fromiter((position[row[0]] for row in rollups), np.int64, len(rollups))
+        day_pos = np.fromiter(((row[1] - load_from).days for row in rollups), np.int64, len(rollups))
+        daily[:, ad_set_pos, day_pos] = values
+
+    dirty = None
+    if cells is not None:
+        dirty = np.zeros(daily.shape[1:], dtype=np.int64)
+        for ad_set_id, day in cells:
+            if ad_set_id in position and load_from <= day <= last_day:
+                dirty[position[ad_set_id], (day - load_from).days] = 1
+
+    rows, stale = _metric_rows(
+        org_id,
+        ad_set_ids,
+        load_from,
+        first_day,
+        last_day,
+        daily,
+        datetime.now(timezone.utc),
+        dirty,
+    )
+    if cells is not None:
+        # Dirty cells of ad sets with no rollups left: every window over them.
+        for ad_set_id, day in cells:
+            if ad_set_id in position:
+                continue
+            for window_type, days in WINDOW_DAYS.items():
+                end = max(day, first_day)
+                while end <= min(day + timedelta(days=days - 1), last_day):
+                    stale[0].append(ad_set_id)
+                    stale[1].append(window_type.value)
+                    stale[2].append(end)
+                    end += timedelta(days=1)
+    computed = time.perf_counter()
+
+    upsert = await bulk_upsert(session, PROFIT_METRIC_SPEC, rows, commit_each_batch=False)
+    deleted = 0
+    if stale[0]:
+        result = await session.execute(
+            text(_DELETE_STALE_SQL),
+            {
+                "org_id": org_id,
+                "ad_set_ids": stale[0],
+                "window_types": stale[1],
+                "window_ends": stale[2],
+            },
+        )
+        deleted += result.rowcount
+    if cells is None:
+        result = await session.execute(
+            text(_DELETE_ABSENT_SQL),
+            {
+                "org_id": org_id,
+                "first_day": first_day,
+                "last_day": last_day,
+                "ad_set_ids": ad_set_ids,
+            },
+        )
+        deleted += result.rowcount
+    invalidate_on_commit(session, org_id)
+    stats = ProfitRunStats(
+        ad_sets=len(ad_set_ids),
+        rollup_rows=len(rollups),
+        metric_rows=len(rows),
+        stale_rows_deleted=deleted,
+        load_seconds=loaded - started,
+        compute_seconds=computed - loaded,
+        upsert=upsert,
+    )
+    logger.info(
+        "profit metrics org=%s days=[%s, %s] ad_sets=%s rollups=%s rows=%s written=%s "
+        "stale_deleted=%s load=%.3fs compute=%.3fs",
+        org_id,
+        first_day.isoformat(),
+        last_day.isoformat(),
+        stats.ad_sets,
+        stats.rollup_rows,
+        stats.metric_rows,
+        upsert.written,
+        deleted,
+        stats.load_seconds,
+        stats.compute_seconds,
+    )
+    return stats
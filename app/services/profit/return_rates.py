@@ -0,0 +1,282 @@
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dt_time
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.ingest.bulk import UpsertSpec, bulk_upsert
+from app.services.profit.dirty import ProfitInputChanges, mark_dirty
+
+
+logger = logging.getLogger(__name__)
+
+COMPUTE_RETURN_RATES_TASK = "profit.compute_sku_return_rates"
+COMPUTE_ALL_RETURN_RATES_TASK = "profit.compute_all_sku_return_rates"
+
+_RATE_PLACES = Decimal("0.000001")
+
+# Incremental runs only add the newest day, so orders and refunds that land
+# late for days already counted are missed until a full scan. Every this
+# many days (by as_of) the run is a full rescan that reconciles the sums.
+RETURN_RATE_RECONCILE_EVERY_DAYS = int(os.getenv("RETURN_RATE_RECONCILE_EVERY_DAYS", "7"))
+
+# Only the computed columns; manual_override_rate is never written here.
+SKU_RETURN_RATE_SPEC = UpsertSpec(
+    table="sku_return_rates",
+    columns=(
+        "id",
+        "org_id",
+        "sku",
+        "sold_units_90d",
+        "refunded_units_90d",
+        "sold_units_180d",
+        "refunded_units_180d",
+        "trailing_90d_rate",
+        "trailing_180d_rate",
+        "rates_through",
+        "last_computed_at",
+    ),
+    conflict_columns=("org_id", "sku"),
+)
+
+# (sold_90, refunded_90, sold_180, refunded_180)
+Counts = Tuple[int, int, int, int]
+
+
+@dataclass
+class ReturnRateRunStats:
+    """Outcome of one `compute_sku_return_rates` call."""
+
+    mode: str
+    as_of: date
+    skus: int
+    changed: int
+    seconds: float
+
+
+def _counts_sql(ranges: List[str]) -> str:
+    """
+    Sold units (by order day) and refunded units (by refund day) per SKU for
+    each named [from, to) range, from one scan of line_items and one of
+    returns restricted to the union of the ranges.
+    """
+
+    def in_range(column: str, name: str) -> str:
+        return f"{column} >= :{name}_from AND {column} < :{name}_to"
+
+    sold = ",\n        ".join(
+        f"sum(li.quantity) FILTER (WHERE {in_range('o.created_at', n)}) AS sold_{n}"
+        for n in ranges
+    )
+    refunded = ",\n        ".join(
+        f"sum(rt.quantity_returned) FILTER (WHERE {in_range('rt.refunded_at', n)}) "
+        f"AS refunded_{n}"
+        for n in ranges
+    )
+    columns = ",\n    ".join(
+        f"coalesce(s.sold_{n}, 0) AS sold_{n}, coalesce(r.refunded_{n}, 0) AS refunded_{n}"
+        for n in ranges
+    )
+    order_scan = " OR ".join(f"({in_range('o.created_at', n)})" for n in ranges)
+    refund_scan = " OR ".join(f"({in_range('rt.refunded_at', n)})" for n in ranges)
+    return f"""
+WITH sold AS (
+    SELECT
+        li.sku,
+        {sold}
+    FROM orders o
+    JOIN line_items li ON li.org_id = :org_id AND li.order_id = o.id
+    WHERE o.org_id = :org_id AND ({order_scan}) AND li.sku IS NOT NULL
+    GROUP BY li.sku
+),
+refunded AS (
+    SELECT
+        coalesce(rt.sku, li.sku) AS sku,
+        {refunded}
+    FROM returns rt
+    LEFT JOIN line_items li ON li.org_id = :org_id AND li.id = rt.line_item_id
+    WHERE rt.org_id = :org_id AND ({refund_scan})
+    GROUP BY 1
+)
+SELECT
+    coalesce(s.sku, r.sku) AS sku,
+    {columns}
+FROM sold s
+FULL OUTER JOIN refunded r ON r.sku = s.sku
+WHERE coalesce(s.sku, r.sku) IS NOT NULL
+"""
+
+
+def _start_of_day(day: date) -> datetime:
+    return datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+
+
+async def _range_counts(
+    session: AsyncSession, org_id: uuid.UUID, ranges: Dict[str, Tuple[date, date]]
+) -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """sku -> range name -> (sold, refunded) for inclusive day ranges."""
+    names = list(ranges)
+    params: Dict[str, object] = {"org_id": org_id}
+    for name, (first, last) in ranges.items():
+        params[f"{name}_from"] = _start_of_day(first)
+        params[f"{name}_to"] = _start_of_day(last + timedelta(days=1))
+
+    result = await session.execute(text(_counts_sql(names)), params)
+    out: Dict[str, Dict[str, Tuple[int, int]]] = {}
+    for row in result.mappings():
+        out[row["sku"]] = {
+            n: (int(row[f"sold_{n}"]), int(row[f"refunded_{n}"])) for n in names
+        }
+    return out
+
+
+async def orgs_with_stores(session: AsyncSession) -> List[uuid.UUID]:
+    """Orgs with a connected store, i.e. with SKUs to compute rates for."""
+    result = await session.execute(text("SELECT DISTINCT org_id FROM stores"))
+    return list(result.scalars())
+
+
+def is_reconcile_day(as_of: date) -> bool:
+    return as_of.toordinal() % max(RETURN_RATE_RECONCILE_EVERY_DAYS, 1) == 0
+
+
+def _rate(refunded: int, sold: int) -> Optional[Decimal]:
+    if sold <= 0:
+        return None
+    return min(Decimal(refunded) / Decimal(sold), Decimal(1)).quantize(_RATE_PLACES)
+
+
+async def compute_sku_return_rates(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    *,
+    as_of: Optional[date] = None,
+    full: bool = False,
+) -> ReturnRateRunStats:
+    """
+    Refresh trailing_90d_rate / trailing_180d_rate for every SKU of the org
+    through `as_of` (default: yesterday, UTC).
+
+    - Full mode: one scan of the last 180 days yields both windows.
+    - Incremental mode (stored sums are through the day before `as_of`):
+      only the new day and the two days leaving the windows are read, and
+      the running sums are adjusted. Rows arriving late for days already
+      counted are not seen, so the sums can drift until the next full run;
+      every RETURN_RATE_RECONCILE_EVERY_DAYS days the run is full anyway.
+    Results go out in one bulk upsert that never touches
+    manual_override_rate; SKUs whose effective rate moved are marked dirty
+    for profit recompute. Caller commits. Runs nightly from the
+    profit.compute_sku_return_rates task: incremental mode relies on that.
+    """
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+    as_of = as_of or now.date() - timedelta(days=1)
+
+    result = await session.execute(
+        text(
+            "SELECT sku, sold_units_90d, refunded_units_90d, sold_units_180d, "
+            "refunded_units_180d, trailing_180d_rate, manual_override_rate, rates_through "
+            "FROM sku_return_rates WHERE org_id = :org_id"
+        ),
+        {"org_id": org_id},
+    )
+    existing = {row.sku: row for row in result.all()}
+    through = {row.rates_through for row in existing.values()}
+
+    if not full and existing and through == {as_of}:
+        return ReturnRateRunStats("current", as_of, len(existing), 0, 0.0)
+
+    if is_reconcile_day(as_of):
+        full = True
+
+    counts: Dict[str, Counts] = {}
+    if not full and existing and through == {as_of - timedelta(days=1)}:
+        mode = "incremental"
+        deltas = await _range_counts(
+            session,
+            org_id,
+            {
+                "new": (as_of, as_of),
+                "exp90": (as_of - timedelta(days=90), as_of - timedelta(days=90)),
+                "exp180": (as_of - timedelta(days=180), as_of - timedelta(days=180)),
+            },
+        )
+        zero = {"new": (0, 0), "exp90": (0, 0), "exp180": (0, 0)}
+        for sku in existing.keys() | deltas.keys():
+            row = existing.get(sku)
+            base = (
+                (row.sold_units_90d, row.refunded_units_90d, row.sold_units_180d, row.refunded_units_180d)
+                if row is not None
+                else (0, 0, 0, 0)
+            )
+            d = deltas.get(sku, zero)
+            counts[sku] = (
+                base[0] + d["new"][0] - d["exp90"][0],
+                base[1] + d["new"][1] - d["exp90"][1],
+                base[2] + d["new"][0] - d["exp180"][0],
+                base[3] + d["new"][1] - d["exp180"][1],
+            )
+    else:
+        mode = "full"
+        windows = await _range_counts(
+            session,
+            org_id,
+            {
+                "w90": (as_of - timedelta(days=89), as_of),
+                "w180": (as_of - timedelta(days=179), as_of),
+            },
+        )
+        for sku in existing.keys() | windows.keys():
+            w = windows.get(sku, {"w90": (0, 0), "w180": (0, 0)})
+            counts[sku] = (w["w90"][0], w["w90"][1], w["w180"][0], w["w180"][1])
+
+    changes = ProfitInputChanges()
+    rows = []
+    for sku, (sold_90, refunded_90, sold_180, refunded_180) in counts.items():
+        rate_180 = _rate(refunded_180, sold_180)
+        row = existing.get(sku)
+        if row is None or (row.manual_override_rate is None and row.trailing_180d_rate != rate_180):
+            changes.add_return_rate(sku)
+        rows.append(
+            (
+                uuid.uuid4(),
+                org_id,
+                sku,
+                sold_90,
+                refunded_90,
+                sold_180,
+                refunded_180,
+                _rate(refunded_90, sold_90),
+                rate_180,
+                as_of,
+                now,
+            )
+        )
+
+    await bulk_upsert(session, SKU_RETURN_RATE_SPEC, rows, commit_each_batch=False)
+    await mark_dirty(session, org_id, changes, now=now)
+
+    stats = ReturnRateRunStats(
+        mode=mode,
+        as_of=as_of,
+        skus=len(rows),
+        changed=len(changes.return_rate_skus),
+        seconds=time.perf_counter() - started,
+    )
+    logger.info(
+        "sku return rates org=%s mode=%s as_of=%s skus=%s changed=%s in %.3fs",
+        org_id,
+        mode,
+        as_of.isoformat(),
+        stats.skus,
+        stats.changed,
+        stats.seconds,
+    )
+    return stats
@@ -0,0 +1,225 @@
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+# Orders younger than this carry estimated returns (SKU return rate); older
+# orders carry the refunds actually recorded.
+RETURNS_SETTLE_DAYS = 45
+
+# COGS for one line item: its own unit cost, else the SKU, category and
+# global settings in that order (absolute cents or percent of unit price).
+_SETTING_UNIT_COGS = """
+CASE {cs}.cogs_type
+    WHEN 'absolute' THEN {cs}.cogs_value_cents
+    ELSE round(li.unit_price_cents * {cs}.cogs_percent / 100)::bigint
+END"""
+
+_UNIT_COGS = "coalesce(li.unit_cogs_cents, {sku}, {category}, {global_})".format(
+    sku=_SETTING_UNIT_COGS.format(cs="cs_sku"),
+    category=_SETTING_UNIT_COGS.format(cs="cs_cat"),
+    global_=_SETTING_UNIT_COGS.format(cs="cs_all"),
+)
+
+# Restricts a refresh to explicit (ad_set_id, date) cells.
+_CELLS_CTE = """
+cells (ad_set_id, date) AS (
+    SELECT * FROM unnest(CAST(:cell_ad_set_ids AS uuid[]), CAST(:cell_dates AS date[]))
+),"""
+
+_ROLLUP_SOURCE_SQL = """
+WITH {cells_cte}
+spend AS (
+    SELECT ad_set_id, date, sum(spend_cents) AS spend_cents
+    FROM ad_insights
+    WHERE org_id = :org_id AND date BETWEEN :since AND :until
+      {spend_filter}
+    GROUP BY ad_set_id, date
+),
+attributed AS (
+    SELECT
+        a.ad_set_id,
+        (o.created_at AT TIME ZONE 'UTC')::date AS date,
+        a.order_id,
+        a.attributed_revenue_cents,
+        a.attribution_tier,
+        o.created_at
+    FROM orders o
+    JOIN attributed_orders a ON a.org_id = :org_id AND a.order_id = o.id
+    WHERE o.org_id = :org_id
+      AND o.created_at >= :since_at
+      AND o.created_at < :until_at
+      {attributed_filter}
+),
+line_costs AS (
+    SELECT
+        li.order_id,
+        sum(li.quantity * coalesce({unit_cogs}, 0)) AS cogs_cents,
+        sum(round(
+            li.quantity * li.unit_price_cents
+            * coalesce(r.manual_override_rate, r.trailing_180d_rate, 0)
+        ))::bigint AS estimated_returns_cents
+    FROM attributed ao
+    JOIN line_items li ON li.org_id = :org_id AND li.order_id = ao.order_id
+    LEFT JOIN cogs_settings cs_sku
+        ON cs_sku.org_id = :org_id AND cs_sku.scope = 'sku' AND cs_sku.scope_value = li.sku
+    LEFT JOIN cogs_settings cs_cat
+        ON cs_cat.org_id = :org_id AND cs_cat.scope = 'category'
+        AND cs_cat.scope_value = li.product_category
+    LEFT JOIN cogs_settings cs_all
+        ON cs_all.org_id = :org_id AND cs_all.scope = 'global' AND cs_all.scope_value = ''
+    LEFT JOIN sku_return_rates r ON r.org_id = :org_id AND r.sku = li.sku
+    GROUP BY li.order_id
+),
+refunds AS (
+    SELECT rt.order_id, sum(rt.refund_amount_cents) AS refund_cents
+    FROM attributed ao
+    JOIN returns rt ON rt.org_id = :org_id AND rt.order_id = ao.order_id
+    GROUP BY rt.order_id
+),
+order_days AS (
+    SELECT
+        ao.ad_set_id,
+        ao.date,
+        sum(ao.attributed_revenue_cents) AS revenue_cents,
+        sum(coalesce(lc.cogs_cents, 0)) AS cogs_cents,
+        sum(
+            CASE WHEN ao.created_at >= :returns_settled_before
+                 THEN coalesce(lc.estimated_returns_cents, 0)
+                 ELSE coalesce(rf.refund_cents, 0)
+            END
+        ) AS returns_cents,
+        count(*) AS order_count,
+        count(*) FILTER (WHERE ao.attribution_tier <= 2) AS high_confidence_order_count
+    FROM attributed ao
+    LEFT JOIN line_costs lc ON lc.order_id = ao.order_id
+    LEFT JOIN refunds rf ON rf.order_id = ao.order_id
+    GROUP BY ao.ad_set_id, ao.date
+)
+SELECT
+    coalesce(s.ad_set_id, od.ad_set_id) AS ad_set_id,
+    coalesce(s.date, od.date) AS date,
+    coalesce(s.spend_cents, 0) AS spend_cents,
+    coalesce(od.revenue_cents, 0) AS attributed_revenue_cents,
+    coalesce(od.cogs_cents, 0) AS attributed_cogs_cents,
+    coalesce(od.returns_cents, 0) AS estimated_returns_cents,
+    coalesce(od.order_count, 0) AS order_count,
+    coalesce(od.high_confidence_order_count, 0) AS high_confidence_order_count
+FROM spend s
+FULL OUTER JOIN order_days od ON od.ad_set_id = s.ad_set_id AND od.date = s.date
+"""
+
+_CLEAR_SQL = """
+{with_cells}
+DELETE FROM ad_set_daily_rollups
+WHERE org_id = :org_id AND date BETWEEN :since AND :until
+  {cell_filter}
+"""
+
+_INSERT_SQL = """
+INSERT INTO ad_set_daily_rollups (
+    id, org_id, ad_set_id, date, spend_cents, attributed_revenue_cents,
+    attributed_cogs_cents, estimated_returns_cents, order_count,
+    high_confidence_order_count, created_at, updated_at
+)
+SELECT
+    gen_random_uuid(), :org_id, ad_set_id, date, spend_cents,
+    attributed_revenue_cents, attributed_cogs_cents, estimated_returns_cents,
+    order_count, high_confidence_order_count, now(), now()
+FROM ({source}) AS source
+"""
+
+
+def _refresh_sql(by_cell: bool) -> Tuple[str, str]:
+    """(clear, insert) statements for a day range, or for explicit cells."""
+    in_cells = "AND (ad_set_id, date) IN (SELECT ad_set_id, date FROM cells)"
+    source = _ROLLUP_SOURCE_SQL.format(
+        cells_cte=_CELLS_CTE if by_cell else "",
+        spend_filter=in_cells if by_cell else "",
+        attributed_filter=(
+            "AND (a.ad_set_id, (o.created_at AT TIME ZONE 'UTC')::date) "
+            "IN (SELECT ad_set_id, date FROM cells)"
+            if by_cell
+            else ""
+        ),
+        unit_cogs=_UNIT_COGS,
+    )
+    clear = _CLEAR_SQL.format(
+        with_cells=f"WITH {_CELLS_CTE.rstrip(',')}" if by_cell else "",
+        cell_filter=in_cells if by_cell else "",
+    )
+    return clear, _INSERT_SQL.format(source=source)
+
+
+_RANGE_CLEAR_SQL, _RANGE_INSERT_SQL = _refresh_sql(by_cell=False)
+_CELLS_CLEAR_SQL, _CELLS_INSERT_SQL = _refresh_sql(by_cell=True)
+
+
+def _start_of_day(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+async def refresh_daily_rollups(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    since: date,
+    until: date,
+    *,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Rebuild the org's ad_set_daily_rollups rows for days [since, until] with
+    one set-based INSERT and return how many were written.
+
+    Called by attribution for the days it touched. Single cells (input
+    changes, and the day that just crossed RETURNS_SETTLE_DAYS, marked by
+    the nightly return-rate task) go through `refresh_rollup_cells`.
+    Caller commits.
+    """
+    now = now or datetime.now(timezone.utc)
+    params = {
+        "org_id": org_id,
+        "since": since,
+        "until": until,
+        "since_at": _start_of_day(since),
+        "until_at": _start_of_day(until + timedelta(days=1)),
+        "returns_settled_before": now - timedelta(days=RETURNS_SETTLE_DAYS),
+    }
+    await session.execute(text(_RANGE_CLEAR_SQL), params)
+    result = await session.execute(text(_RANGE_INSERT_SQL), params)
+    return result.rowcount
+
+
+async def refresh_rollup_cells(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    cells: Iterable[Tuple[uuid.UUID, date]],
+    *,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Rebuild only the given (ad_set_id, day) rollup rows, e.g. the dirty set
+    left by a COGS or return-rate change. Caller commits.
+    """
+    cells = sorted(set(cells))
+    if not cells:
+        return 0
+    now = now or datetime.now(timezone.utc)
+    since = min(day for _, day in cells)
+    until = max(day for _, day in cells)
+    params = {
+        "org_id": org_id,
+        "since": since,
+        "until": until,
+        "since_at": _start_of_day(since),
+        "until_at": _start_of_day(until + timedelta(days=1)),
+        "returns_settled_before": now - timedelta(days=RETURNS_SETTLE_DAYS),
+        "cell_ad_set_ids": [ad_set_id for ad_set_id, _ in cells],
+        "cell_dates": [day for _, day in cells],
+    }
+    await session.execute(text(_CELLS_CLEAR_SQL), params)
+    result = await session.execute(text(_CELLS_INSERT_SQL), params)
+    return result.rowcount
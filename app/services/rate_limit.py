@@ -0,0 +1,360 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Protocol, Union
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+
+@dataclass(frozen=True)
+class BucketConfig:
+    """Token bucket: refills at `rate` tokens/second up to `capacity`."""
+
+    rate: float
+    capacity: float
+
+
+# Defaults per connector type; buckets themselves are per Store / AdAccount.
+CONNECTOR_BUCKETS: Dict[str, BucketConfig] = {
+    # Shopify REST: leaky bucket of 40 requests draining at 2/s per store.
+    "shopify": BucketConfig(rate=2.0, capacity=40.0),
+    # Meta throttles by usage percentage rather than a fixed rate; start
+    # conservative and let response headers slow us down further.
+    "meta": BucketConfig(rate=5.0, capacity=20.0),
+    "google": BucketConfig(rate=10.0, capacity=20.0),
+    "tiktok": BucketConfig(rate=5.0, capacity=10.0),
+}
+
+# Platform usage above this fraction halves our rate until it recovers.
+USAGE_SLOWDOWN_THRESHOLD = 0.75
+SLOWDOWN_SCALE = 0.5
+SLOWDOWN_SECONDS = 60.0
+
+# Idle buckets expire so Redis does not accumulate keys for old connectors.
+_BUCKET_TTL_SECONDS = 3600
+
+
+class BucketBackend(Protocol):
+    """Storage for bucket state; every method is atomic per key."""
+
+    async def take(self, key: str, rate: float, capacity: float, tokens: float) -> float:
+        """Take `tokens` if available; return 0, or the seconds to wait first."""
+
+    async def block(self, key: str, seconds: float) -> None:
+        """Refuse all takes on `key` for `seconds` (e.g. from Retry-After)."""
+
+    async def limit_available(self, key: str, available: float) -> None:
+        """Cap the bucket at `available` tokens (server-reported headroom)."""
+
+    async def slow_down(self, key: str, scale: float, seconds: float) -> None:
+        """Multiply the refill rate by `scale` for the next `seconds`."""
+
+
+# Bucket state lives in one hash per key: tokens, ts, blocked_until,
+# scale, scale_until. Redis TIME is the clock so every worker agrees.
+_TAKE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local s = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until', 'scale', 'scale_until')
+local tokens = tonumber(s[1]) or capacity
+local ts = tonumber(s[2]) or now
+local blocked_until = tonumber(s[3]) or 0
+if blocked_until > now then
+  return tostring(blocked_until - now)
+end
+if (tonumber(s[5]) or 0) > now then
+  rate = rate * (tonumber(s[4]) or 1)
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= requested then
+  tokens = tokens - requested
+else
+  wait = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return tostring(wait)
+"""
+
+_BLOCK_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local until_ = now + tonumber(ARGV[1])
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if until_ > current then
+  redis.call('HSET', KEYS[1], 'blocked_until', until_)
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+_LIMIT_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local available = tonumber(ARGV[1])
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens == nil or tokens > available then
+  redis.call('HSET', KEYS[1], 'tokens', available, 'ts', now)
+end
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return 1
+"""
+
+_SLOW_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('HSET', KEYS[1], 'scale', ARGV[1], 'scale_until', now + tonumber(ARGV[2]))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return 1
+"""
+
+
+class RedisBucketBackend:
+    """Bucket state in Redis, shared by every Celery worker process."""
+
+    def __init__(self, redis: Redis) -> None:
+        self._redis = redis
+        self._take = redis.register_script(_TAKE_LUA)
+        self._block = redis.register_script(_BLOCK_LUA)
+        self._limit = redis.register_script(_LIMIT_LUA)
+        self._slow = redis.register_script(_SLOW_LUA)
+
+    async def take(self, key: str, rate: float, capacity: float, tokens: float) -> float:
+        wait = await self._take(
+            keys=[key], args=[rate, capacity, tokens, _BUCKET_TTL_SECONDS]
+        )
+        return float(wait)
+
+    async def block(self, key: str, seconds: float) -> None:
+        await self._block(keys=[key], args=[seconds, _BUCKET_TTL_SECONDS])
+
+    async def limit_available(self, key: str, available: float) -> None:
+        await self._limit(keys=[key], args=[available, _BUCKET_TTL_SECONDS])
+
+    async def slow_down(self, key: str, scale: float, seconds: float) -> None:
+        await self._slow(keys=[key], args=[scale, seconds, _BUCKET_TTL_SECONDS])
+
+
+@dataclass
+class _LocalBucket:
+    tokens: Optional[float] = None
+    ts: float = 0.0
+    blocked_until: float = 0.0
+    scale: float = 1.0
+    scale_until: float = 0.0
+
+
+class InMemoryBucketBackend:
+    """
+    Same algorithm as the Redis scripts, in process memory.
+
+    Only limits callers within this process; meant for tests and local runs
+    without Redis.
+    """
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._buckets: Dict[str, _LocalBucket] = {}
+        self._lock = asyncio.Lock()
+
+    async def take(self, key: str, rate: float, capacity: float, tokens: float) -> float:
+        async with self._lock:
+            now = self._clock()
+            bucket = self._buckets.setdefault(key, _LocalBucket(ts=now))
+            if bucket.blocked_until > now:
+                return bucket.blocked_until - now
+            if bucket.scale_until > now:
+                rate *= bucket.scale
+            current = capacity if bucket.tokens is None else bucket.tokens
+            current = min(capacity, current + max(0.0, now - bucket.ts) * rate)
+            wait = 0.0
+            if current >= tokens:
+                current -= tokens
+            else:
+                wait = (tokens - current) / rate
+            bucket.tokens, bucket.ts = current, now
+            return wait
+
+    async def block(self, key: str, seconds: float) -> None:
+        async with self._lock:
+            now = self._clock()
+            bucket = self._buckets.setdefault(key, _LocalBucket(ts=now))
+            bucket.blocked_until = max(bucket.blocked_until, now + seconds)
+
+    async def limit_available(self, key: str, available: float) -> None:
+        async with self._lock:
+            now = self._clock()
+            bucket = self._buckets.setdefault(key, _LocalBucket(ts=now))
+            if bucket.tokens is None or bucket.tokens > available:
+                bucket.tokens, bucket.ts = available, now
+
+    async def slow_down(self, key: str, scale: float, seconds: float) -> None:
+        async with self._lock:
+            now = self._clock()
+            bucket = self._buckets.setdefault(key, _LocalBucket(ts=now))
+            bucket.scale, bucket.scale_until = scale, now + seconds
+
+
+class RateLimitTimeout(Exception):
+    """Raised when `acquire` would have to wait longer than its timeout."""
+
+
+def _retry_after_seconds(value: str) -> Optional[float]:
+    """Parse a Retry-After header: delta-seconds or an HTTP date."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _meta_usage(headers: Mapping[str, str]) -> tuple[float, float]:
+    """
+    Highest usage fraction and regain-access wait (seconds) from Meta's
+    X-Business-Use-Case-Usage / X-Ad-Account-Usage / X-App-Usage headers.
+    """
+    usage, wait = 0.0, 0.0
+
+    buc = headers.get("x-business-use-case-usage")
+    if buc:
+        try:
+            for entries in json.loads(buc).values():
+                for entry in entries:
+                    for field in ("call_count", "total_cputime", "total_time"):
+                        usage = max(usage, float(entry.get(field, 0)) / 100)
+                    minutes = float(entry.get("estimated_time_to_regain_access", 0))
+                    wait = max(wait, minutes * 60)
+        except (ValueError, AttributeError, TypeError):
+            logger.debug("Unparseable X-Business-Use-Case-Usage: %s", buc)
+
+    for header in ("x-ad-account-usage", "x-app-usage"):
+        raw = headers.get(header)
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+            for field in ("acc_id_util_pct", "call_count", "total_cputime", "total_time"):
+                usage = max(usage, float(data.get(field, 0)) / 100)
+            wait = max(wait, float(data.get("reset_time_duration", 0)))
+        except (ValueError, AttributeError, TypeError):
+            logger.debug("Unparseable %s: %s", header, raw)
+
+    return usage, wait
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by connector (`Store.id` / `AdAccount.id`).
+
+    `acquire()` before every platform API call; `observe()` every response so
+    Retry-After, Shopify's leaky-bucket header and Meta's usage headers can
+    slow the shared bucket down for all workers.
+    """
+
+    def __init__(
+        self,
+        backend: BucketBackend,
+        *,
+        buckets: Optional[Mapping[str, BucketConfig]] = None,
+        key_prefix: str = "ratelimit",
+    ) -> None:
+        self.backend = backend
+        self.buckets = dict(buckets or CONNECTOR_BUCKETS)
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: Optional[str] = REDIS_URL, **kwargs) -> "RateLimiter":
+        if not url:
+            raise RuntimeError("REDIS_URL is not configured")
+        return cls(RedisBucketBackend(Redis.from_url(url)), **kwargs)
+
+    def _key(self, connector: str, connector_id: Union[UUID, str]) -> str:
+        return f"{self.key_prefix}:{connector}:{connector_id}"
+
+    async def acquire(
+        self,
+        connector: str,
+        connector_id: Union[UUID, str],
+        tokens: float = 1.0,
+        *,
+        timeout: Optional[float] = None,
+    ) -> None:
+        """
+        Wait until `tokens` are available for this connector and take them.
+
+        Raises RateLimitTimeout if that would take longer than `timeout`, and
+        ValueError if `tokens` exceeds the bucket's capacity (it could never
+        be taken).
+        """
+        config = self.buckets[connector]
+        if tokens > config.capacity:
+            raise ValueError(
+                f"{connector}: {tokens} tokens exceed bucket capacity {config.capacity}"
+            )
+        key = self._key(connector, connector_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = await self.backend.take(key, config.rate, config.capacity, tokens)
+            if wait <= 0:
+                return
+            if deadline is not None and time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(
+                    f"{connector} {connector_id}: rate limited for {wait:.1f}s"
+                )
+            await asyncio.sleep(wait)
+
+    async def observe(
+        self,
+        connector: str,
+        connector_id: Union[UUID, str],
+        status_code: int,
+        headers: Mapping[str, str],
+    ) -> None:
+        """Adapt the connector's bucket to what the platform reported."""
+        key = self._key(connector, connector_id)
+        # httpx.Headers is case-insensitive already; plain dicts may not be.
+        headers = {k.lower(): v for k, v in headers.items()}
+
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            seconds = _retry_after_seconds(retry_after)
+            if seconds:
+                await self.backend.block(key, seconds)
+        elif status_code == 429:
+            await self.backend.block(key, 1.0)
+
+        if connector == "shopify":
+            # e.g. "32/40": 32 of the store's 40 bucket slots are in use.
+            call_limit = headers.get("x-shopify-shop-api-call-limit")
+            if call_limit:
+                try:
+                    used, limit = (float(part) for part in call_limit.split("/"))
+                except ValueError:
+                    logger.debug("Unparseable Shopify call limit: %s", call_limit)
+                else:
+                    await self.backend.limit_available(key, max(0.0, limit - used))
+
+        elif connector == "meta":
+            usage, wait = _meta_usage(headers)
+            if wait > 0:
+                await self.backend.block(key, wait)
+            elif usage >= USAGE_SLOWDOWN_THRESHOLD:
+                await self.backend.slow_down(key, SLOWDOWN_SCALE, SLOWDOWN_SECONDS)
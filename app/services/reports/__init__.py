@@ -0,0 +1 @@
+"""Report exports: streamed CSV encoding and multipart object uploads."""
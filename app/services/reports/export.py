@@ -0,0 +1,229 @@
+import csv
+import io
+import logging
+import os
+import time
+import uuid
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.reports.object_store import ObjectStore, PartWriter, get_object_store
+
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip from the server-side cursor.
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+# Bytes buffered per upload part (R2 / S3 require >= 5 MiB except the last).
+EXPORT_PART_SIZE_BYTES = int(os.getenv("EXPORT_PART_SIZE_BYTES", str(8 * 1024 * 1024)))
+EXPORT_URL_EXPIRES_SECONDS = int(os.getenv("EXPORT_URL_EXPIRES_SECONDS", "3600"))
+
+ORDER_EXPORT_COLUMNS = (
+    "order_id",
+    "shopify_order_id",
+    "created_at",
+    "currency",
+    "total_amount_cents",
+    "total_discounts_cents",
+    "financial_status",
+    "ad_set_id",
+    "attribution_tier",
+    "confidence_score",
+    "attribution_method",
+    "attributed_revenue_cents",
+)
+
+_ORDER_EXPORT_SQL = """
+SELECT o.id, o.shopify_order_id, o.created_at, o.currency, o.total_amount_cents,
+       o.total_discounts_cents, o.financial_status, ao.ad_set_id, ao.attribution_tier,
+       ao.confidence_score, ao.attribution_method, ao.attributed_revenue_cents
+FROM orders o
+LEFT JOIN attributed_orders ao ON ao.org_id = o.org_id AND ao.order_id = o.id
+WHERE o.org_id = :org_id AND o.created_at >= :start AND o.created_at < :end
+ORDER BY o.created_at, o.id
+"""
+
+
+@dataclass
+class ExportProgress:
+    rows: int = 0
+    csv_bytes: int = 0
+    uploaded_bytes: int = 0
+    parts: int = 0
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    key: str
+    rows: int
+    csv_bytes: int
+    uploaded_bytes: int
+    parts: int
+    seconds: float
+
+
+ProgressCallback = Callable[[ExportProgress], None]
+
+
+def _log_progress(progress: ExportProgress) -> None:
+    logger.info(
+        "export: rows=%s csv=%sB uploaded=%sB parts=%s",
+        progress.rows,
+        progress.csv_bytes,
+        progress.uploaded_bytes,
+        progress.parts,
+    )
+
+
+async def stream_batches(
+    session: AsyncSession,
+    sql: str,
+    params: Dict[str, Any],
+    *,
+    batch_size: int = EXPORT_BATCH_ROWS,
+) -> AsyncIterator[Sequence[Any]]:
+    """Rows of `sql` from a server-side cursor, `batch_size` at a time."""
+    result = await session.stream(
+        text(sql).execution_options(yield_per=batch_size), params
+    )
+    async for batch in result.partitions():
+        yield batch
+
+
+class CsvEncoder:
+    """CSV text for batches of rows, UTF-8 encoded and optionally gzipped as it goes."""
+
+    def __init__(self, header: Sequence[str], *, gzip: bool = False) -> None:
+        self._text = io.StringIO()
+        self._writer = csv.writer(self._text, lineterminator="\n")
+        # wbits 16 + MAX_WBITS: gzip container, so the object is a valid .gz file.
+        self._compressor = (
+            zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if gzip else None
+        )
+        self._pending_header: Optional[Sequence[str]] = header
+        self.csv_bytes = 0
+
+    def _output(self, raw: bytes) -> bytes:
+        self.csv_bytes += len(raw)
+        return self._compressor.compress(raw) if self._compressor else raw
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        self._text.seek(0)
+        self._text.truncate()
+        if self._pending_header is not None:
+            self._writer.writerow(self._pending_header)
+            self._pending_header = None
+        self._writer.writerows(rows)
+        return self._output(self._text.getvalue().encode())
+
+    def finish(self) -> bytes:
+        tail = self.encode(()) if self._pending_header is not None else b""
+        return tail + self._compressor.flush() if self._compressor else tail
+
+
+async def export_csv(
+    batches: AsyncIterator[Sequence[Sequence[Any]]],
+    header: Sequence[str],
+    store: ObjectStore,
+    key: str,
+    *,
+    gzip: bool = False,
+    part_size: int = EXPORT_PART_SIZE_BYTES,
+    on_progress: Optional[ProgressCallback] = _log_progress,
+) -> ExportResult:
+    """
+    Encode `batches` to CSV and upload them to `key` as a multipart upload.
+
+    Only one batch and one part are held at a time, so memory stays flat
+    however many rows there are. `on_progress` runs after every uploaded
+    part and once at the end. On any error the upload is aborted, so no
+    partial object is left behind.
+    """
+    started = time.perf_counter()
+    encoder = CsvEncoder(header, gzip=gzip)
+    upload = await store.start_upload(
+        key, "application/gzip" if gzip else "text/csv; charset=utf-8"
+    )
+    writer = PartWriter(upload, max(part_size, store.min_part_size))
+    progress = ExportProgress()
+
+    def report() -> None:
+        progress.csv_bytes = encoder.csv_bytes
+        progress.uploaded_bytes = writer.uploaded_bytes
+        progress.parts = writer.parts
+        if on_progress is not None:
+            on_progress(progress)
+
+    try:
+        async for batch in batches:
+            progress.rows += len(batch)
+            if await writer.write(encoder.encode(batch)):
+                report()
+        await writer.write(encoder.finish())
+        await writer.close()
+        await upload.complete()
+    except BaseException:
+        try:
+            await upload.abort()
+        except Exception:
+            logger.exception("export: abort of %s failed", key)
+        raise
+    report()
+
+    return ExportResult(
+        key=key,
+        rows=progress.rows,
+        csv_bytes=progress.csv_bytes,
+        uploaded_bytes=progress.uploaded_bytes,
+        parts=progress.parts,
+        seconds=time.perf_counter() - started,
+    )
+
+
+async def export_orders_csv(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    start_date: date,
+    end_date: date,
+    *,
+    gzip: bool = True,
+    store: Optional[ObjectStore] = None,
+    on_progress: Optional[ProgressCallback] = _log_progress,
+) -> ExportResult:
+    """Order-level export (one row per order, with its attribution) to `{org_id}/exports/`."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    key = (
+        f"{org_id}/exports/orders_{start_date.isoformat()}_{end_date.isoformat()}_"
+        f"{stamp}_{uuid.uuid4().hex[:8]}.csv"
+        + (".gz" if gzip else "")
+    )
+    params = {
+        "org_id": org_id,
+        "start": datetime.combine(start_date, datetime.min.time(), tzinfo=timezone.utc),
+        "end": datetime.combine(
+            end_date + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc
+        ),
+    }
+    result = await export_csv(
+        stream_batches(session, _ORDER_EXPORT_SQL, params),
+        ORDER_EXPORT_COLUMNS,
+        store or get_object_store(),
+        key,
+        gzip=gzip,
+        on_progress=on_progress,
+    )
+    logger.info(
+        "export org=%s key=%s rows=%s uploaded=%sB parts=%s in %.1fs",
+        org_id,
+        key,
+        result.rows,
+        result.uploaded_bytes,
+        result.parts,
+        result.seconds,
+    )
+    return result
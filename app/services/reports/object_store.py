@@ -0,0 +1,368 @@
+import hashlib
+import hmac
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional, Protocol, Tuple
+from urllib.parse import quote, urlsplit
+from xml.etree import ElementTree
+
+import httpx
+
+
+logger = logging.getLogger(__name__)
+
+# Cloudflare R2 (any S3-compatible endpoint works, e.g. a local MinIO).
+R2_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL")
+R2_BUCKET = os.getenv("R2_BUCKET")
+R2_ACCESS_KEY_ID = os.getenv("R2_ACCESS_KEY_ID")
+R2_SECRET_ACCESS_KEY = os.getenv("R2_SECRET_ACCESS_KEY")
+R2_REGION = os.getenv("R2_REGION", "auto")
+# Without R2, exports are written under this directory instead.
+EXPORT_STORAGE_DIR = os.getenv("EXPORT_STORAGE_DIR")
+
+# S3 rejects non-final multipart parts smaller than this.
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+READ_CHUNK_BYTES = 1024 * 1024
+
+
+class ObjectStoreError(Exception):
+    """Error returned by the object store."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class MultipartUpload(Protocol):
+    """One object being written part by part; invisible until `complete()`."""
+
+    key: str
+
+    async def upload_part(self, data: bytes) -> None: ...
+
+    async def complete(self) -> None: ...
+
+    async def abort(self) -> None: ...
+
+
+class ObjectStore(Protocol):
+    min_part_size: int
+
+    async def start_upload(self, key: str, content_type: str) -> MultipartUpload: ...
+
+    async def presigned_url(self, key: str, expires_seconds: int) -> str: ...
+
+    def read_chunks(self, key: str) -> AsyncIterator[bytes]: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class PartWriter:
+    """Buffers bytes and uploads them as parts of at least `part_size`."""
+
+    def __init__(self, upload: MultipartUpload, part_size: int) -> None:
+        self._upload = upload
+        self.part_size = part_size
+        self._buffer = bytearray()
+        self.uploaded_bytes = 0
+        self.parts = 0
+
+    async def write(self, data: bytes) -> bool:
+        """Buffer `data`; returns True when that filled and uploaded a part."""
+        self._buffer += data
+        if len(self._buffer) < self.part_size:
+            return False
+        await self._flush()
+        return True
+
+    async def _flush(self) -> None:
+        part = bytes(self._buffer)
+        self._buffer.clear()
+        await self._upload.upload_part(part)
+        self.uploaded_bytes += len(part)
+        self.parts += 1
+
+    async def close(self) -> None:
+        """Upload what is left as the last (possibly short) part."""
+        if self._buffer or self.parts == 0:
+            await self._flush()
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class S3ObjectStore:
+    """
+    S3 multipart uploads over httpx, signed with AWS Signature V4.
+
+    Uses path-style URLs (`{endpoint}/{bucket}/{key}`), which both R2 and
+    local S3 stand-ins accept.
+    """
+
+    min_part_size = S3_MIN_PART_SIZE
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        access_key_id: str,
+        secret_access_key: str,
+        *,
+        region: str = "auto",
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self._access_key_id = access_key_id
+        self._secret_access_key = secret_access_key
+        self.region = region
+        self._host = urlsplit(self.endpoint_url).netloc
+        self._client = client or httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _path(self, key: str) -> str:
+        return quote(f"/{self.bucket}/{key}", safe="/-_.~")
+
+    def _scope(self, now: datetime) -> Tuple[str, str]:
+        day = now.strftime("%Y%m%d")
+        return day, f"{day}/{self.region}/s3/aws4_request"
+
+    def _signature(self, now: datetime, canonical_request: str) -> str:
+        day, scope = self._scope(now)
+        string_to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                now.strftime("%Y%m%dT%H%M%SZ"),
+                scope,
+                hashlib.sha256(canonical_request.encode()).hexdigest(),
+            ]
+        )
+        key = _hmac(f"AWS4{self._secret_access_key}".encode(), day)
+        for part in (self.region, "s3", "aws4_request"):
+            key = _hmac(key, part)
+        return hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    @staticmethod
+    def _query(params: Dict[str, str]) -> str:
+        return "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted(params.items())
+        )
+
+    def _signed(
+        self,
+        method: str,
+        key: str,
+        params: Dict[str, str],
+        body: bytes = b"",
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[str, Dict[str, str]]:
+        now = datetime.now(timezone.utc)
+        path, query = self._path(key), self._query(params)
+        payload_hash = hashlib.sha256(body).hexdigest()
+        headers = {
+            **(extra_headers or {}),
+            "host": self._host,
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": now.strftime("%Y%m%dT%H%M%SZ"),
+        }
+        # SigV4 signs headers in sorted order.
+        headers = dict(sorted(headers.items()))
+        signed_headers = ";".join(headers)
+        canonical_request = "\n".join(
+            [
+                method,
+                path,
+                query,
+                "".join(f"{name}:{value}\n" for name, value in headers.items()),
+                signed_headers,
+                payload_hash,
+            ]
+        )
+        _, scope = self._scope(now)
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self._access_key_id}/{scope}, "
+            f"SignedHeaders={signed_headers}, "
+            f"Signature={self._signature(now, canonical_request)}"
+        )
+        return f"{self.endpoint_url}{path}" + (f"?{query}" if query else ""), headers
+
+    async def _request(
+        self,
+        method: str,
+        key: str,
+        params: Dict[str, str],
+        body: bytes = b"",
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        url, headers = self._signed(method, key, params, body, extra_headers)
+        response = await self._client.request(method, url, content=body, headers=headers)
+        # CompleteMultipartUpload can fail with a 200 and an <Error> body.
+        if response.status_code >= 300 or response.content.lstrip().startswith(b"<Error"):
+            raise ObjectStoreError(
+                f"{method} {key}: {response.status_code} {response.text[:500]}",
+                response.status_code,
+            )
+        return response
+
+    async def start_upload(self, key: str, content_type: str) -> "S3MultipartUpload":
+        response = await self._request(
+            "POST", key, {"uploads": ""}, extra_headers={"content-type": content_type}
+        )
+        root = ElementTree.fromstring(response.content)
+        upload_id = next(
+            (el.text for el in root.iter() if _local_name(el.tag) == "UploadId" and el.text),
+            None,
+        )
+        if upload_id is None:
+            raise ObjectStoreError(f"no UploadId for {key}", response.status_code)
+        return S3MultipartUpload(self, key, upload_id)
+
+    async def presigned_url(self, key: str, expires_seconds: int) -> str:
+        now = datetime.now(timezone.utc)
+        _, scope = self._scope(now)
+        params = {
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self._access_key_id}/{scope}",
+            "X-Amz-Date": now.strftime("%Y%m%dT%H%M%SZ"),
+            "X-Amz-Expires": str(expires_seconds),
+            "X-Amz-SignedHeaders": "host",
+        }
+        path, query = self._path(key), self._query(params)
+        canonical_request = "\n".join(
+            ["GET", path, query, f"host:{self._host}\n", "host", "UNSIGNED-PAYLOAD"]
+        )
+        signature = self._signature(now, canonical_request)
+        return f"{self.endpoint_url}{path}?{query}&X-Amz-Signature={signature}"
+
+    async def read_chunks(self, key: str) -> AsyncIterator[bytes]:
+        url, headers = self._signed("GET", key, {})
+        async with self._client.stream("GET", url, headers=headers) as response:
+            if response.status_code >= 300:
+                await response.aread()
+                raise ObjectStoreError(
+                    f"GET {key}: {response.status_code} {response.text[:500]}",
+                    response.status_code,
+                )
+            async for chunk in response.aiter_bytes(READ_CHUNK_BYTES):
+                yield chunk
+
+    async def delete(self, key: str) -> None:
+        await self._request("DELETE", key, {})
+
+
+class S3MultipartUpload:
+    def __init__(self, store: S3ObjectStore, key: str, upload_id: str) -> None:
+        self._store = store
+        self.key = key
+        self.upload_id = upload_id
+        self._etags: List[str] = []
+
+    async def upload_part(self, data: bytes) -> None:
+        part_number = len(self._etags) + 1
+        response = await self._store._request(
+            "PUT",
+            self.key,
+            {"partNumber": str(part_number), "uploadId": self.upload_id},
+            data,
+        )
+        self._etags.append(response.headers["etag"])
+
+    async def complete(self) -> None:
+        parts = "".join(
+            f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for number, etag in enumerate(self._etags, start=1)
+        )
+        body = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode()
+        await self._store._request("POST", self.key, {"uploadId": self.upload_id}, body)
+
+    async def abort(self) -> None:
+        await self._store._request("DELETE", self.key, {"uploadId": self.upload_id})
+
+
+class FilesystemObjectStore:
+    """
+    Objects as files under `root`, for local development and tests. Parts
+    are appended to a hidden temp file that is renamed into place on
+    `complete()`, so readers never see a partial object.
+    """
+
+    min_part_size = 1
+
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ObjectStoreError(f"key escapes the store root: {key}")
+        return path
+
+    async def start_upload(self, key: str, content_type: str) -> "FilesystemMultipartUpload":
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return FilesystemMultipartUpload(key, path)
+
+    async def presigned_url(self, key: str, expires_seconds: int) -> str:
+        return self._path(key).as_uri()
+
+    async def read_chunks(self, key: str) -> AsyncIterator[bytes]:
+        path = self._path(key)
+        if not path.is_file():
+            raise ObjectStoreError(f"no such object: {key}", 404)
+        with path.open("rb") as f:
+            while chunk := f.read(READ_CHUNK_BYTES):
+                yield chunk
+
+    async def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+class FilesystemMultipartUpload:
+    def __init__(self, key: str, path: Path) -> None:
+        self.key = key
+        self._path = path
+        self._temp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.part")
+        self._file = self._temp.open("wb")
+
+    async def upload_part(self, data: bytes) -> None:
+        self._file.write(data)
+
+    async def complete(self) -> None:
+        self._file.close()
+        self._temp.replace(self._path)
+
+    async def abort(self) -> None:
+        self._file.close()
+        self._temp.unlink(missing_ok=True)
+
+
+_object_store: Optional[ObjectStore] = None
+
+
+def get_object_store() -> ObjectStore:
+    """R2 when configured, else EXPORT_STORAGE_DIR; one store per process."""
+    global _object_store
+    if _object_store is None:
+        if R2_ENDPOINT_URL and R2_BUCKET and R2_ACCESS_KEY_ID and R2_SECRET_ACCESS_KEY:
+            _object_store = S3ObjectStore(
+                R2_ENDPOINT_URL,
+                R2_BUCKET,
+                R2_ACCESS_KEY_ID,
+                R2_SECRET_ACCESS_KEY,
+                region=R2_REGION,
+            )
+        elif EXPORT_STORAGE_DIR:
+            _object_store = FilesystemObjectStore(EXPORT_STORAGE_DIR)
+        else:
+            raise RuntimeError("R2 (or EXPORT_STORAGE_DIR) is not configured")
+    return _object_store
@@ -0,0 +1 @@
+"""Automation rules: compiled predicates, evaluation and action execution."""
@@ -0,0 +1,232 @@
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from app.models.ad_accounts import AdPlatform
+from app.models.automation_rules import AutomationRule, RuleActionType, RuleScope
+from app.models.profit_metrics import ProfitWindowType
+
+
+# Metrics a condition may test. Cents are compared as integers; the Numeric
+# ratios are compared in fixed point (ten-thousandths, the column's scale)
+# so a threshold like `true_roas lt 1.5` is exact.
+CENTS_METRICS = ("net_profit_cents", "spend_cents")
+RATIO_METRICS = ("net_profit_pct", "true_roas")
+METRICS = CENTS_METRICS + RATIO_METRICS
+RATIO_SCALE = 10_000
+
+OPERATORS: Dict[str, Callable[[np.ndarray, int], np.ndarray]] = {
+    "lt": np.less,
+    "gt": np.greater,
+    "lte": np.less_equal,
+    "gte": np.greater_equal,
+}
+
+DEFAULT_WINDOW = ProfitWindowType.D7
+
+
+class RuleConfigError(ValueError):
+    """conditions_json / guardrails_json that cannot be compiled."""
+
+
+@dataclass(frozen=True)
+class MetricColumns:
+    """
+    Latest profit window for every in-scope entity, one int64 array per metric.
+
+    `valid[metric]` is False where the metric is NULL (a ratio with a zero
+    denominator); such entities never satisfy a condition on it.
+    """
+
+    entity_ids: Tuple[uuid.UUID, ...]
+    values: Mapping[str, np.ndarray]
+    valid: Mapping[str, np.ndarray]
+    order_count: np.ndarray
+    _ascending: Dict[str, np.ndarray] = field(default_factory=dict, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.entity_ids)
+
+    def ascending(self, metric: str) -> np.ndarray:
+        """Entity positions sorted by `metric`, computed once per load."""
+        order = self._ascending.get(metric)
+        if order is None:
+            order = self._ascending[metric] = np.argsort(self.values[metric], kind="stable")
+        return order
+
+    @classmethod
+    def empty(cls) -> "MetricColumns":
+        zeros = np.zeros(0, dtype=np.int64)
+        return cls(
+            entity_ids=(),
+            values={m: zeros for m in METRICS},
+            valid={m: zeros.astype(bool) for m in METRICS},
+            order_count=zeros,
+        )
+
+    def snapshot(self, position: int) -> Dict[str, Any]:
+        """JSON-safe metric values of one entity, for the action's audit trail."""
+        out: Dict[str, Any] = {"order_count": int(self.order_count[position])}
+        for metric in METRICS:
+            if not self.valid[metric][position]:
+                out[metric] = None
+            elif metric in RATIO_METRICS:
+                out[metric] = str(Decimal(int(self.values[metric][position])) / RATIO_SCALE)
+            else:
+                out[metric] = int(self.values[metric][position])
+        return out
+
+
+@dataclass(frozen=True)
+class Condition:
+    metric: str
+    operator: str
+    threshold: int
+
+    def mask(self, columns: MetricColumns) -> np.ndarray:
+        compare = OPERATORS[self.operator]
+        return compare(columns.values[self.metric], self.threshold) & columns.valid[self.metric]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A rule's conditions and guardrails as vectorised predicates."""
+
+    rule_id: uuid.UUID
+    version: datetime
+    platform: AdPlatform
+    scope: RuleScope
+    window_type: ProfitWindowType
+    conditions: Tuple[Condition, ...]
+    match_any: bool
+    action_type: RuleActionType
+    action_params: Mapping[str, Any]
+    min_orders: int = 0
+    min_spend_cents: int = 0
+    max_actions_per_day: Optional[int] = None
+
+    def triggered(self, columns: MetricColumns) -> np.ndarray:
+        """Boolean mask of entities meeting the conditions."""
+        masks = [condition.mask(columns) for condition in self.conditions]
+        if self.match_any:
+            return np.logical_or.reduce(masks)
+        return np.logical_and.reduce(masks)
+
+    def guardrails_pass(self, columns: MetricColumns) -> np.ndarray:
+        """Boolean mask of entities with enough orders and spend to act on."""
+        return (columns.order_count >= self.min_orders) & (
+            columns.values["spend_cents"] >= self.min_spend_cents
+        )
+
+
+def _threshold(metric: str, raw: Any) -> int:
+    if isinstance(raw, bool) or raw is None:
+        raise RuleConfigError(f"{metric}: threshold must be a number")
+    try:
+        value = Decimal(str(raw))
+    except InvalidOperation as exc:
+        raise RuleConfigError(f"{metric}: threshold must be a number") from exc
+    if metric in CENTS_METRICS:
+        if value != value.to_integral_value():
+            raise RuleConfigError(f"{metric}: threshold must be whole cents")
+        return int(value)
+    scaled = value * RATIO_SCALE
+    if scaled != scaled.to_integral_value():
+        raise RuleConfigError(f"{metric}: threshold has more than 4 decimal places")
+    return int(scaled)
+
+
+def _condition(raw: Mapping[str, Any]) -> Condition:
+    metric = raw.get("metric")
+    operator = raw.get("operator")
+    if metric not in METRICS:
+        raise RuleConfigError(f"unsupported metric {metric!r}")
+    if operator not in OPERATORS:
+        raise RuleConfigError(f"unsupported operator {operator!r}")
+    return Condition(metric, operator, _threshold(metric, raw.get("value")))
+
+
+def _non_negative_int(guardrails: Mapping[str, Any], key: str) -> Optional[int]:
+    raw = guardrails.get(key)
+    if raw is None:
+        return None
+    if isinstance(raw, bool) or not isinstance(raw, int) or raw < 0:
+        raise RuleConfigError(f"guardrail {key} must be a non-negative integer")
+    return raw
+
+
+def compile_rule(rule: AutomationRule) -> CompiledRule:
+    """
+    Validate a rule and turn it into a CompiledRule.
+
+    conditions_json is either one condition
+    `{"metric", "operator", "value", "window"?}` or
+    `{"window"?, "match": "all" | "any", "conditions": [...]}`.
+    Raises RuleConfigError on anything it cannot evaluate.
+    """
+    spec = rule.conditions_json or {}
+    raw_conditions = spec.get("conditions", [spec] if "metric" in spec else [])
+    if not raw_conditions:
+        raise RuleConfigError("rule has no conditions")
+    match = spec.get("match", "all")
+    if match not in ("all", "any"):
+        raise RuleConfigError(f"unsupported match {match!r}")
+    try:
+        window_type = ProfitWindowType(spec.get("window", DEFAULT_WINDOW.value))
+    except ValueError as exc:
+        raise RuleConfigError(f"unsupported window {spec.get('window')!r}") from exc
+
+    guardrails = rule.guardrails_json or {}
+    return CompiledRule(
+        rule_id=rule.id,
+        version=rule.updated_at,
+        platform=rule.platform,
+        scope=rule.scope,
+        window_type=window_type,
+        conditions=tuple(_condition(c) for c in raw_conditions),
+        match_any=match == "any",
+        action_type=rule.action_type,
+        action_params=dict(rule.action_params_json or {}),
+        min_orders=_non_negative_int(guardrails, "min_orders") or 0,
+        min_spend_cents=_non_negative_int(guardrails, "min_spend_cents") or 0,
+        max_actions_per_day=_non_negative_int(guardrails, "max_actions_per_day"),
+    )
+
+
+class CompiledRuleCache:
+    """
+    Process-wide cache of compiled rules keyed by rule id.
+
+    An entry is reused only while the rule's `updated_at` matches, so an
+    edited rule recompiles on its next evaluation; `invalidate()` drops an
+    entry eagerly (e.g. from the rule update endpoint).
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[uuid.UUID, CompiledRule] = {}
+        self._lock = threading.Lock()
+
+    def get(self, rule: AutomationRule) -> CompiledRule:
+        with self._lock:
+            cached = self._entries.get(rule.id)
+        if cached is not None and cached.version == rule.updated_at:
+            return cached
+        compiled = compile_rule(rule)
+        with self._lock:
+            self._entries[rule.id] = compiled
+        return compiled
+
+    def invalidate(self, rule_id: uuid.UUID) -> None:
+        with self._lock:
+            self._entries.pop(rule_id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+rule_cache = CompiledRuleCache()
@@ -0,0 +1,366 @@
+import logging
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ad_accounts import AdAccount, AdPlatform
+from app.models.automation_rules import AutomationRule, RuleScope
+from app.models.profit_metrics import ProfitWindowType
+from app.services.ingest.bulk import driver_connection
+from app.services.rules.compiler import (
+    METRICS,
+    RATIO_SCALE,
+    CompiledRule,
+    MetricColumns,
+    RuleConfigError,
+    rule_cache,
+)
+from app.services.rules.guardrails import CLAIMED, GuardrailState
+
+
+logger = logging.getLogger(__name__)
+
+# Consumed by the action executor; enqueued by name so evaluation does not
+# import platform clients.
+EXECUTE_ACTION_TASK = "rules.execute_rule_action"
+
+# Latest window of each type per entity, one query per (scope, window).
+# Ratios come back in fixed point with a validity flag so the arrays stay int64.
+_METRICS_SQL: Dict[RuleScope, str] = {
+    RuleScope.ADSET: f"""
+SELECT
+    ad_set_id AS entity_id,
+    window_end,
+    net_profit_cents,
+    spend_cents,
+    coalesce(round(net_profit_pct * {RATIO_SCALE}), 0)::bigint AS net_profit_pct,
+    net_profit_pct IS NOT NULL AS net_profit_pct_valid,
+    coalesce(round(true_roas * {RATIO_SCALE}), 0)::bigint AS true_roas,
+    true_roas IS NOT NULL AS true_roas_valid,
+    order_count
+FROM profit_metrics
+WHERE org_id = :org_id
+  AND window_type = :window_type
+  AND window_start = (
+      SELECT max(window_start) FROM profit_metrics
+      WHERE org_id = :org_id AND window_type = :window_type
+  )
+ORDER BY ad_set_id
+""",
+}
+
+_EXECUTION_COLUMNS = (
+    "id",
+    "org_id",
+    "rule_id",
+    "evaluated_at",
+    "entities_evaluated",
+    "entities_triggered",
+    "entities_blocked_by_guardrail",
+    "action_queued",
+    "created_at",
+    "updated_at",
+)
+
+
+@dataclass
+class RuleEvaluationStats:
+    """
+    Outcome of one `evaluate_rules_for_org` pass.
+
+    `actions` are the executor kwargs to enqueue once the caller has
+    committed the rule_executions rows.
+    """
+
+    rules: int = 0
+    skipped: int = 0
+    skipped_platform: int = 0
+    entities_evaluated: int = 0
+    triggered: int = 0
+    blocked: int = 0
+    actions: List[Dict[str, Any]] = field(default_factory=list)
+    load_seconds: float = 0.0
+    evaluate_seconds: float = 0.0
+
+
+async def load_metric_columns(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    scope: RuleScope,
+    window_type: ProfitWindowType,
+) -> Tuple[MetricColumns, Optional[Any]]:
+    """Metric arrays for every entity of `scope`, plus the window's end day."""
+    result = await session.execute(
+        text(_METRICS_SQL[scope]), {"org_id": org_id, "window_type": window_type.value}
+    )
+    rows = result.all()
+    if not rows:
+        return MetricColumns.empty(), None
+
+    count = len(rows)
+    values = {
+        metric: np.fromiter((getattr(r, metric) for r in rows), dtype=np.int64, count=count)
+        for metric in METRICS
+    }
+    valid = {
+        "net_profit_cents": np.ones(count, dtype=bool),
+        "spend_cents": np.ones(count, dtype=bool),
+        "net_profit_pct": np.fromiter(
+            (r.net_profit_pct_valid for r in rows), dtype=bool, count=count
+        ),
+        "true_roas": np.fromiter((r.true_roas_valid for r in rows), dtype=bool, count=count),
+    }
+    columns = MetricColumns(
+        entity_ids=tuple(r.entity_id for r in rows),
+        values=values,
+        valid=valid,
+        order_count=np.fromiter((r.order_count for r in rows), dtype=np.int64, count=count),
+    )
+    return columns, rows[0].window_end
+
+
+async def connected_platforms(session: AsyncSession, org_id: uuid.UUID) -> Set[AdPlatform]:
+    result = await session.execute(
+        select(AdAccount.platform).where(AdAccount.org_id == org_id).distinct()
+    )
+    return set(result.scalars())
+
+
+def platform_scoped(platform: AdPlatform, connected: Set[AdPlatform]) -> bool:
+    """
+    Whether every ad set in the org's profit metrics belongs to `platform`.
+
+    Ad sets are not linked to their ad account (profit_metrics carries only
+    ad_set_id), so a platform's ad sets can only be singled out when it is
+    the org's one connected platform. Otherwise a Meta rule would act on
+    Google ad sets too, so such rules are skipped.
+    """
+    return connected == {platform}
+
+
+def _worst_first(rule: CompiledRule, columns: MetricColumns, eligible: np.ndarray) -> np.ndarray:
+    """Eligible positions ordered so a daily action cap goes to the furthest-off ones."""
+    first = rule.conditions[0]
+    order = columns.ascending(first.metric)
+    if first.operator in ("gt", "gte"):
+        order = order[::-1]
+    return order[eligible[order]]
+
+
+def decide(
+    rule: CompiledRule, columns: MetricColumns, actions_today: int = 0
+) -> Tuple[int, np.ndarray]:
+    """
+    (entities triggered, positions to act on) for one rule. Triggered
+    entities failing min_orders / min_spend, or beyond what is left of
+    max_actions_per_day, are the guardrail-blocked ones.
+    """
+    triggered = rule.triggered(columns)
+    eligible = triggered & rule.guardrails_pass(columns)
+    if rule.max_actions_per_day is None:
+        return int(triggered.sum()), np.flatnonzero(eligible)
+    remaining = max(rule.max_actions_per_day - actions_today, 0)
+    return int(triggered.sum()), _worst_first(rule, columns, eligible)[:remaining]
+
+
+async def release_actions(
+    guardrails: GuardrailState, actions: List[Dict[str, Any]]
+) -> None:
+    """
+    Give back the guardrail claims of actions that will not be enqueued
+    (evaluation, commit or enqueue failed), so they are neither blocked as
+    duplicates for 24h nor counted against the daily cap.
+    """
+    for action in actions:
+        try:
+            await guardrails.release_action(
+                uuid.UUID(action["org_id"]),
+                uuid.UUID(action["rule_id"]),
+                action["entity_id"],
+                action["metric_snapshot"]["window_end"],
+                claimed_at=datetime.fromisoformat(action["claimed_at"]),
+            )
+        except Exception:
+            logger.exception(
+                "rule %s entity %s: guardrail claim not released",
+                action["rule_id"],
+                action["entity_id"],
+            )
+
+
+async def evaluate_rules_for_org(
+    session: AsyncSession,
+    org_id: uuid.UUID,
+    *,
+    guardrails: GuardrailState,
+    now: Optional[datetime] = None,
+) -> RuleEvaluationStats:
+    """
+    Evaluate every active rule of the org against its latest profit windows.
+
+    Rules compile once into cached vectorised predicates; metrics are read
+    in one query per (scope, window) shared by all rules needing it, and
+    every rule is a handful of numpy comparisons over those columns. Daily
+    action counts and 24h idempotency come from `guardrails` (Redis), not
+    audit_log. One rule_executions row per rule is COPYed in a single
+    batch. Claimed actions come back in `stats.actions` for the caller to
+    enqueue after commit.
+    """
+    now = now or datetime.now(timezone.utc)
+    stats = RuleEvaluationStats()
+    started = time.perf_counter()
+
+    result = await session.execute(
+        select(AutomationRule).where(
+            AutomationRule.org_id == org_id, AutomationRule.is_active.is_(True)
+        )
+    )
+    active_rules = result.scalars().all()
+    platforms = await connected_platforms(session, org_id) if active_rules else set()
+    rules: List[CompiledRule] = []
+    for rule in active_rules:
+        try:
+            compiled = rule_cache.get(rule)
+        except RuleConfigError as exc:
+            logger.warning("rule %s org=%s not evaluated: %s", rule.id, org_id, exc)
+            stats.skipped += 1
+            continue
+        if not platform_scoped(compiled.platform, platforms):
+            logger.warning(
+                "rule %s org=%s not evaluated: %s ad sets cannot be told apart "
+                "(connected platforms: %s)",
+                rule.id,
+                org_id,
+                compiled.platform.value,
+                ", ".join(sorted(p.value for p in platforms)) or "none",
+            )
+            stats.skipped += 1
+            stats.skipped_platform += 1
+            continue
+        if compiled.scope not in _METRICS_SQL:
+            logger.warning(
+                "rule %s org=%s: %s scope has no profit metrics yet",
+                rule.id,
+                org_id,
+                compiled.scope.value,
+            )
+            stats.skipped += 1
+            continue
+        rules.append(compiled)
+    stats.rules = len(rules)
+    if not rules:
+        return stats
+
+    by_source: Dict[Tuple[RuleScope, ProfitWindowType], List[CompiledRule]] = defaultdict(list)
+    for compiled in rules:
+        by_source[(compiled.scope, compiled.window_type)].append(compiled)
+
+    sources: Dict[Tuple[RuleScope, ProfitWindowType], Tuple[MetricColumns, Any]] = {}
+    for scope, window_type in by_source:
+        sources[(scope, window_type)] = await load_metric_columns(
+            session, org_id, scope, window_type
+        )
+    capped = [r.rule_id for r in rules if r.max_actions_per_day is not None]
+    used_today = await guardrails.actions_today(session, org_id, capped, now=now)
+    loaded = time.perf_counter()
+    stats.load_seconds = loaded - started
+
+    decisions: List[Tuple[CompiledRule, MetricColumns, int, np.ndarray]] = []
+    candidates: List[Dict[str, Any]] = []
+    claims: List[Tuple[uuid.UUID, str, Optional[str], Optional[int]]] = []
+    for (scope, window_type), group in by_source.items():
+        columns, window_end = sources[(scope, window_type)]
+        for compiled in group:
+            used = used_today.get(compiled.rule_id, 0)
+            n_triggered, positions = decide(compiled, columns, used)
+            decisions.append((compiled, columns, n_triggered, positions))
+            for pos in positions:
+                entity_id = str(columns.entity_ids[pos])
+                candidates.append(
+                    {
+                        "org_id": str(org_id),
+                        "rule_id": str(compiled.rule_id),
+                        "entity_id": entity_id,
+                        "entity_type": scope.value,
+                        "platform": compiled.platform.value,
+                        "action_type": compiled.action_type.value,
+                        "action_params": dict(compiled.action_params),
+                        "metric_snapshot": {
+                            **columns.snapshot(int(pos)),
+                            "window_type": window_type.value,
+                            "window_end": window_end.isoformat(),
+                        },
+                        "claimed_at": now.isoformat(),
+                    }
+                )
+                claims.append(
+                    (
+                        compiled.rule_id,
+                        entity_id,
+                        window_end.isoformat(),
+                        compiled.max_actions_per_day,
+                    )
+                )
+
+    # One round trip: skips rule + entity + window repeats within 24h and
+    # enforces the daily cap atomically across concurrent evaluations.
+    outcomes = await guardrails.claim_actions(org_id, claims, now=now)
+    queued: Dict[uuid.UUID, int] = defaultdict(int)
+    for action, outcome in zip(candidates, outcomes):
+        if outcome == CLAIMED:
+            stats.actions.append(action)
+            queued[uuid.UUID(action["rule_id"])] += 1
+
+    executions: List[Tuple[Any, ...]] = []
+    for compiled, columns, n_triggered, _ in decisions:
+        n_queued = queued.get(compiled.rule_id, 0)
+        executions.append(
+            (
+                uuid.uuid4(),
+                org_id,
+                compiled.rule_id,
+                now,
+                len(columns),
+                n_triggered,
+                n_triggered - n_queued,
+                n_queued > 0,
+                now,
+                now,
+            )
+        )
+        stats.entities_evaluated += len(columns)
+        stats.triggered += n_triggered
+        stats.blocked += n_triggered - n_queued
+    stats.evaluate_seconds = time.perf_counter() - loaded
+
+    try:
+        driver = await driver_connection(session)
+        await driver.copy_records_to_table(
+            "rule_executions", records=executions, columns=list(_EXECUTION_COLUMNS)
+        )
+    except BaseException:
+        await release_actions(guardrails, stats.actions)
+        raise
+
+    logger.info(
+        "rules org=%s: %d rules (%d skipped, %d for platform), %d entities, "
+        "%d triggered, %d blocked, %d actions; load %.3fs eval %.3fs",
+        org_id,
+        stats.rules,
+        stats.skipped,
+        stats.skipped_platform,
+        stats.entities_evaluated,
+        stats.triggered,
+        stats.blocked,
+        len(stats.actions),
+        stats.load_seconds,
+        stats.evaluate_seconds,
+    )
+    return stats
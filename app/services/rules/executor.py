@@ -0,0 +1,77 @@
+import logging
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ad_accounts import AdPlatform
+from app.models.automation_rules import AutomationRule, RuleActionType
+from app.services.audit import AuditEntry, AuditWriter
+
+
+logger = logging.getLogger(__name__)
+
+# execute_rule_action outcomes.
+SKIPPED = "skipped"
+ALERTED = "alerted"
+NOT_EXECUTED = "not_executed"
+
+
+async def execute_rule_action(
+    session: AsyncSession,
+    audit: AuditWriter,
+    *,
+    org_id: uuid.UUID,
+    rule_id: uuid.UUID,
+    entity_id: str,
+    entity_type: str,
+    platform: str,
+    action_type: str,
+    action_params: Dict[str, Any],
+    metric_snapshot: Dict[str, Any],
+) -> str:
+    """
+    Carry out one claimed rule action and record it in audit_log.
+
+    The 24h idempotency and daily cap were enforced when the action was
+    claimed (see GuardrailState). A rule deactivated or deleted since then
+    is skipped. Alerts are recorded as is. Platform writes (pause, budget
+    changes) need the platform's id for the ad set, which is not stored yet
+    (profit metrics are keyed by our ad_set_id only), so they are recorded
+    as not executed rather than guessed.
+    """
+    result = await session.execute(
+        select(AutomationRule.is_active).where(
+            AutomationRule.org_id == org_id, AutomationRule.id == rule_id
+        )
+    )
+    if not result.scalar_one_or_none():
+        logger.info("rule %s org=%s inactive; action on %s skipped", rule_id, org_id, entity_id)
+        return SKIPPED
+
+    entry = AuditEntry(
+        org_id=org_id,
+        action_type=f"rule_{action_type}",
+        entity_type=entity_type,
+        entity_id=entity_id,
+        platform=AdPlatform(platform),
+        rule_id=rule_id,
+        metric_snapshot=metric_snapshot,
+        api_request={"action_type": action_type, "action_params": action_params},
+    )
+    if RuleActionType(action_type) is RuleActionType.ALERT:
+        await audit.add(entry)
+        return ALERTED
+
+    entry.api_response = {"error": "platform ad set id unknown; action not executed"}
+    await audit.add(entry)
+    logger.warning(
+        "rule %s org=%s: %s on %s %s not executed (no platform ad set id)",
+        rule_id,
+        org_id,
+        action_type,
+        platform,
+        entity_id,
+    )
+    return NOT_EXECUTED
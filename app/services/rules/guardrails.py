@@ -0,0 +1,387 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Mapping, Optional, Protocol, Sequence, Tuple
+
+from redis.asyncio import Redis
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+# execute_rule_action skips a rule + entity + window acted on this recently.
+IDEMPOTENCY_SECONDS = 24 * 3600
+# Daily counters (and the day's "seeded" marker) outlive their UTC day a
+# little so a late evaluation near midnight still finds them.
+_DAY_KEY_TTL_SECONDS = 2 * 24 * 3600
+
+# claim() outcomes.
+CLAIMED = 1
+DUPLICATE = 0
+CAPPED = -1
+
+
+@dataclass(frozen=True)
+class ActionClaim:
+    """One action about to be queued: its idempotency key and daily counter."""
+
+    idempotency_key: str
+    counter_key: str
+    cap: Optional[int]
+
+
+class GuardrailBackend(Protocol):
+    """Counter / key storage; `claim` and `seed` are atomic per key."""
+
+    async def get_counts(self, keys: Sequence[str]) -> List[int]:
+        """Current value of each counter (0 when missing)."""
+
+    async def exists(self, key: str) -> bool:
+        """Whether `key` is present."""
+
+    async def claim(
+        self, claims: Sequence[ActionClaim], idempotency_ttl: int, counter_ttl: int
+    ) -> List[int]:
+        """
+        Per claim: DUPLICATE if its idempotency key exists, CAPPED if its
+        counter already reached `cap`, else set the key, increment the
+        counter and return CLAIMED.
+        """
+
+    async def release(self, claim: ActionClaim) -> None:
+        """Undo a claim whose action was never carried out."""
+
+    async def seed(
+        self,
+        counters: Mapping[str, int],
+        counter_ttl: int,
+        idempotency_keys: Mapping[str, int],
+        marker_key: str,
+    ) -> None:
+        """
+        Raise counters to at least the given values, set idempotency keys
+        (key -> remaining seconds) that are missing, then set `marker_key`.
+        """
+
+
+# Counters are plain INCR keys; idempotency keys are SET NX EX keys.
+_CLAIM_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+  return 0
+end
+local cap = tonumber(ARGV[1])
+if cap >= 0 and (tonumber(redis.call('GET', KEYS[2])) or 0) >= cap then
+  return -1
+end
+redis.call('SET', KEYS[1], 1, 'EX', tonumber(ARGV[2]))
+if redis.call('INCR', KEYS[2]) == 1 then
+  redis.call('EXPIRE', KEYS[2], tonumber(ARGV[3]))
+end
+return 1
+"""
+
+_RELEASE_LUA = """
+if redis.call('DEL', KEYS[1]) == 1 and (tonumber(redis.call('GET', KEYS[2])) or 0) > 0 then
+  redis.call('DECR', KEYS[2])
+end
+return 1
+"""
+
+# Raise-only, so a rebuild racing live increments never lowers a counter.
+_SEED_COUNTER_LUA = """
+local value = tonumber(ARGV[1])
+if (tonumber(redis.call('GET', KEYS[1])) or 0) < value then
+  redis.call('SET', KEYS[1], value, 'EX', tonumber(ARGV[2]))
+end
+return 1
+"""
+
+
+class RedisGuardrailBackend:
+    """Guardrail state in Redis, shared by every Celery worker process."""
+
+    def __init__(self, redis: Redis) -> None:
+        self._redis = redis
+        self._claim = redis.register_script(_CLAIM_LUA)
+        self._release = redis.register_script(_RELEASE_LUA)
+        self._seed_counter = redis.register_script(_SEED_COUNTER_LUA)
+
+    async def get_counts(self, keys: Sequence[str]) -> List[int]:
+        if not keys:
+            return []
+        return [int(v or 0) for v in await self._redis.mget(list(keys))]
+
+    async def exists(self, key: str) -> bool:
+        return bool(await self._redis.exists(key))
+
+    async def claim(
+        self, claims: Sequence[ActionClaim], idempotency_ttl: int, counter_ttl: int
+    ) -> List[int]:
+        if not claims:
+            return []
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for c in claims:
+                await self._claim(
+                    keys=[c.idempotency_key, c.counter_key],
+                    args=[-1 if c.cap is None else c.cap, idempotency_ttl, counter_ttl],
+                    client=pipe,
+                )
+            return [int(r) for r in await pipe.execute()]
+
+    async def release(self, claim: ActionClaim) -> None:
+        await self._release(keys=[claim.idempotency_key, claim.counter_key])
+
+    async def seed(
+        self,
+        counters: Mapping[str, int],
+        counter_ttl: int,
+        idempotency_keys: Mapping[str, int],
+        marker_key: str,
+    ) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, value in counters.items():
+                await self._seed_counter(keys=[key], args=[value, counter_ttl], client=pipe)
+            for key, ttl in idempotency_keys.items():
+                pipe.set(key, 1, ex=ttl, nx=True)
+            pipe.set(marker_key, 1, ex=counter_ttl)
+            await pipe.execute()
+
+
+class InMemoryGuardrailBackend:
+    """
+    Same semantics as the Redis scripts, in process memory.
+
+    Only shared within this process; meant for tests and local runs
+    without Redis.
+    """
+
+    def __init__(self, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._values: Dict[str, Tuple[int, float]] = {}
+        self._lock = asyncio.Lock()
+
+    def _get(self, key: str) -> Optional[int]:
+        item = self._values.get(key)
+        if item is None:
+            return None
+        if item[1] <= self._clock():
+            del self._values[key]
+            return None
+        return item[0]
+
+    def _set(self, key: str, value: int, ttl: float) -> None:
+        self._values[key] = (value, self._clock() + ttl)
+
+    async def get_counts(self, keys: Sequence[str]) -> List[int]:
+        async with self._lock:
+            return [self._get(k) or 0 for k in keys]
+
+    async def exists(self, key: str) -> bool:
+        async with self._lock:
+            return self._get(key) is not None
+
+    async def claim(
+        self, claims: Sequence[ActionClaim], idempotency_ttl: int, counter_ttl: int
+    ) -> List[int]:
+        out: List[int] = []
+        async with self._lock:
+            for c in claims:
+                if self._get(c.idempotency_key) is not None:
+                    out.append(DUPLICATE)
+                    continue
+                count = self._get(c.counter_key)
+                if c.cap is not None and (count or 0) >= c.cap:
+                    out.append(CAPPED)
+                    continue
+                self._set(c.idempotency_key, 1, idempotency_ttl)
+                if count is None:
+                    self._set(c.counter_key, 1, counter_ttl)
+                else:
+                    self._values[c.counter_key] = (count + 1, self._values[c.counter_key][1])
+                out.append(CLAIMED)
+        return out
+
+    async def release(self, claim: ActionClaim) -> None:
+        async with self._lock:
+            if self._values.pop(claim.idempotency_key, None) is None:
+                return
+            count = self._get(claim.counter_key)
+            if count:
+                self._values[claim.counter_key] = (count - 1, self._values[claim.counter_key][1])
+
+    async def seed(
+        self,
+        counters: Mapping[str, int],
+        counter_ttl: int,
+        idempotency_keys: Mapping[str, int],
+        marker_key: str,
+    ) -> None:
+        async with self._lock:
+            for key, value in counters.items():
+                if (self._get(key) or 0) < value:
+                    self._set(key, value, counter_ttl)
+            for key, ttl in idempotency_keys.items():
+                if self._get(key) is None:
+                    self._set(key, 1, ttl)
+            self._set(marker_key, 1, counter_ttl)
+
+
+# Durable truth for a rebuild: system actions recorded in audit_log. The
+# window an action was for travels in its metric snapshot.
+_DAILY_COUNTS_SQL = """
+SELECT rule_id, count(*) AS actions
+FROM audit_log
+WHERE org_id = :org_id
+  AND actor_type = 'system'
+  AND rule_id IS NOT NULL
+  AND created_at >= :day_start
+GROUP BY rule_id
+"""
+
+_RECENT_ACTIONS_SQL = """
+SELECT rule_id, entity_id, metric_snapshot_json ->> 'window_end' AS window_end,
+       max(created_at) AS acted_at
+FROM audit_log
+WHERE org_id = :org_id
+  AND actor_type = 'system'
+  AND rule_id IS NOT NULL
+  AND entity_id IS NOT NULL
+  AND created_at >= :since
+GROUP BY 1, 2, 3
+"""
+
+
+def _day_start(now: datetime) -> datetime:
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class GuardrailState:
+    """
+    Per-(org, rule, UTC day) action counters for `max_actions_per_day` and
+    the 24h rule + entity + window idempotency keys for execute_rule_action.
+
+    Counts are answered from Redis instead of counting audit_log rows on
+    every evaluation. The first read of an org's day after Redis lost its
+    data (no "seeded" marker) rebuilds both from audit_log. Run Redis with
+    a noeviction policy so counters are not dropped while the marker stays.
+    """
+
+    def __init__(self, backend: GuardrailBackend, *, key_prefix: str = "guardrail") -> None:
+        self.backend = backend
+        self.key_prefix = key_prefix
+
+    @classmethod
+    def from_url(cls, url: Optional[str] = REDIS_URL, **kwargs) -> "GuardrailState":
+        if not url:
+            raise RuntimeError("REDIS_URL is not configured")
+        return cls(RedisGuardrailBackend(Redis.from_url(url)), **kwargs)
+
+    def counter_key(self, org_id: uuid.UUID, rule_id: uuid.UUID, day: date) -> str:
+        return f"{self.key_prefix}:{org_id}:{day.isoformat()}:{rule_id}:actions"
+
+    def idempotency_key(
+        self, org_id: uuid.UUID, rule_id: uuid.UUID, entity_id: str, window_end: Optional[str]
+    ) -> str:
+        return f"{self.key_prefix}:{org_id}:{rule_id}:{entity_id}:{window_end}:done"
+
+    def _marker_key(self, org_id: uuid.UUID, day: date) -> str:
+        return f"{self.key_prefix}:{org_id}:{day.isoformat()}:seeded"
+
+    async def _ensure_seeded(
+        self, session: AsyncSession, org_id: uuid.UUID, now: datetime
+    ) -> None:
+        marker = self._marker_key(org_id, now.date())
+        if await self.backend.exists(marker):
+            return
+
+        day = now.date()
+        result = await session.execute(
+            text(_DAILY_COUNTS_SQL), {"org_id": org_id, "day_start": _day_start(now)}
+        )
+        counters = {self.counter_key(org_id, row.rule_id, day): row.actions for row in result}
+
+        result = await session.execute(
+            text(_RECENT_ACTIONS_SQL),
+            {"org_id": org_id, "since": now - timedelta(seconds=IDEMPOTENCY_SECONDS)},
+        )
+        claimed: Dict[str, int] = {}
+        for row in result:
+            remaining = IDEMPOTENCY_SECONDS - int((now - row.acted_at).total_seconds())
+            if remaining > 0:
+                key = self.idempotency_key(org_id, row.rule_id, row.entity_id, row.window_end)
+                claimed[key] = remaining
+
+        await self.backend.seed(counters, _DAY_KEY_TTL_SECONDS, claimed, marker)
+        logger.info(
+            "guardrail state rebuilt from audit_log org=%s day=%s: %d counters, %d keys",
+            org_id,
+            day.isoformat(),
+            len(counters),
+            len(claimed),
+        )
+
+    async def actions_today(
+        self,
+        session: AsyncSession,
+        org_id: uuid.UUID,
+        rule_ids: Sequence[uuid.UUID],
+        *,
+        now: Optional[datetime] = None,
+    ) -> Dict[uuid.UUID, int]:
+        """Actions already taken (or queued) today per rule, in one round trip."""
+        now = now or datetime.now(timezone.utc)
+        if not rule_ids:
+            return {}
+        await self._ensure_seeded(session, org_id, now)
+        counts = await self.backend.get_counts(
+            [self.counter_key(org_id, rule_id, now.date()) for rule_id in rule_ids]
+        )
+        return dict(zip(rule_ids, counts))
+
+    async def claim_actions(
+        self,
+        org_id: uuid.UUID,
+        actions: Sequence[Tuple[uuid.UUID, str, Optional[str], Optional[int]]],
+        *,
+        now: Optional[datetime] = None,
+    ) -> List[int]:
+        """
+        Atomically claim (rule_id, entity_id, window_end, cap) actions;
+        returns CLAIMED, DUPLICATE or CAPPED for each. Call after
+        `actions_today` so the day has been seeded.
+        """
+        now = now or datetime.now(timezone.utc)
+        claims = [
+            ActionClaim(
+                self.idempotency_key(org_id, rule_id, entity_id, window_end),
+                self.counter_key(org_id, rule_id, now.date()),
+                cap,
+            )
+            for rule_id, entity_id, window_end, cap in actions
+        ]
+        return await self.backend.claim(claims, IDEMPOTENCY_SECONDS, _DAY_KEY_TTL_SECONDS)
+
+    async def release_action(
+        self,
+        org_id: uuid.UUID,
+        rule_id: uuid.UUID,
+        entity_id: str,
+        window_end: Optional[str],
+        *,
+        claimed_at: datetime,
+    ) -> None:
+        """Give back a claim whose action failed for good, so it may run again."""
+        await self.backend.release(
+            ActionClaim(
+                self.idempotency_key(org_id, rule_id, entity_id, window_end),
+                self.counter_key(org_id, rule_id, claimed_at.date()),
+                None,
+            )
+        )
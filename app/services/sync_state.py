@@ -0,0 +1,148 @@
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.ad_accounts import AdAccount
+from app.models.stores import Store
+from app.models.sync_runs import SyncMode, SyncRun, SyncRunStatus
+
+
+# First connect (or an explicit request) pulls the full history window.
+BACKFILL_DAYS = int(os.getenv("SYNC_BACKFILL_DAYS", "90"))
+
+# Shopify: re-read a little before the watermark so orders updated while the
+# previous sync was paging are not missed. Upserts make the overlap free.
+SHOPIFY_WATERMARK_OVERLAP = timedelta(minutes=10)
+
+# Ad platforms keep restating recent days (late conversions, attribution
+# windows), so every incremental sync re-pulls this many trailing days.
+AD_INSIGHTS_RESTATEMENT_DAYS = {
+    "meta": int(os.getenv("META_RESTATEMENT_DAYS", "7")),
+    "google": int(os.getenv("GOOGLE_RESTATEMENT_DAYS", "3")),
+    "tiktok": int(os.getenv("TIKTOK_RESTATEMENT_DAYS", "7")),
+}
+
+Connector = Union[Store, AdAccount]
+
+
+@dataclass(frozen=True)
+class SyncPlan:
+    """
+    What a connector sync should fetch.
+
+    For Shopify `since` is the `updated_at_min` to request; for ad accounts it
+    is the first insights day (midnight UTC) to pull.
+    """
+
+    mode: SyncMode
+    since: datetime
+    until: datetime
+    watermark_before: Optional[datetime]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _start_of_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def connector_type(connector: Connector) -> str:
+    if isinstance(connector, Store):
+        return "shopify"
+    return connector.platform.value
+
+
+def plan_shopify_sync(
+    store: Store, *, force_full: bool = False, now: Optional[datetime] = None
+) -> SyncPlan:
+    now = now or _utcnow()
+    watermark = store.sync_watermark_at
+    if force_full or watermark is None:
+        return SyncPlan(SyncMode.FULL, now - timedelta(days=BACKFILL_DAYS), now, watermark)
+    return SyncPlan(
+        SyncMode.INCREMENTAL, watermark - SHOPIFY_WATERMARK_OVERLAP, now, watermark
+    )
+
+
+def plan_ad_insights_sync(
+    account: AdAccount, *, force_full: bool = False, now: Optional[datetime] = None
+) -> SyncPlan:
+    now = now or _utcnow()
+    today = _start_of_day(now)
+    watermark = account.sync_watermark_at
+    if force_full or watermark is None:
+        return SyncPlan(
+            SyncMode.FULL, today - timedelta(days=BACKFILL_DAYS), now, watermark
+        )
+
+    restatement = timedelta(days=AD_INSIGHTS_RESTATEMENT_DAYS[account.platform.value])
+    # Normally the restatement window; after a long outage, from the watermark.
+    since = min(_start_of_day(watermark), today - restatement)
+    return SyncPlan(SyncMode.INCREMENTAL, since, now, watermark)
+
+
+async def start_sync_run(
+    session: AsyncSession, connector: Connector, plan: SyncPlan
+) -> SyncRun:
+    run = SyncRun(
+        org_id=connector.org_id,
+        connector_type=connector_type(connector),
+        connector_id=connector.id,
+        mode=plan.mode,
+        status=SyncRunStatus.RUNNING,
+        window_start=plan.since,
+        window_end=plan.until,
+        watermark_before=plan.watermark_before,
+        started_at=_utcnow(),
+    )
+    session.add(run)
+    await session.flush()
+    return run
+
+
+async def finish_sync_run(
+    session: AsyncSession,
+    run: SyncRun,
+    connector: Connector,
+    *,
+    rows_fetched: int,
+    rows_upserted: int,
+    new_watermark: Optional[datetime],
+) -> SyncRun:
+    """
+    Record a successful sync and advance the connector's watermark.
+
+    `new_watermark` is data-derived: the newest Shopify `updated_at` seen, or
+    the plan's `until` for ad insights. The watermark never moves backwards
+    and stays put when nothing was fetched. Caller commits.
+    """
+    now = _utcnow()
+    watermark = connector.sync_watermark_at
+    if new_watermark is not None and (watermark is None or new_watermark > watermark):
+        watermark = new_watermark
+
+    run.status = SyncRunStatus.SUCCEEDED
+    run.rows_fetched = rows_fetched
+    run.rows_upserted = rows_upserted
+    run.rows_unchanged = max(rows_fetched - rows_upserted, 0)
+    run.watermark_after = watermark
+    run.finished_at = now
+
+    connector.sync_watermark_at = watermark
+    connector.last_sync_at = now
+    await session.flush()
+    return run
+
+
+async def fail_sync_run(session: AsyncSession, run: SyncRun, error: str) -> SyncRun:
+    """Mark a sync failed; the watermark is left where it was. Caller commits."""
+    run.status = SyncRunStatus.FAILED
+    run.error = error[:2000]
+    run.finished_at = _utcnow()
+    await session.flush()
+    return run
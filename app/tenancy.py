@@ -0,0 +1,111 @@
+import uuid
+from contextlib import aclosing, asynccontextmanager
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import ForeignKey, event, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    Mapped,
+    ORMExecuteState,
+    Session,
+    mapped_column,
+    with_loader_criteria,
+)
+
+from app import db
+
+
+# Tables range sub-partitioned by month under their hash partitions, and
+# how many months past the current one are kept created.
+MONTHLY_PARTITIONED_TABLES = ("ad_insights", "profit_metrics")
+PARTITION_MONTHS_AHEAD = 3
+
+
+class TenantScoped:
+    """
+    Marker mixin for tables that are hash-partitioned on `org_id`.
+
+    Inside `tenant_session()`, every ORM SELECT/UPDATE/DELETE touching one of
+    these models gets `org_id = :org_id` added, which is both the tenant
+    isolation rule and the predicate Postgres needs to prune partitions.
+    """
+
+    # Partitioned tables must carry the partition key in their primary key.
+    org_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("organizations.id"),
+        primary_key=True,
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _add_tenant_criteria(execute_state: ORMExecuteState) -> None:
+    org_id = execute_state.session.info.get("org_id")
+    if org_id is None or execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(
+            TenantScoped,
+            lambda cls: cls.org_id == org_id,
+            include_aliases=True,
+        )
+    )
+
+
+@asynccontextmanager
+async def tenant_session(
+    org_id: uuid.UUID | str, *, read_only: bool = False
+) -> AsyncIterator[AsyncSession]:
+    """
+    Open a session bound to one tenant.
+
+    ORM statements are filtered by `org_id` automatically. Raw `text()` SQL is
+    not rewritten; use `session.info["org_id"]` as its `:org_id` parameter.
+    """
+    org_uuid = org_id if isinstance(org_id, uuid.UUID) else uuid.UUID(str(org_id))
+
+    if read_only:
+        async with aclosing(db.get_read_db()) as sessions:
+            session = await anext(sessions)
+            session.info["org_id"] = org_uuid
+            yield session
+        return
+
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+
+    async with db.async_session_maker() as session:
+        session.info["org_id"] = org_uuid
+        yield session
+
+
+async def ensure_monthly_partitions(
+    session: AsyncSession, table: str, from_month: date, months: int
+) -> None:
+    """
+    Create missing monthly range partitions under every hash partition of
+    `table` (ad_insights, profit_metrics, ...). Safe to run repeatedly.
+    """
+    await session.execute(
+        text("SELECT pfam_ensure_monthly_partitions(:table, :from_month, :months)"),
+        {"table": table, "from_month": from_month, "months": months},
+    )
+
+
+async def ensure_tenant_partitions(
+    session: AsyncSession, *, now: Optional[datetime] = None
+) -> None:
+    """
+    Create this month's and the next PARTITION_MONTHS_AHEAD months'
+    partitions of every MONTHLY_PARTITIONED_TABLES table. Caller commits.
+    """
+    today = (now or datetime.now(timezone.utc)).date()
+    for table in MONTHLY_PARTITIONED_TABLES:
+        await ensure_monthly_partitions(
+            session, table, today.replace(day=1), PARTITION_MONTHS_AHEAD + 1
+        )
@@ -1,3 +1,3 @@
-"""Celery workers and background task definitions will live here in later phases."""
+"""Celery app and background task definitions."""
 
 
@@ -0,0 +1,25 @@
+import logging
+from typing import List
+
+from app import db
+from app.services.audit import detach_expired_audit_partitions, ensure_audit_partitions
+from app.workers.celery_app import celery_app, run_async
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _maintain() -> List[str]:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with db.async_session_maker() as session:
+        await ensure_audit_partitions(session)
+        detached = await detach_expired_audit_partitions(session)
+        await session.commit()
+    return detached
+
+
+@celery_app.task(name="audit.maintain_partitions")
+def maintain_audit_partitions_task() -> List[str]:
+    """Daily: create upcoming audit_log months, detach expired ones for archiving."""
+    return run_async(_maintain())
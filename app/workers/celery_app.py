@@ -0,0 +1,82 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Optional, TypeVar
+
+from celery import Celery
+from celery.schedules import crontab
+from dotenv import load_dotenv
+
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL or "redis://localhost:6379/0")
+
+celery_app = Celery(
+    "pfam",
+    broker=CELERY_BROKER_URL,
+    include=[
+        "app.workers.audit",
+        "app.workers.cogs",
+        "app.workers.credentials",
+        "app.workers.profit",
+        "app.workers.rules",
+        "app.workers.tenancy",
+    ],
+)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    timezone="UTC",
+    enable_utc=True,
+    # Ack after the task body returns, so a crashed worker's task is redelivered.
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    beat_schedule={
+        "audit-log-partitions": {
+            "task": "audit.maintain_partitions",
+            "schedule": crontab(hour=3, minute=0),
+        },
+        "tenant-table-partitions": {
+            "task": "tenancy.maintain_partitions",
+            "schedule": crontab(hour=3, minute=10),
+        },
+        # After midnight UTC, so yesterday is complete; runs daily because
+        # incremental return-rate runs only add one day.
+        "sku-return-rates": {
+            "task": "profit.compute_all_sku_return_rates",
+            "schedule": crontab(hour=1, minute=30),
+        },
+        # Picks up dirty cells whose recompute task was lost or failed.
+        "profit-dirty-sweep": {
+            "task": "profit.sweep_dirty",
+            "schedule": crontab(minute="*/15"),
+        },
+    },
+)
+
+T = TypeVar("T")
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine from a (synchronous) Celery task.
+
+    Every task in the worker process shares one event loop, so pooled
+    asyncpg connections and Redis clients created on it stay usable
+    across tasks.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop.run_until_complete(coro)
+
+
+def send_task(name: str, **kwargs: Any) -> None:
+    """Enqueue a task by name, without importing the module that defines it."""
+    celery_app.send_task(name, kwargs=kwargs)
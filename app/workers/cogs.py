@@ -0,0 +1,100 @@
+import csv
+import io
+import logging
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import db
+from app.models.cogs_imports import CogsImport, CogsImportStatus
+from app.services.ingest.cogs_csv import IMPORT_COGS_TASK, CogsCsvError, import_cogs_csv
+from app.services.profit.dirty import RECOMPUTE_DIRTY_TASK
+from app.services.reports.object_store import get_object_store
+from app.workers.celery_app import celery_app, run_async, send_task
+
+
+logger = logging.getLogger(__name__)
+
+# Failures caused by the file itself: recorded on the import, not retried.
+# csv.Error covers malformed files, e.g. a NUL byte or an over-long field.
+_FILE_ERRORS = (CogsCsvError, UnicodeDecodeError, csv.Error)
+
+
+async def _load(
+    session: AsyncSession, org_id: uuid.UUID, import_id: uuid.UUID
+) -> Optional[CogsImport]:
+    result = await session.execute(
+        select(CogsImport).where(CogsImport.org_id == org_id, CogsImport.id == import_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _import(org_id: uuid.UUID, import_id: uuid.UUID) -> int:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    store = get_object_store()
+
+    async with db.async_session_maker() as session:
+        job = await _load(session, org_id, import_id)
+        # A redelivered task for a finished import is a no-op.
+        if job is None or job.status in (CogsImportStatus.SUCCEEDED, CogsImportStatus.FAILED):
+            return 0
+        job.status = CogsImportStatus.RUNNING
+        job.started_at = datetime.now(timezone.utc)
+        object_key = job.object_key
+        await session.commit()
+
+        try:
+            # Spool to local disk, then parse line by line: memory stays flat.
+            with tempfile.TemporaryFile() as spool:
+                async for chunk in store.read_chunks(object_key):
+                    spool.write(chunk)
+                spool.seek(0)
+                lines = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+                result = await import_cogs_csv(session, org_id, lines)
+
+            job = await _load(session, org_id, import_id)
+            job.status = CogsImportStatus.SUCCEEDED
+            job.rows_total = result.rows_total
+            job.rows_invalid = result.rows_invalid
+            job.skus_changed = len(result.changed_skus)
+            job.row_errors_json = [error.to_dict() for error in result.row_errors]
+            job.finished_at = datetime.now(timezone.utc)
+            # Settings, dirty cells and the outcome commit together.
+            await session.commit()
+            changed = len(result.changed_skus)
+            dirty = result.dirty_cells
+        except Exception as exc:
+            await session.rollback()
+            job = await _load(session, org_id, import_id)
+            job.status = CogsImportStatus.FAILED
+            job.error = (str(exc) if isinstance(exc, _FILE_ERRORS) else repr(exc))[:2000]
+            job.finished_at = datetime.now(timezone.utc)
+            await session.commit()
+            if not isinstance(exc, _FILE_ERRORS):
+                # Keep the upload for inspection.
+                raise
+            changed = dirty = 0
+
+    if dirty:
+        try:
+            send_task(RECOMPUTE_DIRTY_TASK, org_id=str(org_id))
+        except Exception:
+            # The periodic dirty-cell sweep picks the cells up instead.
+            logger.exception("cogs import %s: could not queue profit recompute", import_id)
+
+    try:
+        await store.delete(object_key)
+    except Exception:
+        logger.exception("cogs import %s: could not delete %s", import_id, object_key)
+    return changed
+
+
+@celery_app.task(name=IMPORT_COGS_TASK)
+def import_cogs_csv_task(org_id: str, import_id: str) -> int:
+    """Parse and merge an uploaded COGS CSV; returns the number of SKUs changed."""
+    return run_async(_import(uuid.UUID(org_id), uuid.UUID(import_id)))
@@ -0,0 +1,33 @@
+import logging
+
+from app import db
+from app.services.credentials import (
+    ROTATE_KEYS_TASK,
+    ROTATION_BATCH_SIZE,
+    RotationStats,
+    get_vault,
+)
+from app.workers.celery_app import celery_app, run_async
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _rotate(batch_size: int) -> RotationStats:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with db.async_session_maker() as session:
+        return await get_vault().rotate(session, batch_size=batch_size)
+
+
+@celery_app.task(name=ROTATE_KEYS_TASK)
+def rotate_keys(batch_size: int = ROTATION_BATCH_SIZE) -> dict:
+    """
+    Re-encrypt all connector tokens under AES_KEY_ID. Run after deploying a
+    new key with the old one listed in AES_PREVIOUS_KEYS; safe to rerun.
+    """
+    stats = run_async(_rotate(batch_size))
+    logger.info(
+        "credential rotation done: %s in %.1fs", stats.reencrypted, stats.seconds
+    )
+    return stats.reencrypted
@@ -0,0 +1,107 @@
+import logging
+import uuid
+from typing import List
+
+from app import db
+from app.cache import commit_and_invalidate
+from app.services.profit.dirty import (
+    RECOMPUTE_DIRTY_TASK,
+    SWEEP_DIRTY_TASK,
+    mark_settled_day_dirty,
+    orgs_with_dirty_cells,
+    recompute_dirty_cells,
+)
+from app.services.profit.return_rates import (
+    COMPUTE_ALL_RETURN_RATES_TASK,
+    COMPUTE_RETURN_RATES_TASK,
+    compute_sku_return_rates,
+    orgs_with_stores,
+)
+from app.workers.celery_app import celery_app, run_async, send_task
+
+
+logger = logging.getLogger(__name__)
+
+
+async def _recompute(org_id: uuid.UUID) -> int:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with db.async_session_maker() as session:
+        stats = await recompute_dirty_cells(session, org_id)
+        # Taking the cells and the recomputed rows commit together.
+        await commit_and_invalidate(session)
+    if stats.cells:
+        logger.info(
+            "profit dirty recompute org=%s cells=%s rollup_rows=%s",
+            org_id,
+            stats.cells,
+            stats.rollup_rows,
+        )
+    return stats.cells
+
+
+@celery_app.task(name=RECOMPUTE_DIRTY_TASK)
+def recompute_dirty_task(org_id: str) -> int:
+    """
+    Recompute the org's dirty rollup cells and the profit windows they feed;
+    returns the number of cells. Queued after COGS imports and return-rate
+    runs; a no-op when nothing is dirty.
+    """
+    return run_async(_recompute(uuid.UUID(org_id)))
+
+
+async def _dirty_orgs() -> List[uuid.UUID]:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with db.async_session_maker() as session:
+        return await orgs_with_dirty_cells(session)
+
+
+@celery_app.task(name=SWEEP_DIRTY_TASK)
+def sweep_dirty_task() -> int:
+    """Periodic: queue a recompute for every org with dirty cells left over."""
+    org_ids = run_async(_dirty_orgs())
+    for org_id in org_ids:
+        send_task(RECOMPUTE_DIRTY_TASK, org_id=str(org_id))
+    return len(org_ids)
+
+
+async def _nightly(org_id: uuid.UUID) -> int:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with db.async_session_maker() as session:
+        stats = await compute_sku_return_rates(session, org_id)
+        settled = await mark_settled_day_dirty(session, org_id)
+        # Rates and the dirty cells they mark commit together.
+        await session.commit()
+    return stats.changed + settled
+
+
+@celery_app.task(name=COMPUTE_RETURN_RATES_TASK)
+def compute_sku_return_rates_task(org_id: str) -> int:
+    """
+    Nightly per org: refresh SKU return rates through yesterday and mark
+    the day that just crossed RETURNS_SETTLE_DAYS, then queue a profit
+    recompute if any cells were marked. Returns changed SKUs plus settled
+    cells.
+    """
+    changed = run_async(_nightly(uuid.UUID(org_id)))
+    if changed:
+        send_task(RECOMPUTE_DIRTY_TASK, org_id=org_id)
+    return changed
+
+
+async def _store_orgs() -> List[uuid.UUID]:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with db.async_session_maker() as session:
+        return await orgs_with_stores(session)
+
+
+@celery_app.task(name=COMPUTE_ALL_RETURN_RATES_TASK)
+def compute_all_sku_return_rates_task() -> int:
+    """Nightly: queue the return-rate run of every org with a store."""
+    org_ids = run_async(_store_orgs())
+    for org_id in org_ids:
+        send_task(COMPUTE_RETURN_RATES_TASK, org_id=str(org_id))
+    return len(org_ids)
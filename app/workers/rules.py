@@ -0,0 +1,102 @@
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+from app import db
+from app.services.audit import AuditWriter
+from app.services.rules.evaluator import (
+    EXECUTE_ACTION_TASK,
+    evaluate_rules_for_org,
+    release_actions,
+)
+from app.services.rules.executor import execute_rule_action
+from app.services.rules.guardrails import GuardrailState
+from app.workers.celery_app import celery_app, run_async, send_task
+
+
+logger = logging.getLogger(__name__)
+
+# Retries of a failing action before its guardrail claim is given back.
+ACTION_MAX_RETRIES = 3
+ACTION_RETRY_BASE_SECONDS = 60
+
+_guardrails: Optional[GuardrailState] = None
+
+
+def get_guardrails() -> GuardrailState:
+    """One Redis-backed guardrail state per worker process."""
+    global _guardrails
+    if _guardrails is None:
+        _guardrails = GuardrailState.from_url()
+    return _guardrails
+
+
+async def _evaluate(org_id: uuid.UUID) -> int:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    guardrails = get_guardrails()
+    async with db.async_session_maker() as session:
+        stats = await evaluate_rules_for_org(session, org_id, guardrails=guardrails)
+        try:
+            await session.commit()
+        except BaseException:
+            await release_actions(guardrails, stats.actions)
+            raise
+    # Only once the rule_executions rows are durable. Actions not enqueued
+    # give their claims back, so a retry of this task can queue them again.
+    for i, action in enumerate(stats.actions):
+        try:
+            send_task(EXECUTE_ACTION_TASK, **action)
+        except BaseException:
+            await release_actions(guardrails, stats.actions[i:])
+            raise
+    return len(stats.actions)
+
+
+@celery_app.task(name="rules.evaluate_rules_for_org")
+def evaluate_rules_for_org_task(org_id: str) -> int:
+    """Run after every sync / profit run for the org; returns actions queued."""
+    return run_async(_evaluate(uuid.UUID(org_id)))
+
+
+async def _execute(action: Dict[str, Any]) -> str:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with AuditWriter() as audit:
+        async with db.async_session_maker() as session:
+            return await execute_rule_action(
+                session,
+                audit,
+                org_id=uuid.UUID(action["org_id"]),
+                rule_id=uuid.UUID(action["rule_id"]),
+                entity_id=action["entity_id"],
+                entity_type=action["entity_type"],
+                platform=action["platform"],
+                action_type=action["action_type"],
+                action_params=action["action_params"],
+                metric_snapshot=action["metric_snapshot"],
+            )
+
+
+@celery_app.task(name=EXECUTE_ACTION_TASK, bind=True, max_retries=ACTION_MAX_RETRIES)
+def execute_rule_action_task(self, **action: Any) -> str:
+    """
+    Execute one action claimed by rule evaluation. Retries with exponential
+    backoff; after the last failure the claim is released so a later
+    evaluation may queue the action again.
+    """
+    try:
+        return run_async(_execute(action))
+    except Exception as exc:
+        if self.request.retries < ACTION_MAX_RETRIES:
+            raise self.retry(
+                exc=exc, countdown=ACTION_RETRY_BASE_SECONDS * 2**self.request.retries
+            )
+        logger.exception(
+            "rule %s entity %s: action failed %d times",
+            action.get("rule_id"),
+            action.get("entity_id"),
+            ACTION_MAX_RETRIES + 1,
+        )
+        run_async(release_actions(get_guardrails(), [action]))
+        raise
@@ -0,0 +1,17 @@
+from app import db
+from app.tenancy import ensure_tenant_partitions
+from app.workers.celery_app import celery_app, run_async
+
+
+async def _maintain() -> None:
+    if db.async_session_maker is None:
+        raise RuntimeError("DATABASE_URL is not configured")
+    async with db.async_session_maker() as session:
+        await ensure_tenant_partitions(session)
+        await session.commit()
+
+
+@celery_app.task(name="tenancy.maintain_partitions")
+def maintain_tenant_partitions_task() -> None:
+    """Daily: create upcoming ad_insights / profit_metrics months."""
+    run_async(_maintain())
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark for the per-request cost of `get_current_user`.
+
+Signs a token with a throwaway RSA key, serves a matching in-memory JWKS and
+compares a cold verification (caches cleared every call, i.e. the old path)
+with repeat requests that hit the key and claims caches.
+
+Usage:
+    python -m benchmarks.bench_auth [iterations]
+"""
+
+import asyncio
+import sys
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwk, jwt
+
+from app import auth
+
+
+def _make_token_and_jwks() -> tuple[str, dict]:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    )
+
+    public_jwk = jwk.construct(public_pem, algorithm="RS256").to_dict()
+    public_jwk.update({"kid": "bench", "alg": "RS256", "use": "sig"})
+
+    claims = {
+        "sub": "user_bench",
+        "org_id": "org_bench",
+        "exp": int(time.time()) + 3600,
+    }
+    token = jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": "bench"})
+    return token, {"keys": [public_jwk]}
+
+
+async def _run(iterations: int) -> None:
+    token, jwks = _make_token_and_jwks()
+
+    keys = {key["kid"]: key for key in jwks["keys"]}
+
+    async def _static_get_key(kid: str) -> dict | None:
+        return keys.get(kid)
+
+    auth.jwks_store.get_key = _static_get_key
+    auth.CLERK_JWT_ISSUER_URL = None
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        auth._public_key_cache.clear()
+        auth._claims_cache.clear()
+        await auth.get_current_user(None, credentials)
+    cold = (time.perf_counter() - start) / iterations
+
+    await auth.get_current_user(None, credentials)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await auth.get_current_user(None, credentials)
+    warm = (time.perf_counter() - start) / iterations
+
+    print(f"iterations:        {iterations}")
+    print(f"uncached per call: {cold * 1e6:10.1f} us")
+    print(f"cached per call:   {warm * 1e6:10.1f} us")
+    print(f"speedup:           {cold / warm:10.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(_run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,105 @@
+"""
+Benchmark for the COPY + set-based upsert ingest path.
+
+Loads a synthetic Shopify store (default 500k orders, ~2 line items each)
+into a local Postgres with migrations applied, then loads it again to time
+the idempotent no-change re-sync. Creates a fresh organization and store on
+every run.
+
+Usage:
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_bulk_ingest [orders] [batch_size]
+"""
+
+import asyncio
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator
+
+from sqlalchemy import text
+
+from app import db
+from app.services.ingest.shopify import upsert_shopify_orders
+
+
+def _synthetic_orders(count: int, seed: int = 7) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=90)
+    for n in range(count):
+        items = [
+            {
+                "id": n * 10 + i,
+                "product_id": rng.randint(1, 5000),
+                "variant_id": rng.randint(1, 20000),
+                "sku": f"SKU-{rng.randint(1, 20000):05d}",
+                "quantity": rng.randint(1, 3),
+                "price": f"{rng.randint(500, 15000) / 100:.2f}",
+            }
+            for i in range(rng.randint(1, 3))
+        ]
+        yield {
+            "id": 1_000_000 + n,
+            "created_at": (start + timedelta(seconds=n * 15)).isoformat(),
+            "total_price": f"{rng.randint(1000, 40000) / 100:.2f}",
+            "total_discounts": "0.00",
+            "currency": "USD",
+            "customer": {"id": rng.randint(1, count // 3 + 1)},
+            "financial_status": "paid",
+            "fulfillment_status": None,
+            "line_items": items,
+        }
+
+
+async def _run(count: int, batch_size: int) -> None:
+    if db.async_session_maker is None:
+        raise SystemExit("DATABASE_URL is not configured")
+
+    org_id, store_id = uuid.uuid4(), uuid.uuid4()
+    async with db.async_session_maker() as session:
+        await session.execute(
+            text(
+                "INSERT INTO organizations (id, name, base_currency) "
+                "VALUES (:id, 'bench', 'USD')"
+            ),
+            {"id": org_id},
+        )
+        await session.execute(
+            text(
+                "INSERT INTO stores (id, org_id, shopify_store_id, "
+                "access_token_enc, access_token_iv) "
+                "VALUES (:id, :org_id, 'bench.myshopify.com', '\\x00', '\\x00')"
+            ),
+            {"id": store_id, "org_id": org_id},
+        )
+        await session.commit()
+
+        for label in ("initial load", "re-sync (no changes)"):
+            start = time.perf_counter()
+            orders, items = await upsert_shopify_orders(
+                session,
+                org_id,
+                store_id,
+                _synthetic_orders(count),
+                batch_size=batch_size,
+            )
+            elapsed = time.perf_counter() - start
+            copy = sum(b.copy_seconds for b in orders.batches + items.batches)
+            merge = sum(b.merge_seconds for b in orders.batches + items.batches)
+            print(f"{label}:")
+            print(f"  orders:     {orders.rows:>9} rows, {orders.written:>9} written")
+            print(f"  line items: {items.rows:>9} rows, {items.written:>9} written")
+            print(f"  batches:    {len(orders.batches):>9} x {batch_size}")
+            print(f"  copy {copy:.2f}s, merge {merge:.2f}s, total {elapsed:.2f}s")
+            print(f"  {orders.rows / elapsed:,.0f} orders/s")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(
+        _run(
+            int(args[0]) if args else 500_000,
+            int(args[1]) if len(args) > 1 else 5000,
+        )
+    )
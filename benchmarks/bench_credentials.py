@@ -0,0 +1,93 @@
+"""
+Token decryption cost for sync fan-out: per-task key setup vs. the vault.
+
+Encrypts synthetic tokens for `tokens` connectors, then times
+  - per-token: decode AES_KEY, build the cipher, decrypt (what a sync task
+    pays when it sets up its own key material),
+  - vault.decrypt_many, cold (empty cache) and warm (every token cached),
+and checks all three return the same plaintexts.
+
+Usage:
+    python -m benchmarks.bench_credentials [tokens] [rounds]
+"""
+
+import base64
+import os
+import sys
+import time
+import uuid
+from typing import List
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.models.ad_accounts import AdAccount
+from app.services.credentials import CredentialVault, _associated_data
+
+
+def _connectors(vault: CredentialVault, count: int) -> List[AdAccount]:
+    connectors = []
+    org_ids = [uuid.uuid4() for _ in range(max(1, count // 20))]
+    for n in range(count):
+        account = AdAccount(id=uuid.uuid4(), org_id=org_ids[n % len(org_ids)])
+        vault.set_token(account, f"EAAB{n:012d}" + "x" * 180)
+        connectors.append(account)
+    return connectors
+
+
+def _per_token(encoded_key: str, connectors: List[AdAccount]) -> List[str]:
+    tokens = []
+    for c in connectors:
+        cipher = AESGCM(base64.b64decode(encoded_key))
+        tokens.append(
+            cipher.decrypt(
+                c.access_token_iv,
+                c.access_token_enc,
+                _associated_data(c.__tablename__, c.id, c.org_id),
+            ).decode()
+        )
+    return tokens
+
+
+def _timed(fn, rounds: int):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def _run(count: int, rounds: int) -> None:
+    key = os.urandom(32)
+    encoded = base64.b64encode(key).decode()
+    vault = CredentialVault("k1", {"k1": key}, cache_max=count)
+    connectors = _connectors(vault, count)
+
+    naive_s, naive = _timed(lambda: _per_token(encoded, connectors), rounds)
+
+    def cold():
+        vault.clear_cache()
+        return vault.decrypt_many(connectors)
+
+    cold_s, (cold_tokens, failures) = _timed(cold, rounds)
+    assert not failures
+    warm_s, (warm_tokens, _) = _timed(lambda: vault.decrypt_many(connectors), rounds)
+
+    expected = dict(zip((c.id for c in connectors), naive))
+    assert {k: t.reveal() for k, t in warm_tokens.items()} == expected
+
+    print(f"{count} tokens, best of {rounds}:")
+    for label, seconds in (
+        ("per-token key setup", naive_s),
+        ("vault, cold cache", cold_s),
+        ("vault, warm cache", warm_s),
+    ):
+        print(f"  {label:<20} {seconds * 1e3:8.1f} ms  {seconds / count * 1e6:6.2f} us/token")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    _run(
+        int(args[0]) if args else 10_000,
+        int(args[1]) if len(args) > 1 else 5,
+    )
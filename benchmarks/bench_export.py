@@ -0,0 +1,124 @@
+"""
+Memory and throughput check for the streaming CSV export pipeline.
+
+Feeds synthetic order-export rows in cursor-sized batches through
+CsvEncoder / PartWriter into a FilesystemObjectStore (in a temp dir), at
+two row counts that both span several upload parts. Checks that the
+gunzipped object has one line per row plus the header, then reports
+throughput (untraced run) and tracemalloc peak memory (traced run), which
+should be about the same for both sizes: roughly two parts plus one batch.
+
+Usage:
+    python -m benchmarks.bench_export [rows] [batch_size]
+"""
+
+import asyncio
+import gzip
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, List, Sequence, Tuple
+
+from app.services.reports.export import ORDER_EXPORT_COLUMNS, export_csv
+from app.services.reports.object_store import FilesystemObjectStore
+
+
+def _row_pool(size: int = 10_000, seed: int = 5) -> List[Tuple[Any, ...]]:
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    ad_sets = [uuid.uuid4() for _ in range(200)]
+    pool = []
+    for n in range(size):
+        attributed = rng.random() < 0.7
+        pool.append(
+            (
+                uuid.uuid4(),
+                str(5_000_000_000 + n),
+                start + timedelta(seconds=n * 7),
+                "USD",
+                rng.randrange(500, 50_000),
+                rng.randrange(0, 1_000),
+                "paid",
+                rng.choice(ad_sets) if attributed else None,
+                rng.randint(1, 5) if attributed else None,
+                Decimal(rng.randrange(30, 100)) / 100 if attributed else None,
+                "click_id" if attributed else None,
+                rng.randrange(500, 50_000) if attributed else None,
+            )
+        )
+    return pool
+
+
+_POOL = _row_pool()
+
+
+async def _batches(count: int, batch_size: int) -> AsyncIterator[List[Tuple]]:
+    batch: List[Tuple[Any, ...]] = []
+    for n in range(count):
+        batch.append(_POOL[n % len(_POOL)])
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+            # Yield to the loop as a real cursor fetch would.
+            await asyncio.sleep(0)
+    if batch:
+        yield batch
+
+
+async def _export(count: int, batch_size: int, store: FilesystemObjectStore, key: str):
+    return await export_csv(
+        _batches(count, batch_size),
+        ORDER_EXPORT_COLUMNS,
+        store,
+        key,
+        gzip=True,
+        on_progress=None,
+    )
+
+
+async def _measure(count: int, batch_size: int, root: str) -> Tuple[float, int, Sequence[Any]]:
+    store = FilesystemObjectStore(root)
+    key = f"bench/orders_{count}.csv.gz"
+    started = time.perf_counter()
+    result = await _export(count, batch_size, store, key)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    await _export(count, batch_size, store, key)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    with gzip.open(f"{root}/{key}", "rt") as f:
+        lines = sum(1 for _ in f)
+    assert lines == count + 1, (lines, count)
+    return elapsed, peak, (result.rows, result.csv_bytes, result.uploaded_bytes, result.parts)
+
+
+async def _run(count: int, batch_size: int) -> None:
+    with tempfile.TemporaryDirectory() as root:
+        for rows in (count // 4, count):
+            elapsed, peak, (exported, csv_bytes, uploaded, parts) = await _measure(
+                rows, batch_size, root
+            )
+            print(f"{exported:>9} rows:")
+            print(
+                f"  csv {csv_bytes / 1e6:,.1f} MB -> gzip {uploaded / 1e6:,.1f} MB "
+                f"in {parts} parts"
+            )
+            print(f"  {elapsed:.2f}s, {exported / elapsed:,.0f} rows/s")
+            print(f"  peak traced memory {peak / 1e6:,.1f} MB")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    asyncio.run(
+        _run(
+            int(args[0]) if args else 2_000_000,
+            int(args[1]) if len(args) > 1 else 5000,
+        )
+    )
@@ -0,0 +1,99 @@
+"""
+Benchmark for vectorized Tier 4 attribution.
+
+Builds synthetic daily spend and orders, assigns every order with the
+per-order reference (re-sums spend for each order, as the old per-order
+query did) and with `assign_by_spend`, checks both pick the same ad set
+for every order, then reports timings. Equivalence is covered by
+tests/test_attribution_tier4.py.
+
+Usage:
+    python -m benchmarks.bench_tier4 [orders] [ad_sets] [days]
+"""
+
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.services.attribution.spend import SpendMatrix, to_days
+from app.services.attribution.tier4 import assign_by_spend
+
+
+LOOKBACK_DAYS = 7
+
+
+def _synthetic(
+    n_orders: int, n_ad_sets: int, n_days: int, seed: int = 7
+) -> Tuple[date, List[tuple], List[datetime]]:
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    ad_sets = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(n_ad_sets)]
+    rows = [
+        # Coarse amounts so exact ties between ad sets actually occur.
+        (ad_set_id, start + timedelta(days=d), rng.randrange(1, 20) * 500)
+        for ad_set_id in ad_sets
+        for d in range(n_days)
+        if rng.random() < 0.3
+    ]
+    first = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    orders = [
+        first + timedelta(seconds=rng.randrange(n_days * 86_400)) for _ in range(n_orders)
+    ]
+    return start, rows, orders
+
+
+def _reference(
+    rows: List[tuple], orders: List[datetime], lookback_days: int
+) -> List[Optional[uuid.UUID]]:
+    """Per-order loop: sum each ad set's spend in the window, take the max."""
+    by_ad_set: Dict[uuid.UUID, Dict[date, int]] = {}
+    for ad_set_id, day, cents in rows:
+        by_ad_set.setdefault(ad_set_id, {})[day] = cents
+
+    out: List[Optional[uuid.UUID]] = []
+    for placed_at in orders:
+        order_day = placed_at.astimezone(timezone.utc).date()
+        best: Optional[uuid.UUID] = None
+        best_cents = 0
+        for ad_set_id in sorted(by_ad_set):
+            cents = sum(
+                by_ad_set[ad_set_id].get(order_day - timedelta(days=d), 0)
+                for d in range(lookback_days + 1)
+            )
+            if cents > best_cents:
+                best, best_cents = ad_set_id, cents
+        out.append(best)
+    return out
+
+
+def _run(n_orders: int, n_ad_sets: int, n_days: int) -> None:
+    start, rows, orders = _synthetic(n_orders, n_ad_sets, n_days)
+    end = start + timedelta(days=n_days - 1)
+
+    t0 = time.perf_counter()
+    expected = _reference(rows, orders, LOOKBACK_DAYS)
+    reference_seconds = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    spend = SpendMatrix.from_rows(start, end, rows)
+    best = assign_by_spend(spend, to_days(orders), LOOKBACK_DAYS)
+    actual = [spend.ad_set_ids[col] if col >= 0 else None for col in best.tolist()]
+    vectorized_seconds = time.perf_counter() - t0
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    assert mismatches == 0, f"{mismatches} of {n_orders} orders differ from the reference"
+
+    print(f"orders x ad sets x days: {n_orders} x {n_ad_sets} x {n_days}")
+    print(f"assigned:                {sum(1 for a in actual if a is not None)}")
+    print(f"reference:               {reference_seconds:8.3f} s")
+    print(f"vectorized:              {vectorized_seconds:8.3f} s")
+    print(f"speedup:                 {reference_seconds / vectorized_seconds:8.1f}x")
+    print("equivalent:              yes")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    _run(*(args + [5000, 200, 60][len(args):]))
@@ -0,0 +1,93 @@
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from app.services.attribution.spend import SpendMatrix, to_days
+from app.services.attribution.tier4 import assign_by_spend
+
+
+LOOKBACK_DAYS = 7
+
+
+def _synthetic(
+    n_orders: int, n_ad_sets: int, n_days: int, seed: int
+) -> Tuple[date, List[tuple], List[datetime]]:
+    rng = random.Random(seed)
+    start = date(2026, 1, 1)
+    ad_sets = [uuid.UUID(int=rng.getrandbits(128)) for _ in range(n_ad_sets)]
+    rows = [
+        # Coarse amounts so exact ties between ad sets actually occur.
+        (ad_set_id, start + timedelta(days=d), rng.randrange(1, 20) * 500)
+        for ad_set_id in ad_sets
+        for d in range(n_days)
+        if rng.random() < 0.3
+    ]
+    first = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    orders = [
+        first + timedelta(seconds=rng.randrange(n_days * 86_400)) for _ in range(n_orders)
+    ]
+    return start, rows, orders
+
+
+def _reference(
+    rows: List[tuple], orders: List[datetime], lookback_days: int
+) -> List[Optional[uuid.UUID]]:
+    """Per-order loop: sum each ad set's spend in the window, take the max."""
+    by_ad_set: Dict[uuid.UUID, Dict[date, int]] = {}
+    for ad_set_id, day, cents in rows:
+        by_ad_set.setdefault(ad_set_id, {})[day] = cents
+
+    out: List[Optional[uuid.UUID]] = []
+    for placed_at in orders:
+        order_day = placed_at.astimezone(timezone.utc).date()
+        best: Optional[uuid.UUID] = None
+        best_cents = 0
+        for ad_set_id in sorted(by_ad_set):
+            cents = sum(
+                by_ad_set[ad_set_id].get(order_day - timedelta(days=d), 0)
+                for d in range(lookback_days + 1)
+            )
+            if cents > best_cents:
+                best, best_cents = ad_set_id, cents
+        out.append(best)
+    return out
+
+
+def _assign(start, end, rows, orders, lookback_days=LOOKBACK_DAYS):
+    spend = SpendMatrix.from_rows(start, end, rows)
+    best = assign_by_spend(spend, to_days(orders), lookback_days)
+    return [spend.ad_set_ids[col] if col >= 0 else None for col in best.tolist()]
+
+
+@pytest.mark.parametrize(
+    "n_orders, n_ad_sets, n_days, seed",
+    [(500, 20, 30, 7), (500, 5, 10, 1), (200, 50, 60, 3), (50, 1, 3, 5)],
+)
+def test_vectorized_tier4_matches_per_order_reference(n_orders, n_ad_sets, n_days, seed):
+    start, rows, orders = _synthetic(n_orders, n_ad_sets, n_days, seed=seed)
+    end = start + timedelta(days=n_days - 1)
+
+    assert _assign(start, end, rows, orders) == _reference(rows, orders, LOOKBACK_DAYS)
+
+
+def test_ties_go_to_the_smallest_ad_set_id():
+    low, high = uuid.UUID(int=1), uuid.UUID(int=2)
+    day = date(2026, 1, 8)
+    rows = [(high, day, 500), (low, day, 500)]
+    orders = [datetime(2026, 1, 8, 12, tzinfo=timezone.utc)]
+
+    assert _assign(date(2026, 1, 1), day, rows, orders) == [low]
+
+
+def test_spend_outside_the_lookback_window_is_ignored():
+    ad_set = uuid.uuid4()
+    start = date(2026, 1, 1)
+    rows = [(ad_set, start, 500)]
+    on_edge = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(days=LOOKBACK_DAYS)
+    orders = [on_edge, on_edge + timedelta(days=1)]
+
+    end = start + timedelta(days=LOOKBACK_DAYS + 1)
+    assert _assign(start, end, rows, orders) == [ad_set, None]
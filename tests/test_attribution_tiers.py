@@ -0,0 +1,45 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import numpy as np
+
+from app.services.attribution.base import RunContext
+from app.services.attribution.engine import TIERS
+from app.services.attribution.spend import to_days
+
+
+def test_tiers_run_in_order():
+    assert [tier.number for tier in TIERS] == [1, 2, 3, 4]
+
+
+def test_tier_confidences_match_spec():
+    assert {tier.number: tier.confidence for tier in TIERS} == {
+        1: Decimal("0.95"),
+        2: Decimal("0.85"),
+        3: Decimal("0.70"),
+        4: Decimal("0.50"),
+    }
+
+
+def test_tier_methods():
+    assert {tier.number: tier.method for tier in TIERS} == {
+        1: "click_id",
+        2: "pixel_event",
+        3: "sku_weighted",
+        4: "blended",
+    }
+
+
+def test_run_context_days_are_utc_like_order_days():
+    # 2026-10-01 00:00 UTC to 2026-10-08 00:00 UTC, given in UTC-5.
+    eastern = timezone(timedelta(hours=-5))
+    context = RunContext(
+        uuid.uuid4(),
+        datetime(2026, 9, 30, 19, tzinfo=eastern),
+        datetime(2026, 10, 7, 19, tzinfo=eastern),
+        7,
+    )
+    assert context.first_day == date(2026, 10, 1)
+    assert context.last_day == date(2026, 10, 7)
+    assert to_days([context.window_start])[0] == np.datetime64(context.first_day)
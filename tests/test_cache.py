@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+from app import cache
+from app.cache import ResponseCache, commit_and_invalidate, invalidate_on_commit
+
+
+class _Redis:
+    """Just the string commands ResponseCache uses."""
+
+    def __init__(self) -> None:
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = str(value).encode() if not isinstance(value, bytes) else value
+        return True
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+        return int(self.data[key])
+
+
+class _Session:
+    """Just the parts of AsyncSession that commit_and_invalidate uses."""
+
+    def __init__(self) -> None:
+        self.info = {}
+        self.committed = False
+
+    async def commit(self) -> None:
+        self.committed = True
+
+
+def test_generation_is_bumped_before_commit_and_invalidate_returns(monkeypatch):
+    response_cache = ResponseCache(_Redis())
+    monkeypatch.setattr(cache, "response_cache", response_cache)
+    org_id = uuid.uuid4()
+    session = _Session()
+    invalidate_on_commit(session, org_id)
+
+    async def run():
+        before = await response_cache.generation(org_id)
+        await commit_and_invalidate(session)
+        return before, await response_cache.generation(org_id)
+
+    before, after = asyncio.run(run())
+    assert session.committed and after == before + 1
+
+
+def test_failed_bump_is_logged_not_raised(monkeypatch, caplog):
+    async def broken(org_id):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(cache.response_cache, "bump_generation", broken)
+    session = _Session()
+    invalidate_on_commit(session, uuid.uuid4())
+    asyncio.run(commit_and_invalidate(session))
+    assert session.committed
+    assert "generation bump failed" in caplog.text
+
+
+def test_nothing_is_cached_without_redis():
+    local = ResponseCache(None)
+    org_id = uuid.uuid4()
+
+    async def run():
+        await local.bump_generation(org_id)
+        return await local.generation(org_id)
+
+    assert asyncio.run(run()) == -1
+
+
+def test_lost_generation_key_never_restarts_at_an_old_value():
+    redis = _Redis()
+    response_cache = ResponseCache(redis)
+    org_id = uuid.uuid4()
+
+    async def run():
+        first = await response_cache.generation(org_id)
+        await response_cache.bump_generation(org_id)
+        bumped = await response_cache.generation(org_id)
+        redis.data.clear()
+        return first, bumped, await response_cache.generation(org_id)
+
+    first, bumped, restarted = asyncio.run(run())
+    assert bumped == first + 1
+    assert restarted > bumped
+
+
+def test_bump_of_a_missing_key_starts_above_zero():
+    response_cache = ResponseCache(_Redis())
+    org_id = uuid.uuid4()
+
+    async def run():
+        await response_cache.bump_generation(org_id)
+        return await response_cache.generation(org_id)
+
+    assert asyncio.run(run()) > 1
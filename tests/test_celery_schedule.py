@@ -0,0 +1,30 @@
+import importlib
+
+from app.workers.celery_app import celery_app
+
+
+def _registered_tasks():
+    for module in celery_app.conf.include:
+        importlib.import_module(module)
+    return set(celery_app.tasks)
+
+
+def test_every_beat_entry_runs_a_registered_task():
+    registered = _registered_tasks()
+    for name, entry in celery_app.conf.beat_schedule.items():
+        assert entry["task"] in registered, name
+
+
+def test_dirty_cell_recompute_task_is_registered():
+    assert {"profit.recompute_dirty", "profit.sweep_dirty"} <= _registered_tasks()
+
+
+def test_tenant_table_partitions_are_maintained_daily():
+    tasks = {entry["task"] for entry in celery_app.conf.beat_schedule.values()}
+    assert "tenancy.maintain_partitions" in tasks
+
+
+def test_sku_return_rates_run_nightly():
+    tasks = {entry["task"] for entry in celery_app.conf.beat_schedule.values()}
+    assert "profit.compute_all_sku_return_rates" in tasks
+    assert "profit.compute_sku_return_rates" in _registered_tasks()
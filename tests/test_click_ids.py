@@ -0,0 +1,34 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.services.ingest.click_ids import (
+    extract_click_ids,
+    first_order_per_click,
+    order_click_rows,
+)
+
+
+def test_click_ids_are_percent_decoded():
+    url = "https://shop.example/?utm_source=fb&fbclid=Iw%2BAR0_x%2Dy&gclid=a+b"
+    assert extract_click_ids(url) == [("meta", "Iw+AR0_x-y"), ("google", "a b")]
+
+
+def test_a_click_id_shared_by_two_orders_stays_with_the_earliest():
+    org_id = uuid.uuid4()
+    first_order, later_order = uuid.uuid4(), uuid.uuid4()
+    placed = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    url = "https://shop.example/?fbclid=abc"
+    rows = order_click_rows(org_id, later_order, placed + timedelta(hours=1), url)
+    rows += order_click_rows(org_id, first_order, placed, url)
+
+    kept = first_order_per_click(rows)
+
+    assert [row[4] for row in kept] == [first_order]
+
+
+def test_distinct_clicks_are_all_kept():
+    org_id, order_id = uuid.uuid4(), uuid.uuid4()
+    placed = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    rows = order_click_rows(org_id, order_id, placed, "https://s.example/?fbclid=a&gclid=a")
+
+    assert len(first_order_per_click(rows)) == 2
@@ -0,0 +1,96 @@
+import os
+import time
+import uuid
+
+import pytest
+
+from app.models.ad_accounts import AdAccount, AdPlatform
+from app.services.credentials import CredentialError, CredentialVault
+from app.services.ingest.insights import GoogleAdsInsightsFetcher, fetchers_for_accounts
+
+
+def _vault(**kwargs) -> CredentialVault:
+    return CredentialVault("k1", {"k1": os.urandom(32)}, **kwargs)
+
+
+def _accounts(vault: CredentialVault, count: int, platform=AdPlatform.META):
+    accounts = []
+    for n in range(count):
+        account = AdAccount(org_id=uuid.uuid4(), platform=platform)
+        vault.set_token(account, f"token-{n}")
+        accounts.append(account)
+    return accounts
+
+
+def test_round_trip_and_masked_repr():
+    vault = _vault()
+    (account,) = _accounts(vault, 1)
+    token = vault.token_for(account)
+    assert token.reveal() == "token-0"
+    assert "token-0" not in repr(token) and "token-0" not in str(token)
+
+
+def test_token_is_bound_to_its_row():
+    vault = _vault()
+    (account,) = _accounts(vault, 1)
+    vault.token_for(account)
+    moved = AdAccount(
+        id=account.id,
+        org_id=uuid.uuid4(),
+        access_token_enc=account.access_token_enc,
+        access_token_iv=account.access_token_iv,
+        access_token_key_id="k1",
+    )
+    tokens, failures = vault.decrypt_many([moved])
+    assert not tokens and list(failures) == [account.id]
+
+
+def test_batch_larger_than_cache_returns_usable_tokens():
+    vault = _vault(cache_max=2)
+    accounts = _accounts(vault, 5)
+    tokens, failures = vault.decrypt_many(accounts)
+    assert not failures
+    assert [tokens[a.id].reveal() for a in accounts] == [f"token-{n}" for n in range(5)]
+
+
+def test_token_outlives_cache_expiry():
+    vault = _vault(cache_ttl=0.01)
+    first, second = _accounts(vault, 2)
+    token = vault.token_for(first)
+    time.sleep(0.02)
+    vault.decrypt_many([second])  # purges the expired entry for `first`
+    assert token.reveal() == "token-0"
+
+
+def test_wiped_token_cannot_be_revealed():
+    vault = _vault()
+    (account,) = _accounts(vault, 1)
+    token = vault.token_for(account)
+    token.wipe()
+    with pytest.raises(CredentialError):
+        token.reveal()
+    assert vault.token_for(account).reveal() == "token-0"
+
+
+def test_previous_key_still_decrypts():
+    old_key = os.urandom(32)
+    (account,) = _accounts(CredentialVault("k1", {"k1": old_key}), 1)
+    rotated = CredentialVault("k2", {"k2": os.urandom(32), "k1": old_key})
+    assert rotated.token_for(account).reveal() == "token-0"
+
+
+def test_fetchers_for_accounts_reports_failures_per_account():
+    vault = _vault()
+    meta, google = _accounts(vault, 1) + _accounts(vault, 1, AdPlatform.GOOGLE)
+    broken = AdAccount(
+        id=uuid.uuid4(),
+        org_id=uuid.uuid4(),
+        platform=AdPlatform.META,
+        access_token_enc=b"x" * 32,
+        access_token_iv=b"y" * 12,
+        access_token_key_id="k1",
+    )
+    fetchers, failures = fetchers_for_accounts([meta, google, broken], vault=vault)
+    assert set(fetchers) == {meta.id, google.id}
+    assert isinstance(fetchers[google.id], GoogleAdsInsightsFetcher)
+    assert list(failures) == [broken.id]
@@ -0,0 +1,47 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.db import POOL_PROFILES, PoolStats, _instrumented_pool_class, get_pool_profile
+
+
+def _pool(stats, creator, **kwargs):
+    return _instrumented_pool_class(QueuePool, stats)(creator, **kwargs)
+
+
+def test_pool_timeout_counts_as_acquire_timeout():
+    stats = PoolStats()
+    pool = _pool(
+        stats, lambda: sqlite3.connect(":memory:"), pool_size=1, max_overflow=0, timeout=0.01
+    )
+    held = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    held.close()
+
+    snapshot = stats.snapshot()
+    assert snapshot["acquires"] == 2
+    assert snapshot["acquire_timeouts"] == 1
+
+
+def test_connection_error_is_not_an_acquire_timeout():
+    def refuse():
+        raise sqlite3.OperationalError("connection refused")
+
+    stats = PoolStats()
+    pool = _pool(stats, refuse, pool_size=1, max_overflow=0)
+    with pytest.raises(sqlite3.OperationalError):
+        pool.connect()
+
+    snapshot = stats.snapshot()
+    assert snapshot["acquires"] == 1
+    assert snapshot["acquire_timeouts"] == 0
+
+
+def test_fractional_pool_timeout_is_kept(monkeypatch):
+    monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+    assert get_pool_profile("api").pool_timeout == 2.5
+    monkeypatch.delenv("DB_POOL_TIMEOUT")
+    assert get_pool_profile("api").pool_timeout == POOL_PROFILES["api"].pool_timeout
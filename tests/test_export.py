@@ -0,0 +1,141 @@
+import asyncio
+import csv
+import gzip
+import io
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.reports.export import ORDER_EXPORT_COLUMNS, export_csv
+from app.services.reports.object_store import FilesystemObjectStore, PartWriter
+
+
+def _rows(count: int):
+    placed = datetime(2026, 10, 1, tzinfo=timezone.utc)
+    return [
+        (
+            uuid.UUID(int=n),
+            str(1000 + n),
+            placed,
+            "USD",
+            2500 + n,
+            0,
+            "paid",
+            uuid.UUID(int=n % 7) if n % 3 else None,
+            2 if n % 3 else None,
+            "0.85" if n % 3 else None,
+            "pixel_event" if n % 3 else None,
+            2500 + n if n % 3 else None,
+        )
+        for n in range(count)
+    ]
+
+
+async def _batches(rows, size, fail_after=None):
+    for i in range(0, len(rows), size):
+        if fail_after is not None and i >= fail_after:
+            raise RuntimeError("database went away")
+        yield rows[i : i + size]
+
+
+def _as_csv(rows):
+    text = io.StringIO()
+    writer = csv.writer(text, lineterminator="\n")
+    writer.writerow(ORDER_EXPORT_COLUMNS)
+    writer.writerows(rows)
+    return text.getvalue()
+
+
+def test_gzip_export_round_trips_to_the_csv_rows(tmp_path):
+    store = FilesystemObjectStore(str(tmp_path))
+    rows = _rows(2000)
+
+    result = asyncio.run(
+        export_csv(
+            _batches(rows, 300),
+            ORDER_EXPORT_COLUMNS,
+            store,
+            "org/exports/orders.csv.gz",
+            gzip=True,
+            part_size=4096,
+            on_progress=None,
+        )
+    )
+
+    body = gzip.decompress((tmp_path / "org/exports/orders.csv.gz").read_bytes()).decode()
+    assert body == _as_csv(rows)
+    assert result.rows == len(rows)
+    assert result.csv_bytes == len(body.encode())
+
+
+def test_failed_batch_aborts_leaving_no_object_or_part_file(tmp_path):
+    store = FilesystemObjectStore(str(tmp_path))
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            export_csv(
+                _batches(_rows(1000), 100, fail_after=500),
+                ORDER_EXPORT_COLUMNS,
+                store,
+                "org/exports/orders.csv",
+                part_size=1024,
+                on_progress=None,
+            )
+        )
+
+    assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+
+
+class _Upload:
+    """Just the part of MultipartUpload that PartWriter uses."""
+
+    key = "k"
+
+    def __init__(self) -> None:
+        self.parts = []
+
+    async def upload_part(self, data: bytes) -> None:
+        self.parts.append(data)
+
+
+def test_parts_are_at_least_part_size_except_the_last():
+    upload = _Upload()
+    writer = PartWriter(upload, 100)
+
+    async def run():
+        flushed = [await writer.write(b"x" * 40) for _ in range(6)]
+        await writer.close()
+        return flushed
+
+    flushed = asyncio.run(run())
+    assert flushed == [False, False, True, False, False, True]
+    assert [len(p) for p in upload.parts] == [120, 120]
+    assert writer.parts == 2 and writer.uploaded_bytes == 240
+
+
+def test_empty_writer_still_uploads_one_part():
+    writer = PartWriter(_Upload(), 100)
+    asyncio.run(writer.close())
+    assert writer.parts == 1 and writer.uploaded_bytes == 0
+
+
+def test_on_progress_runs_per_uploaded_part_and_at_the_end(tmp_path):
+    store = FilesystemObjectStore(str(tmp_path))
+    seen = []
+
+    result = asyncio.run(
+        export_csv(
+            _batches(_rows(500), 50),
+            ORDER_EXPORT_COLUMNS,
+            store,
+            "org/exports/orders.csv",
+            part_size=2048,
+            on_progress=lambda p: seen.append((p.rows, p.parts, p.uploaded_bytes)),
+        )
+    )
+
+    assert len(seen) >= 2
+    assert [parts for _, parts, _ in seen] == sorted(parts for _, parts, _ in seen)
+    assert seen[-1] == (result.rows, result.parts, result.uploaded_bytes)
+    assert result.uploaded_bytes == (tmp_path / "org/exports/orders.csv").stat().st_size
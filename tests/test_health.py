@@ -0,0 +1,8 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+def test_pool_stats_require_authentication():
+    response = TestClient(app).get("/health/pool")
+    assert response.status_code == 401
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.services.ingest.insights import (
+    InsightsPage,
+    PlatformApiError,
+    _batch_item_body,
+    _FetcherBase,
+)
+
+
+def _pages(count):
+    async def job():
+        for _ in range(count):
+            yield InsightsPage(platform="meta", account_id="act_1", rows=[{}])
+
+    return job
+
+
+def _failing(error):
+    async def job():
+        yield InsightsPage(platform="meta", account_id="act_1")
+        raise error
+
+    return job
+
+
+async def _drain(fetcher, jobs):
+    return [page async for page in fetcher._stream(jobs)]
+
+
+def test_stream_yields_every_page():
+    pages = asyncio.run(_drain(_FetcherBase(), [_pages(3), _pages(5)]))
+    assert len(pages) == 8
+
+
+def test_failing_job_raises_its_platform_error_unwrapped():
+    error = PlatformApiError("bad request", 400, code=100)
+    with pytest.raises(PlatformApiError) as raised:
+        asyncio.run(_drain(_FetcherBase(), [_pages(100), _failing(error)]))
+    assert raised.value is error
+
+
+def test_jobs_failing_together_raise_a_group():
+    async def fail():
+        raise PlatformApiError("boom", 500)
+        yield
+
+    with pytest.raises(ExceptionGroup) as raised:
+        asyncio.run(_drain(_FetcherBase(queue_size=1), [fail, fail]))
+    assert all(isinstance(e, PlatformApiError) for e in raised.value.exceptions)
+
+
+def test_malformed_batch_item_body_raises_a_platform_error():
+    with pytest.raises(PlatformApiError) as raised:
+        _batch_item_body("123", {"code": 502, "body": '{"data": [tru'})
+    assert raised.value.status_code == 502
+
+
+def test_batch_item_body_is_decoded():
+    assert _batch_item_body("123", {"code": 200, "body": '{"data": []}'}) == {"data": []}
+    assert _batch_item_body("123", None) == {}
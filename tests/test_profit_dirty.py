@@ -0,0 +1,29 @@
+import asyncio
+import uuid
+from datetime import date, datetime, timezone
+
+from app.services.profit.dirty import mark_settled_day_dirty
+
+
+class _Result:
+    rowcount = 3
+
+
+class _Session:
+    def __init__(self) -> None:
+        self.params = None
+
+    async def execute(self, statement, params):
+        self.params = params
+        return _Result()
+
+
+def test_settled_day_is_the_last_day_wholly_past_the_settle_period():
+    session = _Session()
+    now = datetime(2026, 10, 18, 1, 30, tzinfo=timezone.utc)
+
+    marked = asyncio.run(mark_settled_day_dirty(session, uuid.uuid4(), now=now))
+
+    # 45 days before now is 2026-09-03 01:30: orders of 09-02 are all older.
+    assert session.params["settled_day"] == date(2026, 9, 2)
+    assert marked == 3
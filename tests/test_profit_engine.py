@@ -0,0 +1,88 @@
+import uuid
+from datetime import date, datetime, timezone
+
+import numpy as np
+
+from app.models.profit_metrics import ProfitWindowType
+from app.services.ingest.bulk import _merge_sql
+from app.services.ingest.shopify import line_item_rows
+from app.services.profit.engine import (
+    COGS,
+    ORDERS,
+    PROFIT_METRIC_SPEC,
+    RETURNS,
+    REVENUE,
+    SPEND,
+    _metric_rows,
+    platform_fees_cents,
+    window_sums,
+)
+
+ORG = uuid.uuid4()
+AD_SET = uuid.uuid4()
+NOW = datetime(2026, 10, 18, tzinfo=timezone.utc)
+
+
+def _daily(days: int) -> np.ndarray:
+    return np.zeros((6, 1, days), dtype=np.int64)
+
+
+def test_window_sums_are_trailing_prefix_differences():
+    daily = np.arange(1, 6, dtype=np.int64).reshape(1, 1, 5)
+    assert window_sums(daily, np.array([0, 2, 4]), 3).tolist() == [[[1, 6, 12]]]
+
+
+def test_platform_fee_rounds_half_up_and_adds_per_order_fee():
+    # 290 bps of 10_050 cents = 291.45 -> 291, plus 2 orders x 30 cents.
+    assert platform_fees_cents(np.array([10_050]), np.array([2])).tolist() == [351]
+
+
+def test_daily_net_profit_formula_in_cents():
+    daily = _daily(30)
+    daily[SPEND, 0, 29] = 4_000
+    daily[REVENUE, 0, 29] = 10_000
+    daily[COGS, 0, 29] = 3_000
+    daily[RETURNS, 0, 29] = 500
+    daily[ORDERS, 0, 29] = 2
+    rows, stale = _metric_rows(
+        ORG, [AD_SET], date(2026, 9, 19), date(2026, 10, 18), date(2026, 10, 18), daily, NOW
+    )
+    by_type = {row[3]: row for row in rows}
+    daily_row = by_type[ProfitWindowType.DAILY.value]
+    fees = 290 + 60
+    assert daily_row[10] == fees
+    assert daily_row[11] == 10_000 - 4_000 - 3_000 - 500 - fees
+    assert all(isinstance(v, int) for v in daily_row[6:12])
+    assert not stale[0]
+
+
+def test_inactive_recomputed_windows_are_reported_stale():
+    daily = _daily(31)
+    daily[SPEND, 0, 0] = 100  # only the first loaded day has spend
+    first_day = date(2026, 10, 17)
+    rows, stale = _metric_rows(
+        ORG, [AD_SET], date(2026, 9, 18), first_day, date(2026, 10, 18), daily, NOW
+    )
+    # The 30-day windows ending 10-17 still cover the spend; nothing else does.
+    assert [(r[3], r[5]) for r in rows] == [(ProfitWindowType.D30.value, first_day)]
+    assert len(stale[0]) == 4 * 2 - 1
+    assert (ProfitWindowType.DAILY.value, first_day) in zip(stale[1], stale[2])
+
+
+def test_computed_at_alone_does_not_make_a_row_changed():
+    merge = _merge_sql(PROFIT_METRIC_SPEC)
+    compared = merge.split("WHERE", 1)[1]
+    assert "computed_at = EXCLUDED.computed_at" in merge
+    assert "computed_at" not in compared
+
+
+def test_line_item_category_from_product_type():
+    order = {
+        "line_items": [
+            {"id": 1, "product_id": 10, "sku": "A", "quantity": 1, "price": "5.00"},
+            {"id": 2, "product_id": 11, "product_type": "Shoes", "quantity": 1, "price": "1"},
+            {"id": 3, "product_id": 12, "quantity": 1, "price": "1"},
+        ]
+    }
+    rows = line_item_rows(ORG, uuid.uuid4(), order, {"10": "Hats", "11": "Ignored"})
+    assert [row[-1] for row in rows] == ["Hats", "Shoes", None]
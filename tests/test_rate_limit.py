@@ -0,0 +1,18 @@
+import asyncio
+
+import pytest
+
+from app.services.rate_limit import BucketConfig, InMemoryBucketBackend, RateLimiter
+
+
+def _limiter():
+    return RateLimiter(InMemoryBucketBackend(), buckets={"meta": BucketConfig(rate=1, capacity=5)})
+
+
+def test_tokens_within_capacity_are_taken():
+    asyncio.run(_limiter().acquire("meta", "act_1", tokens=5))
+
+
+def test_more_tokens_than_capacity_fail_instead_of_waiting_forever():
+    with pytest.raises(ValueError):
+        asyncio.run(asyncio.wait_for(_limiter().acquire("meta", "act_1", tokens=6), 1))
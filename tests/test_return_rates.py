@@ -0,0 +1,17 @@
+from datetime import date, timedelta
+
+from app.services.profit import return_rates
+from app.services.profit.return_rates import _rate, is_reconcile_day
+
+
+def test_full_reconcile_once_per_period():
+    days = [date(2026, 10, 1) + timedelta(days=n) for n in range(28)]
+    reconciles = [d for d in days if is_reconcile_day(d)]
+    assert len(reconciles) == 28 // return_rates.RETURN_RATE_RECONCILE_EVERY_DAYS
+    assert all((b - a).days == 7 for a, b in zip(reconciles, reconciles[1:]))
+
+
+def test_rate_is_capped_and_undefined_without_sales():
+    assert _rate(3, 0) is None
+    assert str(_rate(1, 3)) == "0.333333"
+    assert _rate(5, 2) == 1
@@ -0,0 +1,197 @@
+import asyncio
+import random
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pytest
+
+from app.models.ad_accounts import AdPlatform
+from app.models.automation_rules import AutomationRule, RuleActionType, RuleScope
+from app.services.rules.compiler import METRICS, RATIO_SCALE, MetricColumns, compile_rule
+from app.services.rules.evaluator import decide, platform_scoped, release_actions
+from app.services.rules.guardrails import (
+    CLAIMED,
+    DUPLICATE,
+    GuardrailState,
+    InMemoryGuardrailBackend,
+)
+
+
+_OPS = {
+    "lt": lambda a, b: a < b,
+    "gt": lambda a, b: a > b,
+    "lte": lambda a, b: a <= b,
+    "gte": lambda a, b: a >= b,
+}
+
+
+def _synthetic(
+    n_rules: int, n_ad_sets: int, seed: int
+) -> Tuple[List[AutomationRule], List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    org_id = uuid.uuid4()
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    entities = []
+    for _ in range(n_ad_sets):
+        spend = rng.randrange(0, 500_000)
+        revenue = rng.randrange(0, 800_000)
+        net = revenue - spend - rng.randrange(0, 200_000)
+        entities.append(
+            {
+                "ad_set_id": uuid.UUID(int=rng.getrandbits(128)),
+                "spend_cents": spend,
+                "net_profit_cents": net,
+                "net_profit_pct": (
+                    (Decimal(net * 100) / revenue).quantize(Decimal("0.0001")) if revenue else None
+                ),
+                "true_roas": (
+                    (Decimal(revenue) / spend).quantize(Decimal("0.0001")) if spend else None
+                ),
+                "order_count": rng.randrange(0, 60),
+            }
+        )
+
+    thresholds = {
+        "net_profit_cents": lambda: rng.randrange(-100_000, 100_000, 100),
+        "spend_cents": lambda: rng.randrange(0, 400_000, 100),
+        "net_profit_pct": lambda: str(Decimal(rng.randrange(-5_000, 5_000)) / 100),
+        "true_roas": lambda: str(Decimal(rng.randrange(50, 300)) / 100),
+    }
+    rules = []
+    for _ in range(n_rules):
+        conditions = []
+        for _ in range(rng.randrange(1, 4)):
+            metric = rng.choice(METRICS)
+            conditions.append(
+                {
+                    "metric": metric,
+                    "operator": rng.choice(list(_OPS)),
+                    "value": thresholds[metric](),
+                }
+            )
+        guardrails: Dict[str, int] = {"min_orders": rng.randrange(0, 10)}
+        if rng.random() < 0.5:
+            guardrails["min_spend_cents"] = rng.randrange(0, 50_000)
+        if rng.random() < 0.5:
+            guardrails["max_actions_per_day"] = rng.randrange(0, 20)
+        rules.append(
+            AutomationRule(
+                id=uuid.uuid4(),
+                org_id=org_id,
+                name="test",
+                platform=AdPlatform.META,
+                scope=RuleScope.ADSET,
+                conditions_json={
+                    "window": "7d",
+                    "match": rng.choice(["all", "any"]),
+                    "conditions": conditions,
+                },
+                action_type=RuleActionType.PAUSE,
+                action_params_json={},
+                guardrails_json=guardrails,
+                is_active=True,
+                updated_at=now,
+            )
+        )
+    return rules, sorted(entities, key=lambda e: e["ad_set_id"])
+
+
+def _reference(
+    rule: AutomationRule, entities: List[Dict[str, Any]]
+) -> Tuple[int, Set[uuid.UUID], Optional[int]]:
+    """Per-entity interpretation of conditions_json, then the guardrails."""
+    spec = rule.conditions_json
+    guardrails = rule.guardrails_json
+    triggered = 0
+    eligible: Set[uuid.UUID] = set()
+    for entity in entities:
+        results = []
+        for condition in spec["conditions"]:
+            value = entity[condition["metric"]]
+            threshold = Decimal(str(condition["value"]))
+            results.append(value is not None and _OPS[condition["operator"]](value, threshold))
+        hit = any(results) if spec["match"] == "any" else all(results)
+        if not hit:
+            continue
+        triggered += 1
+        if entity["order_count"] >= guardrails.get("min_orders", 0) and entity[
+            "spend_cents"
+        ] >= guardrails.get("min_spend_cents", 0):
+            eligible.add(entity["ad_set_id"])
+    return triggered, eligible, guardrails.get("max_actions_per_day")
+
+
+def _columns(entities: List[Dict[str, Any]]) -> MetricColumns:
+    values = {}
+    valid = {}
+    for metric in METRICS:
+        raw = [e[metric] for e in entities]
+        valid[metric] = np.array([v is not None for v in raw], dtype=bool)
+        scale = RATIO_SCALE if isinstance(next((v for v in raw if v is not None), 0), Decimal) else 1
+        values[metric] = np.array(
+            [int(v * scale) if v is not None else 0 for v in raw], dtype=np.int64
+        )
+    return MetricColumns(
+        entity_ids=tuple(e["ad_set_id"] for e in entities),
+        values=values,
+        valid=valid,
+        order_count=np.array([e["order_count"] for e in entities], dtype=np.int64),
+    )
+
+
+def test_rule_runs_when_its_platform_is_the_only_one_connected():
+    assert platform_scoped(AdPlatform.META, {AdPlatform.META})
+
+
+def test_rule_skipped_when_ad_sets_of_other_platforms_are_mixed_in():
+    assert not platform_scoped(AdPlatform.META, {AdPlatform.META, AdPlatform.GOOGLE})
+
+
+def test_rule_skipped_when_its_platform_is_not_connected():
+    assert not platform_scoped(AdPlatform.META, {AdPlatform.GOOGLE})
+    assert not platform_scoped(AdPlatform.META, set())
+
+
+def test_released_claims_can_be_claimed_again():
+    now = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+    org_id, rule_id = uuid.uuid4(), uuid.uuid4()
+    guardrails = GuardrailState(InMemoryGuardrailBackend())
+    claims = [(rule_id, "ad-set-1", "2026-10-17", 1)]
+    action = {
+        "org_id": str(org_id),
+        "rule_id": str(rule_id),
+        "entity_id": "ad-set-1",
+        "metric_snapshot": {"window_end": "2026-10-17"},
+        "claimed_at": now.isoformat(),
+    }
+
+    async def run():
+        assert await guardrails.claim_actions(org_id, claims, now=now) == [CLAIMED]
+        assert await guardrails.claim_actions(org_id, claims, now=now) == [DUPLICATE]
+        await release_actions(guardrails, [action])
+        # Neither blocked as a duplicate nor counted against the cap of 1.
+        assert await guardrails.claim_actions(org_id, claims, now=now) == [CLAIMED]
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("n_rules, n_ad_sets, seed", [(200, 500, 11), (100, 50, 2), (50, 5, 9)])
+def test_compiled_rules_match_per_entity_interpreter(n_rules, n_ad_sets, seed):
+    rules, entities = _synthetic(n_rules, n_ad_sets, seed=seed)
+    columns = _columns(entities)
+
+    for rule in rules:
+        ref_triggered, ref_eligible, cap = _reference(rule, entities)
+        triggered, positions = decide(compile_rule(rule), columns)
+        acted = {columns.entity_ids[p] for p in positions}
+
+        assert triggered == ref_triggered
+        if cap is None:
+            assert acted == ref_eligible
+        else:
+            assert acted <= ref_eligible
+            assert len(acted) == min(cap, len(ref_eligible))